@@ -1,29 +1,304 @@
-from bdarpack.MarginalDist import MarginalDist
+from bdarpack.MarginalDist import MarginalDist, KDE_BINNED_THRESHOLD, DISCRETE_MAX_UNIQUE
+from bdarpack.QuantileSketch import QuantileSketch
 from bdarpack import utils_ as ut_
+from bdarpack import kernels_ as kn_
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import os
+import json
+import threading
 import pandas as pd
 import numpy as np
-from scipy import stats
 
 EPSILON = np.finfo(np.float32).eps
+JACKKNIFE_GROUPS = 10 #number of delete-a-group jackknife replicates for subsampled correlation standard errors
+CORRELATION_SAMPLE_SIZE_START = 1000 #initial subsample size when only a standard error target is given
+MODEL_FORMAT_VERSION = 1 #version of the directory layout written by GaussianCopula.export_model()
+MODEL_SCALAR_PARAMS = ["df", "loc", "scale", "a", "b", "c", "constant_value"] #MarginalDist parameters stored in the model metadata
+BINARY_TRANSFORMER_TYPES = ["Boolean", "is_null"] #Transformer output types always fitted with the 'discrete' marginal (sampled by thresholding the normal scores)
+DISCRETE_TRANSFORMER_TYPES = ["Numerical-INT", "LabelEncoding"] #Transformer output types fitted with the 'discrete' marginal when they have few distinct values
+MODEL_GRID_PARAMS = {"emp": "ecdf", "emp_sketch": "emp_sketch", "discrete": "discrete", "gaussian_kde": "gaussian_kde", "gaussian_kde_binned": "gaussian_kde_binned"} #MarginalDist parameters holding (x, u) interpolation grids
+
+def _fit_univariate(var_name, var, candidates=None, debug=False, **marginal_options):
+    """Fit the MarginalDist of a single column (marginal_options are passed to MarginalDist). Defined at module level so that it can be sent to a process pool."""
+
+    if (debug):
+        print(f"Fitting var: {var_name}")
+    univariate = MarginalDist(debug=debug, **marginal_options)
+    fit_success = univariate.fit(data=var, candidates=candidates)
+
+    return fit_success, univariate
+
+def _one_hot_groups(transformer_meta_dict, columns):
+    """
+    One-hot groups {field: output fields} of the 'One-Hot' fields of a Transformer.transformer_meta_dict, including the field's '<field>.is_null' column, 
+    so that exactly one column of a group is 1 in every row. Only groups of at least two columns that are all in columns are returned.
+    """
+
+    groups = {}
+    for field, field_meta in transformer_meta_dict.items():
+        if (field_meta.get('transformer_type') == 'One-Hot'):
+            group = list(field_meta['output_fields'].keys())
+            if (len(group) > 1) and all(column in columns for column in group):
+                groups[field] = group
+
+    return groups
+
+def _transformer_column_types(transformer_meta_dict):
+    """
+    Transformer type {output column: type} of the output columns of a Transformer.transformer_meta_dict. The '.is_null' column of a field gets the type 'is_null', 
+    except for 'One-Hot' fields, where it is one of the one-hot columns.
+    """
+
+    column_types = {}
+    for field_meta in transformer_meta_dict.values():
+        transformer_type = field_meta.get('transformer_type')
+        for column in field_meta.get('output_fields', {}):
+            column_types[column] = 'is_null' if (column.endswith('.is_null') and (transformer_type != 'One-Hot')) else transformer_type
+
+    return column_types
+
+def _order_one_hot_groups(data, groups):
+    """
+    Code order of the columns of each one-hot group, so that one ordered latent dimension carries as much of the dependence on the other columns as possible.
+    The mid-rank normal scores of the ungrouped columns are averaged within each category, and the categories are ordered by the projection of these means 
+    on their leading (frequency-weighted) principal direction, ties by decreasing frequency. Without ungrouped columns, categories are ordered by frequency.
+    Inputs:
+        data (dataframe): training data, with the one-hot columns
+        groups (dict): {group name: one-hot columns} (see _one_hot_groups)
+    Returns:
+        column_groups (dict): {group name: one-hot columns in code order}
+    """
+
+    grouped = {column for columns in groups.values() for column in columns}
+    other_columns = [column for column in data.columns if column not in grouped]
+    if other_columns:
+        ranks = data[other_columns].astype(float).rank(method='average')
+        temp_U = ((ranks - 0.5) / ranks.count()).to_numpy()
+        scores_np = np.nan_to_num(kn_.norm_ppf(temp_U, out=temp_U)) # missing values at 0
+
+    column_groups = {}
+    for group, columns in groups.items():
+        codes = np.argmax(data[columns].to_numpy(dtype=float), axis=1)
+        counts = np.bincount(codes, minlength=len(columns))
+        association = np.zeros(len(columns))
+        if other_columns:
+            category_means = np.zeros((len(columns), scores_np.shape[1]))
+            np.add.at(category_means, codes, scores_np)
+            category_means /= np.maximum(counts, 1)[:, None]
+            _, _, Vt = np.linalg.svd(np.sqrt(counts)[:, None] * category_means, full_matrices=False)
+            association = category_means @ Vt[0]
+        column_groups[group] = [columns[code] for code in np.lexsort((-counts, association))]
+
+    return column_groups
+
+def load_model(path, mmap_mode='r'):
+    """
+    Load a model written by GaussianCopula.export_model(). The arrays are memory-mapped, so loading does not read the correlation matrix or the grids into memory
+    and no training data (or KDE model) is needed.
+    Args:
+        path (str): directory of the exported model
+        mmap_mode (str, optional): numpy memory-map mode of the arrays ('r' by default, None reads them into memory)
+    Returns:
+        gaussian_copula (GaussianCopula): fitted model, ready for sampling
+    Raises:
+        Error: If the directory does not contain a supported model.
+    """
+
+    with open(os.path.join(path, "meta.json"), "r") as fl:
+        meta = json.load(fl)
+
+    if (meta.get("format_version") != MODEL_FORMAT_VERSION):
+        raise Error(f"Unsupported model format version: {meta.get('format_version')}")
+
+    def _load(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    gaussian_copula = GaussianCopula(
+        correlation_method=meta["correlation_method"],
+        conditional_cache_size=meta["conditional_cache_size"],
+        random_state=meta["random_state"],
+        sample_float32=meta["sample_float32"],
+        correlation_structure=meta["correlation_structure"],
+        n_factors=meta["n_factors"]
+    )
+    var_names = meta["var_names"]
+
+    # Marginal distributions: scalar parameters from the metadata, (x, u) grids as views into the shared grid arrays
+    grid_x = _load("grid_x")
+    grid_u = _load("grid_u")
+    if os.path.exists(os.path.join(path, "ppf_table_z.npy")):
+        table_z = _load("ppf_table_z")
+        table_x = _load("ppf_table_x")
+    univariates = {}
+    for var_name in var_names:
+        marginal_meta = meta["marginals"][var_name]
+
+        univariate = MarginalDist()
+        univariate.marginal_dist = marginal_meta["dist"]
+        univariate.fitted_marginal_dist = marginal_meta["dist"]
+        univariate.params.update(marginal_meta["params"])
+        if (marginal_meta["dist"] in MODEL_GRID_PARAMS):
+            start, stop = marginal_meta["grid"]
+            univariate.params[MODEL_GRID_PARAMS[marginal_meta["dist"]]] = {"x": grid_x[start:stop], "u": grid_u[start:stop], "sorted": marginal_meta.get("sorted", False)}
+        if ("ppf_table" in marginal_meta):
+            table_meta = marginal_meta["ppf_table"]
+            start, stop = table_meta["table"]
+            univariate.params["ppf_table"] = {"z": table_z[start:stop], "x": table_x[start:stop], "tol": table_meta["tol"], "max_error": table_meta["max_error"]}
+        univariate.fitted = True
+
+        univariates[var_name] = univariate
+
+    gaussian_copula.var_names = var_names
+    gaussian_copula.univariates = univariates
+    gaussian_copula.column_groups = meta.get("column_groups")
+    gaussian_copula.data_columns = meta.get("data_columns", var_names)
+
+    # Correlation model (the Cholesky factor is stored, so that sampling starts without a factorization)
+    if (gaussian_copula.correlation_structure=='factor'):
+        loadings = _load("loadings")
+        gaussian_copula.correlation_factors = {
+            "loadings": pd.DataFrame(loadings, index=var_names, columns=[f"factor_{i}" for i in range(loadings.shape[1])]),
+            "uniqueness": pd.Series(_load("uniqueness"), index=var_names)
+        }
+    else:
+        gaussian_copula.correlation = pd.DataFrame(_load("correlation"), index=var_names, columns=var_names)
+        gaussian_copula.cholesky = _load("cholesky")
+        gaussian_copula._cholesky_correlation = gaussian_copula.correlation
+
+    gaussian_copula.clear_conditional_cache()
+    gaussian_copula.fitted = True
+
+    return gaussian_copula
 
 class GaussianCopula:
     """
 
     Change Log: (MZ): 13-07-2023: Added print_copula_params()
     (MZ): 14-07-2023: Added conditions for self.fitted boolean in self.fit()
+    (MZ): 18-10-2026: Added bounded LRU cache of conditional Gaussian factorizations, keyed by the set of conditioning variables
+    (MZ): 18-10-2026: Sampling uses the Cholesky factor of the correlation matrix (computed once at fit time) on a numpy.random.Generator
+    (MZ): 18-10-2026: Added partial_fit()/merge() for incremental fitting from mergeable statistics (quantile sketches and normal-score cross-products)
+    (MZ): 18-10-2026: Added optional low-rank-plus-diagonal (factor) correlation structure for very wide data
+    (MZ): 18-10-2026: Added export_model()/load_model() for a compact, memory-mappable model that samples without the training data
+    (MZ): 18-10-2026: Sampling uses the stateless MarginalDist.compute_cdf/compute_ppf and a locked conditional cache, so one fitted model can be sampled from several threads
+    (MZ): 18-10-2026: Added optional tabulated ppf for slow parametric marginals (marginal_ppf_table_tol) and ppf_table_report()
+    (MZ): 18-10-2026: Columns with few distinct values get the exact 'discrete' marginal (marginal_discrete_max_unique)
+    (MZ): 18-10-2026: Added optional cache of fitted marginal distributions (fit_cache, MarginalFitCache)
+    (MZ): 18-10-2026: Added optional wall-clock budget per candidate marginal fit (marginal_candidate_timeout)
+    (MZ): 18-10-2026: Normal transforms use the scipy.special kernels of kernels_ (ndtr/ndtri) instead of scipy.stats.norm
+    (MZ): 18-10-2026: Sampling applies the inverse transform to all columns in one pass (_inverse_transform): one ndtr call, one ppf call per parametric family, one output array
+    (MZ): 18-10-2026: Optional grouping of one-hot columns into one categorical latent dimension per group (fit(transformer_meta_dict=...)); discrete marginals (binary columns) 
+    are sampled by thresholding the normal scores
+    (MZ): 18-10-2026: 'discrete' marginals are chosen per column from the transformer types given to fit(transformer_meta_dict=...): never for ungrouped one-hot columns 
+    (fitted one by one, they do not sample one-hot rows), by number of distinct values for integer, label-encoded, Boolean and .is_null columns
+    (MZ): 18-10-2026: binary columns (Boolean, .is_null) described by fit(transformer_meta_dict=...) always get the 'discrete' marginal and the threshold fast path
+    (MZ): 18-10-2026: Conditions on 'discrete' marginals are drawn from the standard normal truncated to the probability step of the value (_condition_normal_scores)
+
+    Inputs:
+        random_state (int, optional): Seed for the sampler's numpy.random.Generator. If None (default), a generator is seeded from the global numpy random state on every sample call, so np.random.seed() keeps controlling reproducibility.
+        sample_float32 (bool): Draw the normal samples in float32 to halve memory for very large draws. Default is False.
+        correlation_sample_size (int, optional): Estimate the correlation matrix on a stratified subsample of this many rows instead of all rows (approximate, for exploratory runs). Default is None (all rows).
+        correlation_se_target (float, optional): Largest acceptable standard error of any correlation entry. The subsample is doubled until the target is met (or all rows are used). Default is None (no target).
+        sketch_k (int): Accuracy parameter of the QuantileSketch kept per column by partial_fit() and of 'emp_sketch' marginals. Default is 200.
+        correlation_structure (str): 'dense' (default) for a full correlation matrix, or 'factor' for a low-rank-plus-diagonal correlation L @ L.T + diag(D) 
+            with n_factors columns in L. In factor form, fitting, PD repair, conditioning and sampling never form the dense d x d matrix (O(d k) memory instead of O(d^2)).
+        n_factors (int): Number of factors (columns of L) when correlation_structure='factor'. Default is 10.
+        kde_binned_threshold (int): Number of rows above which 'gaussian_kde' marginals are fitted as 'gaussian_kde_binned' (binned FFT estimator). None never switches. Default is 100000.
+        marginal_n_jobs (int, optional): Number of threads used to evaluate the candidate distributions of each column concurrently (see MarginalDist n_jobs). Default is None (sequential).
+        marginal_selection (str): 'best' (default) keeps the candidate with the smallest KS statistic, 'first' the first candidate with an acceptable KS p-value (see MarginalDist selection).
+        marginal_sample_size (int, optional): Two-stage marginal selection for columns with more rows: candidates are screened on a subsample of this many rows 
+            and only the marginal_top_k best are refitted on the full data (see MarginalDist selection_sample_size). Default is None (single stage).
+        marginal_top_k (int): Number of candidates refitted on the full data in two-stage marginal selection. Default is 2.
+        marginal_ppf_table_tol (float, optional): Tabulate the ppf of beta, gamma and student_t marginals at fit time with this maximum absolute error, 
+            so that sampling interpolates instead of root-finding (see MarginalDist ppf_table_tol, ppf_table_report()). Default is None (exact ppf).
+        marginal_discrete_max_unique (int, optional): Columns with at most this many distinct values (and at least two rows per value on average) get the exact 'discrete' marginal 
+            without candidate selection, unless their marginal_dist_dict candidates exclude 'discrete' (see MarginalDist discrete_max_unique). None disables. Default is DISCRETE_MAX_UNIQUE (50). 
+            With fit(transformer_meta_dict=...), it applies to 'Numerical-INT' and 'LabelEncoding' columns, binary ('Boolean', '.is_null') columns are always 'discrete' 
+            (whatever this setting) and ungrouped one-hot columns never are (each column would be discretized on its own, so sampled rows could have no or several hot columns). 
+            Without transformer_meta_dict, it applies to every column except 0/1 columns, which cannot be told apart from one-hot columns.
+        marginal_candidate_timeout (float, optional): Wall-clock budget in seconds of each candidate marginal fit. Fits run in worker processes and are stopped when they exceed it; 
+            the candidate is recorded as skipped in the column's selection_stats (see MarginalDist candidate_timeout). Default is None (no budget).
+        fit_cache (MarginalFitCache, optional): Cache of fitted marginal distributions, keyed by the column values, candidates and marginal options. 
+            Columns found in the cache are not refitted. The cache can be shared between models. Default is None (no cache).
     """
 
     def __init__(self,
         debug=False,
-        correlation_method="kendall"
+        correlation_method="kendall",
+        conditional_cache_size=128,
+        random_state=None,
+        sample_float32=False,
+        correlation_sample_size=None,
+        correlation_se_target=None,
+        sketch_k=200,
+        correlation_structure="dense",
+        n_factors=10,
+        kde_binned_threshold=KDE_BINNED_THRESHOLD,
+        marginal_n_jobs=None,
+        marginal_selection="best",
+        marginal_sample_size=None,
+        marginal_top_k=2,
+        marginal_ppf_table_tol=None,
+        marginal_discrete_max_unique=DISCRETE_MAX_UNIQUE,
+        marginal_candidate_timeout=None,
+        fit_cache=None
     ):
         
         self.debug = debug
-        self.var_names = None #array of column names found in data dataframe
+        self.var_names = None #array of column names found in data dataframe (dimensions of the copula: one-hot groups count once, under the group name)
+        self.data_columns = None #columns of the training data, in order (the columns of the samples)
+        self.column_groups = None #{group name: one-hot columns, in code order} of the one-hot groups modelled as one categorical latent dimension
         self.univariates = None #dict of MarginalDist class
         self.correlation= None #correlation matrix
+        self.correlation_structure = correlation_structure #'dense' or 'factor'
+        self.n_factors = n_factors #number of factors for correlation_structure='factor'
+        self.kde_binned_threshold = kde_binned_threshold #row count above which 'gaussian_kde' marginals use the binned estimator
+        self.marginal_n_jobs = marginal_n_jobs #threads per column used to evaluate candidate marginal distributions
+        self.marginal_selection = marginal_selection #'best' or 'first' candidate marginal distribution
+        self.marginal_sample_size = marginal_sample_size #rows of the stage-one subsample of two-stage marginal selection
+        self.marginal_top_k = marginal_top_k #candidates refitted on the full data in two-stage marginal selection
+        self.marginal_ppf_table_tol = marginal_ppf_table_tol #max. absolute error of tabulated marginal ppfs (None: exact ppf)
+        self.marginal_discrete_max_unique = marginal_discrete_max_unique #max. number of distinct values of columns fitted with the 'discrete' marginal (None: disabled, see fit() for the columns it applies to)
+        self.marginal_candidate_timeout = marginal_candidate_timeout #wall-clock budget (s) of each candidate marginal fit (None: no budget)
+        self.fit_cache = fit_cache #MarginalFitCache of fitted marginal distributions (None: no cache)
+        self.correlation_factors = None #{'loadings': L (dataframe, d x k), 'uniqueness': D (series, d)} for correlation_structure='factor'
         self.correlation_method = correlation_method #method for computing correlation
+        self.correlation_sample_size = correlation_sample_size #subsample size for approximate correlation (None uses all rows)
+        self.correlation_se_target = correlation_se_target #largest acceptable standard error of a subsampled correlation entry
+        self.correlation_se = None #per-entry (jackknife) standard errors of a subsampled correlation matrix
+        self.correlation_sample_info = None #dict describing the subsample used for the correlation matrix
         self.fitted = False
+
+        self.conditional_cache_size = conditional_cache_size #max. number of conditioning variable sets kept in the conditional cache (0 disables caching)
+        self.conditional_cache_hits = 0
+        self.conditional_cache_misses = 0
+        self._conditional_cache_lock = threading.Lock() #guards the cache when one model is sampled from several threads
+        self.clear_conditional_cache()
+
+        self.cholesky = None #lower-triangular factor of the correlation matrix, used for sampling
+        self._cholesky_correlation = None #correlation matrix that self.cholesky was computed from
+        self.random_state = random_state
+        self.rng = np.random.default_rng(random_state) if random_state is not None else None
+        self.sample_float32 = sample_float32
+
+        self.sketch_k = sketch_k
+        self.partial_fit_stats = None #mergeable statistics accumulated by partial_fit()
+
+    def __getstate__(self):
+        """Pickle the instance without its (unpicklable) cache lock."""
+
+        state = self.__dict__.copy()
+        state.pop('_conditional_cache_lock', None)
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled instance, filling in attributes added after it was saved."""
+
+        defaults = GaussianCopula().__dict__
+        for key, value in defaults.items():
+            state.setdefault(key, value)
+        self.__dict__.update(state)
     
     def print_copula_params(self):
 
@@ -32,16 +307,45 @@ class GaussianCopula:
             var_univariate = self.univariates[var_name]
             print(f"Learned marginal distribution for {var_name}: {var_univariate.fitted_marginal_dist}")
 
-    def compute_correlation(self, data, method='kendall', transform_to_normal=False):
+    def ppf_table_report(self):
+        """
+        Report the tabulated ppfs of the marginal distributions (see marginal_ppf_table_tol).
+        Returns:
+            report (pd.DataFrame): one row per variable with a table: distribution, number of table points, tolerance, measured max. absolute error, 
+                and the probability range [u_min, u_max] covered by the table (the exact ppf is used outside it)
+        """
+
+        rows = {}
+        for var_name in self.var_names:
+            univariate = self.univariates[var_name]
+            table = univariate.params.get("ppf_table")
+            if table is not None:
+                rows[var_name] = {
+                    "dist": univariate.fitted_marginal_dist,
+                    "size": len(table["z"]),
+                    "tol": table["tol"],
+                    "max_error": table["max_error"],
+                    "u_min": kn_.norm_cdf(table["z"][0]),
+                    "u_max": kn_.norm_cdf(table["z"][-1])
+                }
+
+        return pd.DataFrame.from_dict(rows, orient='index', columns=["dist", "size", "tol", "max_error", "u_min", "u_max"])
+
+    def compute_correlation(self, data, method='kendall', transform_to_normal=False, n_jobs=None, sample_size=None, se_target=None):
         """
         
             Computes the (pairwise) correlation matrix for a given set of data. 
-            The method used to compute the correlation can be chosen from the available options (kendall, spearman, pearson).
+            The method used to compute the correlation can be chosen from the available options (kendall, kendall_fast, spearman, pearson).
 
             Args:
             data (dataframe): training data
-            method (str): The method used to compute the correlation. Available  options are 'kendall' (default), 'spearman', and 'pearson'.
+            method (str): The method used to compute the correlation. Available  options are 'kendall' (default), 'kendall_fast', 'spearman', and 'pearson'.
+                'kendall_fast' gives the same tau-b as 'kendall' (pairwise complete observations), using ut_.kendall_corr: each column is ranked once and column pairs are computed in a thread pool.
             transform_to_normal (bool): If True, the data is first transformed to a normal distribution before computing the correlation.
+            n_jobs (int): Number of threads over column pairs for method='kendall_fast'. None or 1 computes sequentially, -1 uses all available cores.
+            sample_size (int): If given, the correlation is estimated on a stratified subsample of this many rows (see self._subsampled_correlation), 
+                and per-entry standard errors are stored in self.correlation_se. Default is None (all rows).
+            se_target (float): Largest acceptable standard error of any correlation entry; the subsample is doubled until it is met. Default is None.
 
             Returns:
             corr_matrix_df (pd.DataFrame): A square DataFrame with the variable names as indexes and columns, and the correlations as values. 
@@ -69,18 +373,38 @@ class GaussianCopula:
             temp_dict = {}
             for var_name, var in data.items():
                 univariate = self.univariates[var_name]
-                temp_U = univariate.cdf_wrapper(data=var)
-                norm_var = stats.norm.ppf(temp_U)
+                temp_U = univariate.compute_cdf(var)
+                norm_var = kn_.norm_ppf(temp_U)
                 temp_dict[var_name] = norm_var
             norm_data_df = pd.DataFrame.from_dict(temp_dict)
             data_df = norm_data_df
         else:
             data_df = data
 
+        if (sample_size is not None) or (se_target is not None):
+            corr_matrix_np = self._subsampled_correlation(data_df, method=method, sample_size=sample_size, se_target=se_target, n_jobs=n_jobs)
+        else:
+            corr_matrix_np = self._correlation_matrix(data_df, method=method, n_jobs=n_jobs)
+            self.correlation_se = None
+            self.correlation_sample_info = None
+
+        # If correlation matrix is not positive definite, make it so
+        corr_matrix_np = ut_.makePD(corr_matrix_np)
+        corr_matrix_df = pd.DataFrame(corr_matrix_np, index=self.var_names, columns=self.var_names)
+
+        return corr_matrix_df
+
+    def _correlation_matrix(self, data_df, method='kendall', n_jobs=None):
+        """Compute the correlation matrix of the gaussian copula (before makePD) from the rank correlation of data_df, as a numpy array."""
+
         if (method=='kendall'):
             corr_matrix_df = data_df.corr(method='kendall') #data_df is DataFrame
             corr_matrix_np = np.nan_to_num(corr_matrix_df.to_numpy(), nan=0.0)
             corr_matrix_np = np.sin(corr_matrix_np * np.pi/2)
+        elif (method=='kendall_fast'):
+            corr_matrix_df = ut_.kendall_corr(data_df, n_jobs=n_jobs)
+            corr_matrix_np = np.nan_to_num(corr_matrix_df.to_numpy(), nan=0.0)
+            corr_matrix_np = np.sin(corr_matrix_np * np.pi/2)
         elif (method=='spearman'):
             corr_matrix_df = data_df.corr(method='spearman') #data_df is DataFrame
             corr_matrix_np = np.nan_to_num(corr_matrix_df.to_numpy(), nan=0.0)
@@ -89,20 +413,159 @@ class GaussianCopula:
             corr_matrix_df = data_df.corr(method='pearson') #data_df is DataFrame
             corr_matrix_np = np.nan_to_num(corr_matrix_df.to_numpy(), nan=0.0)
 
-        # If correlation matrix is not positive definite, make it so
-        corr_matrix_np = ut_.makePD(corr_matrix_np)
-        corr_matrix_df = pd.DataFrame(corr_matrix_np, index=self.var_names, columns=self.var_names)
+        return corr_matrix_np
 
-        return corr_matrix_df
+    def _subsampled_correlation(self, data_df, method='kendall', sample_size=None, se_target=None, n_jobs=None):
+        """
+        Estimate the correlation matrix (before makePD) on a stratified subsample of data_df, with per-entry standard errors from a delete-a-group jackknife.
+
+        Rows are ordered once with ut_.stratified_order, so that the subsample is always a prefix of that order and grows by nesting. 
+        The subsample is split at random into JACKKNIFE_GROUPS groups and the correlation is recomputed with each group left out; the spread of these replicates gives the standard errors. 
+        If se_target is given, the subsample size is doubled until the largest off-diagonal standard error is at most se_target, or all rows are used.
 
+        Args:
+            data_df (pd.DataFrame): training data
+            method (str): method used to compute the correlation (see self.compute_correlation).
+            sample_size (int): initial subsample size. Default is None (CORRELATION_SAMPLE_SIZE_START).
+            se_target (float): largest acceptable standard error of a correlation entry. Default is None.
+            n_jobs (int): number of threads for method='kendall_fast'.
+
+        Returns:
+            corr_matrix_np (np.array): correlation matrix estimated on the subsample. 
+            Standard errors are stored in self.correlation_se, and the subsample details in self.correlation_sample_info.
+        """
+
+        n_rows = data_df.shape[0]
+        if (sample_size is None):
+            sample_size = CORRELATION_SAMPLE_SIZE_START
+        size = min(max(int(sample_size), 2 * JACKKNIFE_GROUPS), n_rows)
+
+        rng = self._get_rng()
+        order = ut_.stratified_order(data_df, rng=rng)
+        off_diagonal = ~np.eye(data_df.shape[1], dtype=bool)
+
+        while True:
+            sub_df = data_df.iloc[order[:size]]
+            corr_matrix_np = self._correlation_matrix(sub_df, method=method, n_jobs=n_jobs)
+
+            # delete-a-group jackknife (rows are assigned to equal-sized groups at random)
+            groups = rng.permutation(sub_df.shape[0]) % JACKKNIFE_GROUPS
+            replicates = np.stack([
+                self._correlation_matrix(sub_df.iloc[groups != g], method=method, n_jobs=n_jobs) for g in range(JACKKNIFE_GROUPS)
+            ])
+            se_np = np.sqrt((JACKKNIFE_GROUPS - 1) / JACKKNIFE_GROUPS * ((replicates - replicates.mean(axis=0)) ** 2).sum(axis=0))
+            max_se = float(se_np[off_diagonal].max()) if off_diagonal.any() else 0.0
+
+            if (self.debug):
+                print(f"Correlation subsample size={size}/{n_rows}, max. standard error={max_se:.4f}")
+
+            if (se_target is None) or (max_se <= se_target) or (size >= n_rows):
+                break
+            size = min(2 * size, n_rows)
 
-    def fit(self, data, marginal_dist_dict=None):
+        self.correlation_se = pd.DataFrame(se_np, index=data_df.columns, columns=data_df.columns)
+        self.correlation_sample_info = {
+            'sample_size': size,
+            'n_rows': n_rows,
+            'max_se': max_se,
+            'se_target': se_target,
+            'target_met': (se_target is None) or (max_se <= se_target),
+        }
+
+        return corr_matrix_np
+
+
+    def compute_correlation_factors(self, data, n_factors=10):
+        """
+        Fit a low-rank-plus-diagonal correlation matrix L @ L.T + diag(D) to the normal scores of the data, without forming the dense d x d matrix.
+
+        The normal scores norm.ppf(F_j(x_j)) (fitted marginals, at the middle of the probability step for 'discrete' marginals, missing values set to 0) are standardised, and the loadings L are the top n_factors 
+        principal components of their correlation, from a randomized SVD of the n x d score matrix (ut_.randomized_svd, O(n d k)). 
+        PD repair is done in factor form: rows of L are shrunk where needed so that every uniqueness D_j = 1 - sum_k L_jk^2 is at least EPSILON, 
+        which keeps a unit diagonal and a positive definite matrix.
+
+        Args:
+            data (dataframe): training data (columns in the order of self.var_names)
+            n_factors (int): number of factors k.
+
+        Returns:
+            correlation_factors (dict): {'loadings': L (pd.DataFrame, d x k), 'uniqueness': D (pd.Series, d)}
+        """
+
+        if (self.debug):
+            print(f"Correlation Fitting Structure=factor, n_factors={n_factors}")
+
+        # Normal scores
+        Z = np.zeros((data.shape[0], len(self.var_names)))
+        for j, var_name in enumerate(self.var_names):
+            var = data[var_name].to_numpy(dtype=float)
+            not_null = ~np.isnan(var)
+            lower, upper = self.univariates[var_name].compute_cdf_step(var[not_null]) # mid-step CDF of 'discrete' marginals, as the mid-ranks of _normal_scores
+            temp_U = np.clip((lower + upper) / 2, EPSILON, 1-EPSILON)
+            Z[not_null, j] = kn_.norm_ppf(temp_U, out=temp_U)
+
+        # Standardise (constant columns stay at 0, so they get no loadings)
+        Z -= Z.mean(axis=0)
+        sd = Z.std(axis=0)
+        sd[sd == 0] = 1
+        Z /= sd * np.sqrt(Z.shape[0])
+
+        n_factors = min(n_factors, Z.shape[0], Z.shape[1])
+        _, singular_values, Vt = ut_.randomized_svd(Z, n_factors, rng=self._get_rng())
+        loadings = Vt.T * singular_values
+
+        # PD repair in factor form: communalities below 1 - EPSILON
+        communality = (loadings ** 2).sum(axis=1)
+        too_large = communality > 1 - EPSILON
+        loadings[too_large] *= np.sqrt((1 - EPSILON) / communality[too_large])[:, None]
+        uniqueness = 1 - (loadings ** 2).sum(axis=1)
+
+        return {
+            'loadings': pd.DataFrame(loadings, index=self.var_names, columns=[f'factor_{i}' for i in range(n_factors)]),
+            'uniqueness': pd.Series(uniqueness, index=self.var_names),
+        }
+
+    def correlation_column(self, var_name):
+        """
+        Return the column of the correlation matrix for var_name (correlations of every variable with var_name), in either correlation structure.
+
+        With one-hot groups, every column of a group has the correlation of the group's latent dimension, and var_name can be any column of the data.
+
+        Args:
+            var_name (str): variable name
+
+        Returns:
+            corr_series (pd.Series): correlations indexed by self.var_names (by self.data_columns with one-hot groups)
+        """
+
+        group_of = self._group_of()
+        latent_name = group_of.get(var_name, var_name)
+
+        if (self.correlation_structure=='factor'):
+            loadings = self.correlation_factors['loadings']
+            corr_series = loadings @ loadings.loc[latent_name]
+            corr_series[latent_name] = 1.0
+        else:
+            corr_series = self.correlation[latent_name]
+
+        if group_of:
+            corr_series = pd.Series(corr_series[[group_of.get(column, column) for column in self.data_columns]].to_numpy(), index=self.data_columns, name=var_name)
+
+        return corr_series
+
+    def fit(self, data, marginal_dist_dict=None, n_jobs=None, transformer_meta_dict=None, group_one_hot=True):
         """
         Compute the distribution for each variable and then its covariance matrix
 
         Args:
             data (dataframe): training data
             marginal_dist_dict (dict, optional): A dictionary where keys are variable names and values are lists of candidate marginal distributions. Defaults to None.
+            n_jobs (int, optional): Number of worker processes used to fit the marginal distributions (one column per task), and of threads used over column pairs when correlation_method='kendall_fast'. None or 1 fits sequentially, -1 uses all available cores. Defaults to None.
+            transformer_meta_dict (dict, optional): Transformer.transformer_meta_dict of data. When given, the output columns of each 'One-Hot' field (and its .is_null column) 
+                are modelled as one categorical latent dimension named after the field: the category code with the exact 'discrete' marginal (categories ordered by their association with the other columns, see _order_one_hot_groups). 
+                A K-level category then adds one row and column to the correlation matrix instead of K. Samples still have the columns of data. 
+                The transformer types also choose the columns with a 'discrete' marginal (see marginal_discrete_max_unique). Defaults to None (no grouping).
+            group_one_hot (bool, optional): Group the one-hot columns described by transformer_meta_dict. If False, they are fitted as separate continuous columns. Defaults to True.
 
         Returns:
             None
@@ -110,48 +573,397 @@ class GaussianCopula:
 
         var_names = []
         univariates = {}
-        if marginal_dist_dict is None:
-            marginal_dist_dict = {}
+        marginal_dist_dict = {} if (marginal_dist_dict is None) else dict(marginal_dist_dict)
 
         self.fitted = True
 
-        for var_name, var in data.items():
+        # One-hot groups: each group becomes one column of category codes
+        self.data_columns = list(data.columns)
+        self.column_groups = None
+        if (transformer_meta_dict is not None) and group_one_hot:
+            groups = _one_hot_groups(transformer_meta_dict, self.data_columns)
+            clashes = [group for group in groups if group in self.data_columns]
+            if clashes:
+                raise Error(f'One-hot group names {clashes} are also column names.')
+            self.column_groups = _order_one_hot_groups(data, groups)
+            data = self._encode_groups(data)
+            marginal_dist_dict = {**marginal_dist_dict, **{group: ["discrete"] for group in self.column_groups}}
 
-            # Initialise MarginalDist
-            if (self.debug):
-                print(f"Fitting var: {var_name}")
-            univariate = MarginalDist(debug=self.debug)
+        # Columns with the 'discrete' marginal: chosen by transformer type when known (binary columns always, unless their candidates are given; one-hot columns never), 
+        # otherwise by the number of distinct values, except for 0/1 columns (possibly one-hot)
+        column_types = {} if (transformer_meta_dict is None) else _transformer_column_types(transformer_meta_dict)
+        discrete_max_unique = {}
+        for var_name, var in data.items():
+            column_type = column_types.get(var_name)
+            if (column_type in BINARY_TRANSFORMER_TYPES):
+                marginal_dist_dict.setdefault(var_name, ["discrete"])
+            elif (column_type is None) and np.isin(var.dropna(), [0, 1]).all():
+                discrete_max_unique[var_name] = None
+            elif (column_type is not None) and (column_type not in DISCRETE_TRANSFORMER_TYPES):
+                discrete_max_unique[var_name] = None
 
-            # Get candidates for Marginal Distributions
+        # Get candidates and options for Marginal Distributions
+        fit_tasks = []
+        for var_name, var in data.items():
             if var_name in marginal_dist_dict:
                 candidates = marginal_dist_dict[var_name]
             else:
                 candidates = None
+            options = {**self._marginal_options(), "discrete_max_unique": discrete_max_unique.get(var_name, self.marginal_discrete_max_unique)}
+            fit_tasks.append((var_name, var, candidates, options))
 
-            # Fit univariate using MarginalDist
-            fit_success = univariate.fit(data=var, candidates=candidates)
-            if (not fit_success):
-                self.fitted = False
-                raise Error(f'Univariate model fitting failed for {var_name}.')
+        # Columns already fitted with the same candidates and options are taken from the cache
+        cache_keys = {}
+        cached = {}
+        if (self.fit_cache is not None):
+            for var_name, var, candidates, options in fit_tasks:
+                cache_keys[var_name] = self.fit_cache.key(var, candidates, options)
+                univariate = self.fit_cache.get(cache_keys[var_name])
+                if (univariate is not None):
+                    cached[var_name] = univariate
+                    if (self.debug):
+                        print(f"Marginal distribution of {var_name} found in fit cache")
+        to_fit = [task for task in fit_tasks if task[0] not in cached]
 
-            # Update array
-            var_names.append(var_name)
-            univariates[var_name] = univariate
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        parallel = (n_jobs is not None) and (n_jobs > 1) and (len(to_fit) > 1)
+
+        if parallel:
+            executor = ProcessPoolExecutor(max_workers=min(n_jobs, len(to_fit)))
+            futures = {var_name: executor.submit(_fit_univariate, var_name, var, candidates, self.debug, **options) for var_name, var, candidates, options in to_fit}
+
+        # Fit univariate using MarginalDist (results are collected in column order)
+        try:
+            for var_name, var, candidates, options in fit_tasks:
+
+                try:
+                    if var_name in cached:
+                        fit_success, univariate = True, cached[var_name]
+                    elif parallel:
+                        fit_success, univariate = futures[var_name].result()
+                    else:
+                        fit_success, univariate = _fit_univariate(var_name, var, candidates, self.debug, **options)
+                except Exception as e:
+                    self.fitted = False
+                    raise Error(f'Univariate model fitting failed for {var_name}: {type(e).__name__}: {e}') from e
+
+                if (not fit_success):
+                    self.fitted = False
+                    raise Error(f'Univariate model fitting failed for {var_name}.')
+
+                if (self.fit_cache is not None) and (var_name not in cached):
+                    self.fit_cache.put(cache_keys[var_name], univariate)
+
+                # Update array
+                var_names.append(var_name)
+                univariates[var_name] = univariate
+        finally:
+            if parallel:
+                executor.shutdown(wait=True, cancel_futures=True)
 
         self.var_names = var_names
         self.univariates = univariates
 
+        if (self.debug) and (self.fit_cache is not None):
+            print(f"Marginal fit cache: {self.fit_cache.stats()}")
+
         # Compute correlation matrix
-        if (self.correlation is None):
-            self.correlation = self.compute_correlation(data, method=self.correlation_method)
+        if (self.correlation_structure=='factor'):
+            self.correlation_factors = self.compute_correlation_factors(data, n_factors=self.n_factors)
+        elif (self.correlation is None):
+            self.correlation = self.compute_correlation(data, method=self.correlation_method, n_jobs=n_jobs, sample_size=self.correlation_sample_size, se_target=self.correlation_se_target)
+
+        # Factorizations cached from a previous fit are no longer valid
+        self.clear_conditional_cache()
+        self.cholesky = None
+        if (self.correlation_structure!='factor'):
+            self._correlation_cholesky()
+
+        # Statistics of an earlier partial_fit() do not describe this fit
+        self.partial_fit_stats = None
 
+    def _marginal_options(self):
+        """Options passed to MarginalDist when fitting the marginal distributions."""
+
+        return {
+            "kde_binned_threshold": self.kde_binned_threshold,
+            "n_jobs": self.marginal_n_jobs,
+            "selection": self.marginal_selection,
+            "selection_sample_size": self.marginal_sample_size,
+            "selection_top_k": self.marginal_top_k,
+            "ppf_table_tol": self.marginal_ppf_table_tol,
+            "sketch_k": self.sketch_k,
+            "discrete_max_unique": self.marginal_discrete_max_unique,
+            "candidate_timeout": self.marginal_candidate_timeout
+        }
+
+    def partial_fit(self, batch):
+        """
+        Update the model with a new batch of data, without revisiting earlier batches (cost is O(batch)).
+
+        Mergeable statistics are kept in self.partial_fit_stats:
+            - per column: count, sum, sum of squares, min, max and a QuantileSketch of the values;
+            - for the correlation: pairwise counts, sums, sums of squares and cross-products of the normal scores norm.ppf(F(x)), 
+              where F is the column's sketch after including the batch.
+        Marginals are empirical ('emp') distributions built from the sketches, and the correlation is the (pairwise) Pearson correlation 
+        of the normal scores. Normal scores of earlier batches are not recomputed as the marginals are refined, so small first batches give 
+        a slightly less accurate correlation than fit().
+
+        Args:
+            batch (dataframe): new training data, with the same columns as earlier batches.
+
+        Returns:
+            self
         
+        Raises:
+            Error: If the batch columns differ from the columns of earlier batches.
+        """
 
-    def conditional_Gaussian(self, conditions):
-        """Compute the parameters (mean, covariance) of a conditional multivariate normal distribution.
-        Takes in a pd.series variable: conditions"""
+        if (self.correlation_structure=='factor'):
+            raise Error("partial_fit() supports correlation_structure='dense' only.")
+
+        batch = pd.DataFrame(batch)
+
+        if (self.partial_fit_stats is None):
+            self.var_names = list(batch.columns)
+            self.data_columns = self.var_names
+            self.column_groups = None
+            self.partial_fit_stats = self._empty_partial_fit_stats(self.var_names)
+        elif (set(batch.columns) != set(self.var_names)):
+            raise Error(f'Batch columns {list(batch.columns)} do not match the fitted columns {self.var_names}.')
+
+        X = batch[self.var_names].to_numpy(dtype=float)
+        mask = ~np.isnan(X)
+        Z = np.zeros(X.shape)
+
+        # Per-column statistics
+        for j, var_name in enumerate(self.var_names):
+            col_stats = self.partial_fit_stats['columns'][var_name]
+            var = X[mask[:, j], j]
+            if (var.size == 0):
+                continue
+
+            col_stats['count'] += var.size
+            col_stats['sum'] += var.sum()
+            col_stats['sum_sq'] += (var ** 2).sum()
+            col_stats['min'] = min(col_stats['min'], var.min())
+            col_stats['max'] = max(col_stats['max'], var.max())
+            col_stats['sketch'].update(var)
+
+            Z[mask[:, j], j] = self._normal_scores(col_stats['sketch'], var)
+
+        # Normal-score cross-products (missing values contribute 0 and are excluded from the pairwise counts)
+        M = mask.astype(float)
+        cross = self.partial_fit_stats['cross']
+        cross['count'] += M.T @ M
+        cross['sum'] += Z.T @ M
+        cross['sum_sq'] += (Z ** 2).T @ M
+        cross['prod'] += Z.T @ Z
+
+        self.partial_fit_stats['n_rows'] += X.shape[0]
+
+        self._fit_from_partial_stats()
+
+        return self
+
+    def merge(self, other):
+        """
+        Merge the partial_fit() statistics of another model (e.g. fitted on a disjoint shard of the data) into this one, and refit.
+
+        Args:
+            other (GaussianCopula): a model fitted with partial_fit() on the same columns (unchanged).
+
+        Returns:
+            self
+        
+        Raises:
+            Error: If either model has no partial_fit() statistics, or if their columns differ.
+        """
+
+        if (self.partial_fit_stats is None) or (other.partial_fit_stats is None):
+            raise Error('Both models must be fitted with partial_fit() to be merged.')
+        if (set(other.var_names) != set(self.var_names)):
+            raise Error(f'Cannot merge models fitted on different columns: {self.var_names} and {other.var_names}.')
+
+        for var_name in self.var_names:
+            col_stats = self.partial_fit_stats['columns'][var_name]
+            other_stats = other.partial_fit_stats['columns'][var_name]
+            for key in ['count', 'sum', 'sum_sq']:
+                col_stats[key] += other_stats[key]
+            col_stats['min'] = min(col_stats['min'], other_stats['min'])
+            col_stats['max'] = max(col_stats['max'], other_stats['max'])
+            col_stats['sketch'].merge(other_stats['sketch'])
+
+        # align the other model's column order
+        order = [other.var_names.index(var_name) for var_name in self.var_names]
+        cross = self.partial_fit_stats['cross']
+        for key in ['count', 'sum', 'sum_sq', 'prod']:
+            cross[key] += other.partial_fit_stats['cross'][key][np.ix_(order, order)]
+
+        self.partial_fit_stats['n_rows'] += other.partial_fit_stats['n_rows']
+
+        self._fit_from_partial_stats()
+
+        return self
+
+    def _empty_partial_fit_stats(self, var_names):
+        """Initial (empty) partial_fit() statistics for the given columns."""
+
+        d = len(var_names)
+        return {
+            'n_rows': 0,
+            'columns': {
+                var_name: {'count': 0, 'sum': 0.0, 'sum_sq': 0.0, 'min': np.inf, 'max': -np.inf, 'sketch': QuantileSketch(k=self.sketch_k, seed=j)}
+                for j, var_name in enumerate(var_names)
+            },
+            'cross': {key: np.zeros((d, d)) for key in ['count', 'sum', 'sum_sq', 'prod']},
+        }
+
+    def _normal_scores(self, sketch, var):
+        """Normal scores norm.ppf(F(var)) using the mid-rank CDF estimated by a QuantileSketch."""
+
+        u = (sketch.cdf(var, side='left') + sketch.cdf(var, side='right')) / 2
+        u = np.clip(u, 0.5 / sketch.n, 1 - 0.5 / sketch.n)
+
+        return kn_.norm_ppf(u, out=u)
+
+    def _fit_from_partial_stats(self):
+        """Rebuild the marginals and the correlation matrix from self.partial_fit_stats."""
+
+        univariates = {}
+        for var_name in self.var_names:
+            univariate = MarginalDist(debug=self.debug)
+            if not univariate.fit_from_sketch(self.partial_fit_stats['columns'][var_name]['sketch']):
+                self.fitted = False
+                raise Error(f'Univariate model fitting failed for {var_name}: no data.')
+            univariates[var_name] = univariate
+        self.univariates = univariates
+
+        # Pairwise Pearson correlation of the normal scores
+        cross = self.partial_fit_stats['cross']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            count = cross['count']
+            mean_i = cross['sum'] / count
+            mean_j = cross['sum'].T / count
+            cov = cross['prod'] / count - mean_i * mean_j
+            var_i = cross['sum_sq'] / count - mean_i ** 2
+            var_j = cross['sum_sq'].T / count - mean_j ** 2
+            corr_matrix_np = cov / np.sqrt(var_i * var_j)
+
+        corr_matrix_np = np.nan_to_num(np.clip(corr_matrix_np, -1, 1), nan=0.0)
+        np.fill_diagonal(corr_matrix_np, 1.0)
+
+        # If correlation matrix is not positive definite, make it so
+        corr_matrix_np = ut_.makePD(corr_matrix_np)
+        self.correlation = pd.DataFrame(corr_matrix_np, index=self.var_names, columns=self.var_names)
+
+        self.fitted = True
+        self.clear_conditional_cache()
+        self.cholesky = None
+        self._correlation_cholesky()
+
+    def _correlation_model(self):
+        """Return the object describing the current correlation (self.correlation, or self.correlation_factors in factor form)."""
+
+        if (self.correlation_structure=='factor'):
+            return self.correlation_factors
+        return self.correlation
+
+    def _correlation_cholesky(self):
+        """Return the Cholesky factor of self.correlation, recomputing it only if the correlation matrix has been replaced."""
+
+        if (self.cholesky is None) or (self._cholesky_correlation is not self.correlation):
+            self.cholesky = ut_.cholesky_factor(self.correlation.to_numpy())
+            self._cholesky_correlation = self.correlation
+
+        return self.cholesky
+
+    def _get_rng(self):
+        """Return the numpy.random.Generator used for sampling."""
+
+        if self.rng is not None:
+            return self.rng
+
+        # derive a generator from the global (legacy) numpy random state
+        return np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
+
+    def _standard_normal(self, size, dim, rng=None):
+        """Draw a (size, dim) array of independent standard normal samples."""
+
+        if rng is None:
+            rng = self._get_rng()
+        dtype = np.float32 if self.sample_float32 else np.float64
+
+        return rng.standard_normal(size=(size, dim), dtype=dtype)
+
+    def clear_conditional_cache(self):
+        """Empty the cache of conditional Gaussian factorizations. Hit/miss counters are kept."""
+
+        self._conditional_cache = OrderedDict()
+        self._conditional_cache_correlation = self._correlation_model() # correlation model that the cached entries were computed from
+
+    def conditional_cache_info(self):
+        """Return the hit/miss counters and current size of the conditional Gaussian cache."""
+
+        return {
+            "hits": self.conditional_cache_hits,
+            "misses": self.conditional_cache_misses,
+            "size": len(self._conditional_cache),
+            "max_size": self.conditional_cache_size
+        }
+
+    def _conditional_factors(self, columns2):
+        """
+        Compute (or fetch from the LRU cache) the factorization of the conditional multivariate normal distribution given the variables in columns2.
+
+        Args:
+            columns2 (list): conditioning variables
+
+        Returns:
+            factors (dict): {
+                "columns1": pd.Index of the remaining (sampled) variables,
+                "columns2": pd.Index of the conditioning variables, in the order expected by "projection",
+                "projection": sigma12 @ inv(sigma22),
+                "sigma_bar": conditional covariance (sigma11 - sigma12 @ inv(sigma22) @ sigma21),
+                "cholesky": lower-triangular factor of sigma_bar
+            }
+            In factor form (see self._conditional_factors_lowrank), the entries describe the posterior of the factors instead.
+        """
+
+        key = tuple(sorted(columns2))
+
+        with self._conditional_cache_lock:
+            # Invalidate cache if the correlation matrix has been replaced since the entries were computed
+            if self._conditional_cache_correlation is not self._correlation_model():
+                self._conditional_cache = OrderedDict()
+                self._conditional_cache_correlation = self._correlation_model()
+
+            if key in self._conditional_cache:
+                self.conditional_cache_hits += 1
+                self._conditional_cache.move_to_end(key)
+                return self._conditional_cache[key]
+
+            self.conditional_cache_misses += 1
+
+        columns2 = pd.Index(key)
+
+        if (self.correlation_structure=='factor'):
+            factors = self._conditional_factors_lowrank(columns2)
+        else:
+            factors = self._conditional_factors_dense(columns2)
+
+        if (self.conditional_cache_size > 0):
+            with self._conditional_cache_lock:
+                self._conditional_cache[key] = factors
+                if len(self._conditional_cache) > self.conditional_cache_size:
+                    self._conditional_cache.popitem(last=False) # evict least recently used
+
+        return factors
+
+    def _conditional_factors_dense(self, columns2):
+        """Factorization of the conditional multivariate normal distribution (Schur complement of the dense correlation matrix)."""
 
-        columns2 = conditions.index
         columns1 = self.correlation.columns.difference(columns2)
 
         sigma11 = self.correlation.loc[columns1, columns1].to_numpy()
@@ -159,15 +971,281 @@ class GaussianCopula:
         sigma21 = self.correlation.loc[columns2, columns1].to_numpy()
         sigma22 = self.correlation.loc[columns2, columns2].to_numpy()
 
-        mu1 = np.zeros(len(columns1))
-        mu2 = np.zeros(len(columns2))
-
         sigma12sigma22inv = sigma12 @ np.linalg.inv(sigma22)
-
-        mu_bar = mu1 + sigma12sigma22inv @ (conditions - mu2)
         sigma_bar = sigma11 - sigma12sigma22inv @ sigma21
 
-        return mu_bar, sigma_bar, columns1
+        factors = {
+            "columns1": columns1,
+            "columns2": columns2,
+            "projection": sigma12sigma22inv,
+            "sigma_bar": sigma_bar,
+            "cholesky": ut_.cholesky_factor(sigma_bar)
+        }
+
+        return factors
+
+    def _conditional_factors_lowrank(self, columns2):
+        """
+        Factorization of the conditional multivariate normal distribution in factor form, for X = L f + e with f ~ N(0, I_k) and e ~ N(0, diag(D)).
+
+        Given X_2 = x_2, the factors have posterior f | x_2 ~ N(G @ x_2, inv(P)), with P = I_k + L_2.T @ inv(D_2) @ L_2 and G = inv(P) @ L_2.T @ inv(D_2) 
+        (the Woodbury form of sigma12 @ inv(sigma22)), and X_1 = L_1 f + e_1. Only k x k matrices are inverted.
+
+        Returns:
+            factors (dict): {
+                "columns1", "columns2": as in self._conditional_factors,
+                "posterior_projection": G (k x m),
+                "posterior_covariance": inv(P) (k x k),
+                "posterior_cholesky": lower-triangular factor of inv(P),
+                "loadings1": L_1 (d1 x k),
+                "sd1": sqrt(D_1)
+            }
+        """
+
+        loadings = self.correlation_factors['loadings']
+        uniqueness = self.correlation_factors['uniqueness']
+        columns1 = loadings.index.difference(columns2)
+
+        L1 = loadings.loc[columns1].to_numpy()
+        L2 = loadings.loc[columns2].to_numpy()
+        D2 = uniqueness.loc[columns2].to_numpy()
+
+        L2tD2inv = (L2 / D2[:, None]).T
+        posterior_covariance = np.linalg.inv(np.eye(L1.shape[1]) + L2tD2inv @ L2)
+        posterior_covariance = (posterior_covariance + posterior_covariance.T) / 2
+
+        factors = {
+            "columns1": columns1,
+            "columns2": columns2,
+            "posterior_projection": posterior_covariance @ L2tD2inv,
+            "posterior_covariance": posterior_covariance,
+            "posterior_cholesky": ut_.cholesky_factor(posterior_covariance),
+            "loadings1": L1,
+            "sd1": np.sqrt(uniqueness.loc[columns1].to_numpy())
+        }
+
+        return factors
+
+    def _normal_samples(self, size):
+        """Draw (size, d) samples of the joint Gaussian distribution Phi(0, P), in the order of self.var_names."""
+
+        if (self.correlation_structure=='factor'):
+            # X = F @ L.T + sqrt(D) * E, with F (size x k) and E (size x d) i.i.d. standard normal
+            loadings = self.correlation_factors['loadings'].to_numpy()
+            sd = np.sqrt(self.correlation_factors['uniqueness'].to_numpy())
+
+            std_normal_np = self._standard_normal(size, loadings.shape[1])
+            norm_samples_np = std_normal_np @ loadings.T.astype(std_normal_np.dtype, copy=False)
+            norm_samples_np += self._standard_normal(size, loadings.shape[0]) * sd.astype(std_normal_np.dtype, copy=False)
+        else:
+            # X = Z @ L.T, where L @ L.T = P and Z is i.i.d. standard normal
+            cholesky = self._correlation_cholesky()
+
+            std_normal_np = self._standard_normal(size, len(self.var_names))
+            norm_samples_np = std_normal_np @ cholesky.T.astype(std_normal_np.dtype, copy=False)
+
+        return norm_samples_np
+
+    def _conditional_normal_samples(self, factors, conditions_np, size):
+        """
+        Draw (size, d1) samples of the conditional Gaussian distribution described by factors (see self._conditional_factors).
+        conditions_np holds the normal scores of factors["columns2"], either one vector shared by all samples or one row per sample (size x m).
+        """
+
+        if (self.correlation_structure=='factor'):
+            # f = G @ x_2 + chol(inv(P)) @ z, X_1 = L_1 @ f + sqrt(D_1) * e
+            factor_samples_np = conditions_np @ factors["posterior_projection"].T + self._standard_normal(size, factors["posterior_cholesky"].shape[0]) @ factors["posterior_cholesky"].T
+            norm_samples_np = factor_samples_np @ factors["loadings1"].T + self._standard_normal(size, len(factors["columns1"])) * factors["sd1"]
+        else:
+            # X_1 = mu_bar + L @ Z, where L @ L.T = sigma_bar
+            means = conditions_np @ factors["projection"].T
+            norm_samples_np = means + self._standard_normal(size, len(factors["columns1"])) @ factors["cholesky"].T
+
+        return norm_samples_np
+
+    def _condition_normal_scores(self, conditions, var_names, size):
+        """
+        Normal scores of the conditions on var_names (in that order), for self._conditional_normal_samples.
+        A value of a 'discrete' marginal stands for the whole probability step [F(x-), F(x)], so its score is drawn per sample from the standard normal 
+        truncated to the step (norm.ppf of a uniform draw on the step). Taking the upper end F(x) instead would pin e.g. the largest value at the 1 - EPSILON clip (z = 5.3).
+        Inputs:
+            conditions (dict): {var_name: value} or {var_name: array of values, one per sample}
+            var_names (list): conditioned variables
+            size (int): number of samples
+        Returns:
+            conditions_np (ndarray): one vector of scores shared by all samples (m, ), or one row per sample (size x m) with per-sample values or 'discrete' conditions
+        """
+
+        rng = None
+        scores = []
+        for var_name in var_names:
+            univariate = self.univariates[var_name]
+            values = np.asarray(conditions[var_name], dtype=float)
+            if (univariate.fitted_marginal_dist == 'discrete'):
+                if rng is None:
+                    rng = self._get_rng()
+                lower, upper = univariate.compute_cdf_step(values)
+                temp_U = lower + (upper - lower) * rng.uniform(size=size)
+            else:
+                temp_U = univariate.compute_cdf(values)
+            temp_U = np.clip(temp_U, EPSILON, 1-EPSILON)
+            scores.append(kn_.norm_ppf(temp_U))
+
+        if all(np.ndim(score) == 0 for score in scores):
+            return np.array(scores, dtype=float)
+        return np.column_stack([np.broadcast_to(score, (size, )) for score in scores])
+
+    def _group_of(self):
+        """{one-hot column: group name} of the one-hot groups (empty without grouping)"""
+
+        return {column: group for group, columns in (self.column_groups or {}).items() for column in columns}
+
+    def _encode_groups(self, data):
+        """Data with the columns of each one-hot group replaced by the group's category code (position of the hot column in self.column_groups[group])"""
+
+        group_of = self._group_of()
+        encoded = {}
+        for column in data.columns:
+            group = group_of.get(column)
+            if (group is None):
+                encoded[column] = data[column]
+            elif (group not in encoded):
+                encoded[group] = pd.Series(np.argmax(data[self.column_groups[group]].to_numpy(dtype=float), axis=1).astype(float), index=data.index)
+
+        return pd.DataFrame(encoded, index=data.index)
+
+    def _latent_conditions(self, conditions):
+        """
+        Conditions on data columns as conditions on self.var_names: the columns of a one-hot group become the group's category code.
+        With all columns of a group given, the code is that of the largest value (as in Transformer.reverse()); with some columns, 
+        the group is conditioned only if one of them is hot (> 0.5) in every row.
+        Inputs:
+            conditions (dict): {column: value} or {column: array of values, one per sample}
+        Returns:
+            latent_conditions (dict): {var_name: value(s)}
+        """
+
+        group_of = self._group_of()
+        if not group_of:
+            return conditions
+
+        latent_conditions = {}
+        for var_name, value in conditions.items():
+            group = group_of.get(var_name)
+            if (group is None):
+                latent_conditions[var_name] = value
+            elif (group not in latent_conditions):
+                codes = [code for code, column in enumerate(self.column_groups[group]) if column in conditions]
+                values = np.column_stack([np.atleast_1d(np.asarray(conditions[self.column_groups[group][code]], dtype=float)) for code in codes])
+                if (len(codes) == len(self.column_groups[group])) or (values.max(axis=1) > 0.5).all():
+                    group_codes = np.asarray(codes, dtype=float)[np.argmax(values, axis=1)]
+                    latent_conditions[group] = group_codes[0] if (np.ndim(value) == 0) else group_codes
+
+        return latent_conditions
+
+    def _inverse_transform(self, norm_samples_np, columns, fixed=None, index=None):
+        """
+        Synthetic data D_j = F^{-1}_j(phi(X_j)) of all columns in one pass: the standard normal CDF phi is applied to the whole array at once, and the marginals with 
+        a parametric kernel (kernels_.KERNELS) are grouped by family, so that each family's ppf is a single vectorized call with one parameter per column. 
+        'discrete' marginals skip phi: their values are found by thresholding the normal scores at phi^{-1} of the cumulative probabilities (one comparison 
+        for binary columns). Other marginals (grids, degenerate, tabulated ppfs) use compute_ppf column by column. Category codes of one-hot groups are 
+        decoded into their one-hot columns. Results are written into one preallocated array; pandas is only used for the returned dataframe.
+        Inputs:
+            norm_samples_np (np.ndarray): (n, len(columns)) normal samples, overwritten if float64
+            columns (list): names of the columns of norm_samples_np (in self.var_names)
+            fixed (dict, optional): {var_name: value(s)} of the variables that are not sampled (conditions), a scalar or n values
+            index (pd.Index, optional): index of the returned dataframe
+        Returns:
+            syn_samples_df (pd.DataFrame): n rows, columns in the order of self.data_columns
+        """
+
+        fixed = {} if fixed is None else fixed
+        size = norm_samples_np.shape[0]
+        groups = self.column_groups or {}
+        output_columns = self.data_columns if groups else self.var_names
+        position = {column: j for j, column in enumerate(output_columns)}
+
+        output = np.empty((size, len(output_columns)))
+        other_dtypes = {} #columns whose values are not float (e.g. integer conditions or degenerate values), set after the dataframe is built
+
+        def store(var_name, values):
+            if (var_name in groups):
+                # one-hot decoding of the category codes
+                group_positions = np.array([position[column] for column in groups[var_name]])
+                output[:, group_positions] = 0
+                output[np.arange(size), group_positions[np.asarray(values, dtype=int)]] = 1
+                return
+            output[:, position[var_name]] = values
+            if (np.asarray(values).dtype != np.float64):
+                other_dtypes[var_name] = values
+
+        # Discrete marginals: x_k where phi^{-1}(u_{k-1}) < z <= phi^{-1}(u_k), read before the normals are overwritten
+        families = {}
+        other = []
+        for i, var_name in enumerate(columns):
+            univariate = self.univariates[var_name]
+            dist = univariate.fitted_marginal_dist
+            if (dist == 'discrete'):
+                table = univariate.params['discrete']
+                thresholds = kn_.norm_ppf(np.asarray(table['u'][:-1], dtype=float))
+                if (len(thresholds) == 1):
+                    store(var_name, np.where(norm_samples_np[:, i] > thresholds[0], table['x'][1], table['x'][0]))
+                else:
+                    store(var_name, np.asarray(table['x'])[np.searchsorted(thresholds, norm_samples_np[:, i], side='left')])
+            elif (dist in kn_.KERNELS) and (univariate.params.get("ppf_table") is None) and (var_name not in groups):
+                families.setdefault(dist, []).append(i)
+            else:
+                other.append(i)
+
+        # U = phi(X) of the remaining columns, in place unless the normals are float32 (u close to 1 would round to 1)
+        needed = other + [i for src in families.values() for i in src]
+        if (len(needed) == len(columns)):
+            U = kn_.norm_cdf(norm_samples_np, out=norm_samples_np if (norm_samples_np.dtype == np.float64) else None)
+            column_of = np.arange(len(columns))
+        else:
+            U = kn_.norm_cdf(norm_samples_np[:, needed])
+            column_of = np.empty(len(columns), dtype=int)
+            column_of[needed] = np.arange(len(needed))
+
+        for i in other:
+            store(columns[i], self.univariates[columns[i]].compute_ppf(U[:, column_of[i]]))
+
+        for dist, src in families.items():
+            params = {key: np.array([self.univariates[columns[i]].params[key] for i in src], dtype=float) for key in ["loc", "scale"] + kn_.SHAPE_PARAMS[dist]}
+            block = U[:, column_of[src]] #copy, transformed in place
+            output[:, [position[columns[i]] for i in src]] = kn_.ppf(dist, params, block, out=block)
+
+        for var_name, values in fixed.items():
+            values = np.broadcast_to(values, (size, )) if np.ndim(values) == 0 else np.asarray(values)
+            if (var_name in groups) or (values.dtype == np.float64):
+                store(var_name, values)
+            else:
+                other_dtypes[var_name] = values
+
+        syn_samples_df = pd.DataFrame(output, columns=output_columns, index=index)
+        for var_name, values in other_dtypes.items():
+            syn_samples_df[var_name] = np.array(values)
+
+        return syn_samples_df
+
+    def conditional_Gaussian(self, conditions):
+        """Compute the parameters (mean, covariance) of a conditional multivariate normal distribution.
+        Takes in a pd.series variable: conditions"""
+
+        factors = self._conditional_factors(conditions.index)
+        conditions = conditions[factors["columns2"]].to_numpy(dtype=float)
+
+        # mu1, mu2 are zero vectors for the standard copula
+        if (self.correlation_structure=='factor'):
+            # dense d1 x d1 covariance, formed on request only (sampling stays in factor form)
+            L1 = factors["loadings1"]
+            mu_bar = L1 @ (factors["posterior_projection"] @ conditions)
+            sigma_bar = L1 @ factors["posterior_covariance"] @ L1.T + np.diag(factors["sd1"] ** 2)
+        else:
+            mu_bar = factors["projection"] @ conditions
+            sigma_bar = factors["sigma_bar"]
+
+        return mu_bar, sigma_bar, factors["columns1"]
 
     def sample(self, size=1, conditions=None):
         """
@@ -175,7 +1253,7 @@ class GaussianCopula:
         Args:
             size (int): The number of synthetic samples to generate.
             conditions (dict): A dictionary containing values for conditional variables in the form of {variable_name: value}. 
-            If no conditions are specified, the full joint Gaussian distribution will be used.
+            If no conditions are specified, the full joint Gaussian distribution will be used. The columns of a one-hot group condition on the group's category.
         Returns:
             syn_samples_df (pd.DataFrame): A dataframe containing the synthetic samples.
         Raises:
@@ -185,49 +1263,192 @@ class GaussianCopula:
         # check fit
         if not self.fitted:
             raise Error('Model must be fitted before sampling.')
+
+        if conditions is not None:
+            conditions = self._latent_conditions(conditions)
         
         # Generate a multivariate random number vector (X_1, \dots, X_m) in an arbitrary domain following the Gaussian joint distribution \Phi(0,P) [P=correlation matrix]
         if conditions is None:
-            # means = np.zero(len(self.var_names))
-            means = None
-            correlation_matrix = self.correlation
             sampled_var_names = self.var_names
+            norm_samples_np = self._normal_samples(size)
         else: # generate conditional Gaussian distribution
-            norm_conv_dict={}
-            for var_name in conditions: # convert to normal distribution using marginal probability integral transform
-                
-                if var_name in self.var_names:
-                    univariate = self.univariates[var_name]
-                    temp_U = univariate.cdf_wrapper(data=conditions[var_name]).clip(EPSILON, 1-EPSILON)
-                    norm_conv_dict[var_name] = stats.norm.ppf(temp_U)
-            conditions_norm_pdseries = pd.Series(norm_conv_dict)
-            means, correlation_matrix, sampled_var_names = self.conditional_Gaussian(conditions_norm_pdseries)
-
-
-        norm_samples_np = stats.multivariate_normal.rvs(mean=means, cov=correlation_matrix, size=size)
-        if (size==1):
-            norm_samples_np = norm_samples_np.reshape(1,-1)
-        norm_samples_df = pd.DataFrame(norm_samples_np, columns=sampled_var_names)
+            cond_var_names = [var_name for var_name in conditions if var_name in self.var_names]
+
+            # Sample from the cached factorization, with the conditions converted to normal scores (marginal probability integral transform)
+            factors = self._conditional_factors(cond_var_names)
+            sampled_var_names = factors["columns1"]
+            conditions_np = self._condition_normal_scores(conditions, factors["columns2"], size)
+            norm_samples_np = self._conditional_normal_samples(factors, conditions_np, size)
 
         # Transform (X_1, \dots, X_m) to (U_1, \dots, U_m) \in [0,1] where U_j = \phi(X_j) [\phi is the standard Gaussian distribution]
         # Compute synthetic data D_j = F^{-1}_j(U_j)
-        output = {}
+        fixed = None if conditions is None else {var_name: conditions[var_name] for var_name in self.var_names if var_name in conditions}
+        syn_samples_df = self._inverse_transform(norm_samples_np, sampled_var_names, fixed=fixed)
+
+        return syn_samples_df
+
+    def sample_iter(self, total_size, chunk_size=100000, conditions=None):
+        """
+        Generates synthetic data from a fitted Gaussian Copula Model in chunks, so that peak memory is bounded by chunk_size rather than total_size.
+        Args:
+            total_size (int): The total number of synthetic samples to generate.
+            chunk_size (int): The maximum number of synthetic samples in each chunk. Default is 100000.
+            conditions (dict): A dictionary containing values for conditional variables in the form of {variable_name: value} (see self.sample()).
+        Yields:
+            syn_samples_df (pd.DataFrame): A dataframe containing the next chunk of synthetic samples. The index runs continuously across chunks.
+        Raises:
+            Error: If the model has not been fitted yet.
+        """
+
+        # check fit
+        if not self.fitted:
+            raise Error('Model must be fitted before sampling.')
+
+        if (chunk_size < 1):
+            raise ValueError('chunk_size must be a positive integer.')
+
+        start = 0
+        while start < total_size:
+            size = min(chunk_size, total_size - start)
+
+            syn_samples_df = self.sample(size=size, conditions=conditions)
+            syn_samples_df.index = pd.RangeIndex(start, start + size)
+
+            yield syn_samples_df
+
+            start += size
+
+    def sample_conditional_batch(self, conditions_df):
+        """
+        Generates one synthetic sample per row of conditions_df, conditioning each row on its own covariate values.
+        Equivalent to calling self.sample(size=1, conditions=row.to_dict()) for every row, but computed in a single vectorized pass.
+        Args:
+            conditions_df (pd.DataFrame): A dataframe where each column is a conditional variable and each row holds the values to condition on.
+            Columns not found in self.var_names (or in a one-hot group) are ignored. If no columns remain, unconditional samples are drawn.
+        Returns:
+            syn_samples_df (pd.DataFrame): A dataframe containing the synthetic samples, with the same index as conditions_df.
+        Raises:
+            Error: If the model has not been fitted yet.
+        """
+
+        # check fit
+        if not self.fitted:
+            raise Error('Model must be fitted before sampling.')
+
+        size = len(conditions_df)
+        conditions = self._latent_conditions({var_name: conditions_df[var_name].to_numpy() for var_name in conditions_df.columns})
+        cond_var_names = [var_name for var_name in conditions if var_name in self.var_names]
+
+        if (size == 0):
+            return pd.DataFrame(columns=self.data_columns if self.column_groups else self.var_names, index=conditions_df.index, dtype=float)
+
+        if (len(cond_var_names) == 0):
+            syn_samples_df = self.sample(size=size)
+            syn_samples_df.index = conditions_df.index
+            return syn_samples_df
+
+        # The conditional covariance is the same for every row, only the conditional mean changes
+        # (conditions converted to normal scores using marginal probability integral transform)
+        factors = self._conditional_factors(cond_var_names)
+        conditions_np = self._condition_normal_scores(conditions, factors["columns2"], size)
+        norm_samples_np = self._conditional_normal_samples(factors, conditions_np, size) # one conditional mean per row
+
+        # Compute synthetic data D_j = F^{-1}_j(\phi(X_j)), keeping conditional variables fixed
+        fixed = {var_name: conditions[var_name] for var_name in cond_var_names}
+        syn_samples_df = self._inverse_transform(norm_samples_np, factors["columns1"], fixed=fixed, index=conditions_df.index)
+
+        return syn_samples_df
+
+    def export_model(self, path):
+        """
+        Write only what sampling needs to the directory path: the correlation matrix (and its Cholesky factor) or the correlation factors, 
+        the parameters of each marginal distribution, their interpolation grids and ppf tables. Training data, KDE models and partial_fit statistics are not stored.
+        The arrays are written as .npy files (all grids concatenated in grid_x.npy/grid_u.npy), the rest in meta.json. Load with load_model(path).
+        Args:
+            path (str): output directory (created if needed, existing model files are overwritten)
+        Returns:
+            path (str): the output directory
+        Raises:
+            Error: If the model has not been fitted yet.
+        """
+
+        # check fit
+        if not self.fitted:
+            raise Error('Model must be fitted before exporting.')
+
+        os.makedirs(path, exist_ok=True)
+
+        def _save(name, array):
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array, dtype=float))
+
+        # Marginal distributions
+        marginals = {}
+        grids_x = []
+        grids_u = []
+        grid_start = 0
+        tables_z = []
+        tables_x = []
+        table_start = 0
         for var_name in self.var_names:
             univariate = self.univariates[var_name]
-            if conditions is None:
-                U_j = stats.norm.cdf(norm_samples_df[var_name])
-                output[var_name] = univariate.ppf_wrapper(data=U_j)
-            else:
-                if var_name in conditions:
-                    output[var_name] = np.full(size, conditions[var_name])
-                else:
-                    U_j = stats.norm.cdf(norm_samples_df[var_name])
-                    output[var_name] = univariate.ppf_wrapper(data=U_j)
+            dist = univariate.fitted_marginal_dist
 
-        syn_samples_df = pd.DataFrame(data=output)
+            params = {}
+            for param in MODEL_SCALAR_PARAMS:
+                value = univariate.params.get(param)
+                params[param] = None if value is None else float(value)
+            marginal_meta = {"dist": dist, "params": params}
 
+            if (dist in MODEL_GRID_PARAMS):
+                grid = univariate.params[MODEL_GRID_PARAMS[dist]]
+                grids_x.append(np.asarray(grid["x"], dtype=float))
+                grids_u.append(np.asarray(grid["u"], dtype=float))
+                marginal_meta["grid"] = [grid_start, grid_start + len(grids_x[-1])]
+                marginal_meta["sorted"] = bool(grid.get("sorted", False))
+                grid_start += len(grids_x[-1])
 
-        return syn_samples_df
+            table = univariate.params.get("ppf_table")
+            if (table is not None):
+                tables_z.append(np.asarray(table["z"], dtype=float))
+                tables_x.append(np.asarray(table["x"], dtype=float))
+                marginal_meta["ppf_table"] = {"table": [table_start, table_start + len(tables_z[-1])], "tol": float(table["tol"]), "max_error": float(table["max_error"])}
+                table_start += len(tables_z[-1])
+
+            marginals[var_name] = marginal_meta
+
+        _save("grid_x", np.concatenate(grids_x) if grids_x else np.empty(0))
+        _save("grid_u", np.concatenate(grids_u) if grids_u else np.empty(0))
+        _save("ppf_table_z", np.concatenate(tables_z) if tables_z else np.empty(0))
+        _save("ppf_table_x", np.concatenate(tables_x) if tables_x else np.empty(0))
+
+        # Correlation model
+        if (self.correlation_structure=='factor'):
+            _save("loadings", self.correlation_factors['loadings'].to_numpy())
+            _save("uniqueness", self.correlation_factors['uniqueness'].to_numpy())
+        else:
+            _save("correlation", self.correlation.to_numpy())
+            _save("cholesky", self._correlation_cholesky())
+
+        meta = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "var_names": [str(var_name) for var_name in self.var_names],
+            "data_columns": [str(column) for column in (self.data_columns or self.var_names)],
+            "column_groups": None if not self.column_groups else {str(group): [str(column) for column in columns] for group, columns in self.column_groups.items()},
+            "correlation_structure": self.correlation_structure,
+            "correlation_method": self.correlation_method,
+            "n_factors": self.n_factors,
+            "conditional_cache_size": self.conditional_cache_size,
+            "random_state": None if self.random_state is None else int(self.random_state),
+            "sample_float32": bool(self.sample_float32),
+            "marginals": marginals
+        }
+        with open(os.path.join(path, "meta.json"), "w") as fl:
+            json.dump(meta, fl, indent=1)
+
+        if (self.debug):
+            print(f"Exported model with {len(self.var_names)} variables to: {path}")
+
+        return path
 
 
 
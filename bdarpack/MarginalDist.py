@@ -1,11 +1,19 @@
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from multiprocessing.connection import wait
 import pandas as pd
 import os 
+import time
 import numpy as np
 from scipy import stats
 from scipy.interpolate import interp1d
+from scipy.special import ndtr, ndtri
+from scipy.signal import fftconvolve
 
 from bdarpack import utils_ as ut_
+from bdarpack import kernels_ as kn_
+from bdarpack.QuantileSketch import QuantileSketch
 
 DIST_MAP = {
     "beta": "beta_dist",
@@ -16,10 +24,179 @@ DIST_MAP = {
     "student_t": "t_dist",
     "uniform": "uni_dist",
     "emp": "empirical_dist",
+    "emp_sketch": "empirical_sketch_dist",
     "gaussian_kde": "gaussian_kde_dist",
+    "gaussian_kde_binned": "gaussian_kde_binned_dist",
+    "discrete": "discrete_dist",
     "degenerate": "degenerate_dist"
 }
 
+KDE_CDF_BLOCK_SIZE = 256 #number of grid points evaluated together in gaussian_kde_cdf
+KDE_CDF_MAX_ELEMENTS = 2 ** 20 #max. number of (grid point, data point) kernel evaluations held in memory at once
+KDE_CDF_TAIL = 8.5 #kernels further than this many bandwidths from a grid point contribute exactly 0 or 1 (in double precision)
+KDE_BINNED_GRID_SIZE = 2 ** 14 #number of grid points of the binned (FFT) KDE
+KDE_BINNED_THRESHOLD = 100000 #default row count above which 'gaussian_kde' is fitted as 'gaussian_kde_binned'
+PRESCREEN_N_SE = 3 #number of standard errors by which sample moments must rule out a candidate before it is skipped
+DISCRETE_MAX_UNIQUE = 50 #default max. number of distinct values for which a column is fitted with the 'discrete' distribution
+PPF_TABLE_DISTS = ["beta", "gamma", "student_t"] #distributions whose (root-finding) ppf can be tabulated
+PPF_TABLE_Z = 8.0 #PPF tables cover normal scores z in [-PPF_TABLE_Z, PPF_TABLE_Z], i.e. u = ndtr(z) between 6e-16 and 1 - 6e-16
+PPF_TABLE_START_SIZE = 1025 #initial number of PPF table points (refined by halving the spacing until the tolerance is met)
+PPF_TABLE_MAX_SIZE = 2 ** 16 + 1 #max. number of PPF table points
+
+# STATELESS DISTRIBUTION HANDLERS
+# Pure functions of the fitted params (MarginalDist.params): they write nothing, so that one fitted model can be evaluated from many threads at once.
+
+def _fwd_CDF_fn(x, u):
+    """CDF forward function: linear interpolation of the (x, u) grid"""
+    a = np.argsort(u)
+    return interp1d(x[a], u[a], kind='linear', fill_value='extrapolate')
+
+def _inv_CDF_fn(x, u):
+    """CDF inverse function: linear interpolation of the (u, x) grid"""
+    a = np.argsort(u, kind='stable') #stable: keeps the -inf padding first when u starts with repeated zeros
+    return interp1d(u[a], x[a], kind='linear', fill_value='extrapolate')
+
+def _sorted_grid(x, u):
+    """Interpolation grid {"x", "u"}, checked once at fit time: "sorted" is True when x and u are both non-decreasing, so that np.interp can be used without sorting"""
+    return {"x": x, "u": u, "sorted": bool(np.all(np.diff(x) >= 0) and np.all(np.diff(u) >= 0))}
+
+def _grid_cdf(grid, x):
+    """CDF of an (x, u) grid: np.interp on sorted grids (clamped to the end values), otherwise _fwd_CDF_fn"""
+    if not grid.get("sorted", False):
+        return _fwd_CDF_fn(grid["x"], grid["u"])(x)
+    return np.interp(x, grid["x"], grid["u"])
+
+def _grid_ppf(grid, u):
+    """Inverse CDF of an (x, u) grid: np.interp on sorted grids (clamped to the end values), otherwise _inv_CDF_fn"""
+    if not grid.get("sorted", False):
+        return _inv_CDF_fn(grid["x"], grid["u"])(u)
+
+    # Skip the -inf padding of the empirical grid: probabilities below the first step map to the minimum
+    start = 1 if (len(grid["x"]) > 1) and np.isneginf(grid["x"][0]) else 0
+    return np.interp(u, grid["u"][start:], grid["x"][start:])
+
+def _eCDF_fn(input, x, u):
+    """Empirical CDF step function of the padded (x, u) grid"""
+    input_pos = np.searchsorted(x, input, 'left') - 1
+    return u[input_pos]
+
+def _table_ppf(table, u, exact_ppf):
+    """PPF from a table built by MarginalDist.build_ppf_table: linear interpolation in z = ndtri(u), exact_ppf(u) outside the table"""
+    u = np.asarray(u, dtype=float)
+    z = ndtri(u)
+    table_z = table["z"]
+    table_x = table["x"]
+
+    outside = ~((z >= table_z[0]) & (z <= table_z[-1])) #also catches nan
+    z = np.where(outside, table_z[0], z)
+
+    # The z grid is evenly spaced: the interval is found by arithmetic instead of a binary search
+    pos = (z - table_z[0]) / (table_z[1] - table_z[0])
+    i = np.clip(pos.astype(np.int64), 0, len(table_z) - 2)
+    x = table_x[i] + (table_x[i + 1] - table_x[i]) * (pos - i)
+
+    if outside.any():
+        x[outside] = exact_ppf(u[outside])
+
+    return x
+
+def _discrete_cdf(table, x):
+    """CDF of a discrete distribution with values table["x"] (sorted) and cumulative probabilities table["u"]"""
+    x = np.asarray(x, dtype=float)
+    pos = np.searchsorted(table["x"], x, side='right')
+    return np.where(np.isnan(x), np.nan, np.r_[0, table["u"]][pos])
+
+def _discrete_cdf_step(table, x):
+    """Probability step (F(x-), F(x)) of a discrete distribution at x (both ends equal F(x) where x is not one of the values)"""
+    x = np.asarray(x, dtype=float)
+    u = np.r_[0, table["u"]]
+    lower = u[np.searchsorted(table["x"], x, side='left')]
+    upper = u[np.searchsorted(table["x"], x, side='right')]
+    return np.where(np.isnan(x), np.nan, lower), np.where(np.isnan(x), np.nan, upper)
+
+def _discrete_ppf(table, u):
+    """PPF of a discrete distribution: the smallest value whose cumulative probability is at least u"""
+    u = np.asarray(u, dtype=float)
+    pos = np.clip(np.searchsorted(table["u"], u, side='left'), 0, len(table["x"]) - 1)
+    return np.where(np.isnan(u), np.nan, table["x"][pos])
+
+def _scipy_handler(dist_name, dist, shape_params):
+    """Handler of a parametric distribution: cdf/ppf through the scipy.special kernels of kernels_ (KERNELS[dist_name]), 
+    samples from the scipy.stats distribution dist with shape parameters shape_params (plus loc and scale)"""
+
+    def kwargs(params):
+        return {**{p: params[p] for p in shape_params}, "loc": params['loc'], "scale": params['scale']}
+
+    def ppf(params, u):
+        if params.get("ppf_table") is None:
+            return kn_.ppf(dist_name, params, u)
+        return _table_ppf(params["ppf_table"], u, lambda v: kn_.ppf(dist_name, params, v))
+
+    return {
+        "cdf": lambda params, x: kn_.cdf(dist_name, params, x),
+        "ppf": ppf,
+        "sample": lambda params, n, rng: dist.rvs(size=n, random_state=rng, **kwargs(params))
+    }
+
+def _grid_handler(grid_name, cdf):
+    """Handler of a distribution described by an interpolation grid params[grid_name] = {"x", "u"}, with cdf(grid, x)"""
+
+    def ppf(params, u):
+        return _grid_ppf(params[grid_name], u)
+
+    return {
+        "cdf": lambda params, x: cdf(params[grid_name], x),
+        "ppf": ppf,
+        "sample": lambda params, n, rng: ppf(params, rng.uniform(size=n))
+    }
+
+DIST_REGISTRY = {
+    "beta": _scipy_handler("beta", stats.beta, ["a", "b"]),
+    "laplace": _scipy_handler("laplace", stats.laplace, []),
+    "loglaplace": _scipy_handler("loglaplace", stats.loglaplace, ["c"]),
+    "gamma": _scipy_handler("gamma", stats.gamma, ["a"]),
+    "gaussian": _scipy_handler("gaussian", stats.norm, []),
+    "student_t": _scipy_handler("student_t", stats.t, ["df"]),
+    "uniform": _scipy_handler("uniform", stats.uniform, []),
+    "emp": _grid_handler("ecdf", lambda grid, x: _eCDF_fn(x, grid["x"], grid["u"])),
+    "emp_sketch": _grid_handler("emp_sketch", lambda grid, x: _eCDF_fn(x, grid["x"], grid["u"])),
+    "gaussian_kde": _grid_handler("gaussian_kde", _grid_cdf),
+    "gaussian_kde_binned": _grid_handler("gaussian_kde_binned", lambda grid, x: np.interp(x, grid["x"], grid["u"], left=0, right=1)),
+    "discrete": {
+        "cdf": lambda params, x: _discrete_cdf(params["discrete"], x),
+        "ppf": lambda params, u: _discrete_ppf(params["discrete"], u),
+        "sample": lambda params, n, rng: _discrete_ppf(params["discrete"], rng.uniform(size=n))
+    },
+    "degenerate": {
+        "cdf": lambda params, x: np.where(np.asarray(x) < params['constant_value'], 0, 1),
+        "ppf": lambda params, u: np.full(np.shape(u), params['constant_value']),
+        "sample": lambda params, n, rng: np.full(n, params['constant_value'])
+    }
+}
+
+def _fit_candidate(uni_dist, data, sorted_data, sketch_k=200):
+    """Fit uni_dist to data and evaluate its CDF on sorted_data. Returns (uni, cdf_sorted), cdf_sorted is None if either fails."""
+    uni = MarginalDist(sketch_k=sketch_k)
+
+    try:
+        getattr(uni, DIST_MAP[uni_dist])(operation='fit', data=data)
+        cdf_sorted = getattr(uni, DIST_MAP[uni_dist])(operation='cdf', data=sorted_data)
+        cdf_sorted = np.asarray(cdf_sorted, dtype=float)
+        if (cdf_sorted.shape != sorted_data.shape):
+            cdf_sorted = np.full(sorted_data.shape, np.nan) #nan in data: KS statistic is nan, as with stats.kstest
+    except:
+        cdf_sorted = None
+
+    return uni, cdf_sorted
+
+def _fit_candidate_worker(connection, uni_dist, data, sorted_data, sketch_k):
+    """Process target of MarginalDist._run_candidates_timeout: sends _fit_candidate's result through connection"""
+    uni, cdf_sorted = _fit_candidate(uni_dist, data, sorted_data, sketch_k)
+    uni.sample_cdf = None #not needed by the selection, avoid sending O(rows) arrays back
+    uni.sample_pdf = None
+    connection.send((uni, cdf_sorted))
+    connection.close()
+
 class MarginalDist:
     """
     Learn/Build marginal distributions for univariate data
@@ -28,13 +205,64 @@ class MarginalDist:
     Change Log: (MZ) 13-07-2023 put evaluation of uni_dist in try/except block
     Change Log: (MZ) 27-07-2023 fix the number of steps to be below 10,000 (for CDF estimation)
     Change Log: (MZ) 28-07-2023 format data to remove all nan
+    Change Log: (MZ) 18-10-2026: Added binned (FFT) Gaussian KDE, 'gaussian_kde_binned', used in place of 'gaussian_kde' above kde_binned_threshold rows
+
+    Change Log: (MZ) 18-10-2026: Candidate selection pre-screens candidates on moments, runs in a thread pool and can stop at the first acceptable candidate
+    Change Log: (MZ) 18-10-2026: Added two-stage (subsample, then top-k on full data) candidate selection
+    Change Log: (MZ) 18-10-2026: Added stateless compute_cdf/compute_ppf/compute_samples (DIST_REGISTRY), wrappers dispatch without eval
+    Change Log: (MZ) 18-10-2026: emp/KDE grids are checked for sorting once at fit time, cdf/ppf use np.interp on them instead of building an interp1d per call
+    Change Log: (MZ) 18-10-2026: Added optional PPF tables (ppf_table_tol) for the root-finding ppf of beta, gamma and student_t
+    Change Log: (MZ) 18-10-2026: Added 'emp_sketch', an empirical distribution kept as a mergeable QuantileSketch (partial_fit, merge)
+    Change Log: (MZ) 18-10-2026: Added 'discrete' distribution (value -> cumulative probability table), fitted without candidate selection to columns with few distinct values
+    Change Log: (MZ) 18-10-2026: Added per-candidate wall-clock budget (candidate_timeout) enforced in killable worker processes, fit times logged in debug mode
+    Change Log: (MZ) 18-10-2026: Parametric cdf/ppf evaluated with the scipy.special kernels of kernels_ instead of scipy.stats distribution objects
+    Change Log: (MZ) 18-10-2026: Added compute_cdf_step (probability step of a value, for conditioning on 'discrete' marginals)
+
+    Inputs:
+        kde_binned_threshold (int): number of (non-null) rows above which the 'gaussian_kde' candidate is fitted as 'gaussian_kde_binned'. None never switches. Default is KDE_BINNED_THRESHOLD.
+        n_jobs (int): number of threads used to evaluate candidate distributions concurrently (-1 uses all cores). Default is None (sequential).
+        selection (str): 'best' (default) evaluates every candidate and keeps the smallest KS statistic. 'first' stops at the first candidate, in candidate order, with a KS p-value 
+            above pvalue_threshold and cancels the remaining fits (the winner does not depend on n_jobs). In the thread pool (n_jobs > 1 without candidate_timeout), fits that are 
+            already running when the winner is found cannot be stopped and finish in the background; set candidate_timeout to run the fits in worker processes that are killed instead.
+        pvalue_threshold (float): KS p-value above which a candidate is acceptable. Default is 0.05.
+        selection_sample_size (int): two-stage selection for data with more rows: all candidates are fitted and KS-tested on a random subsample of this many rows, 
+            then only the selection_top_k best (smallest KS statistic) are refitted on the full data, keeping the smallest full-data KS statistic. Default is None (single stage).
+        selection_top_k (int): number of candidates refitted on the full data in two-stage selection. Default is 2.
+        ppf_table_tol (float): when set and the fitted distribution is in PPF_TABLE_DISTS, the ppf is tabulated at fit time (see build_ppf_table) 
+            with this maximum absolute error and ppf queries interpolate the table. Default is None (exact ppf).
+        sketch_k (int): accuracy parameter of the QuantileSketch of the 'emp_sketch' distribution (rank error about 1.7% at k=200). Default is 200.
+        candidate_timeout (float): wall-clock budget in seconds of each candidate fit in select_univariate. When set, every fit runs in its own process (at most n_jobs at once), 
+            which is killed when the budget is exceeded; the candidate is then recorded as skipped in selection_stats. Default is None (no budget, fits run in this process).
+        discrete_max_unique (int): data with at most this many distinct values, and at least two rows per distinct value on average, is fitted with the exact 'discrete' distribution 
+            instead of selecting among the candidates (unless candidates are given without 'discrete'). None disables. Default is DISCRETE_MAX_UNIQUE.
     """
 
     def __init__(self,
-        debug=False
+        debug=False,
+        kde_binned_threshold=KDE_BINNED_THRESHOLD,
+        n_jobs=None,
+        selection="best",
+        pvalue_threshold=0.05,
+        selection_sample_size=None,
+        selection_top_k=2,
+        ppf_table_tol=None,
+        sketch_k=200,
+        discrete_max_unique=DISCRETE_MAX_UNIQUE,
+        candidate_timeout=None
     ):
         
         self.debug = debug
+        self.kde_binned_threshold = kde_binned_threshold
+        self.n_jobs = n_jobs #threads used to evaluate candidate distributions
+        self.selection = selection #'best' or 'first'
+        self.pvalue_threshold = pvalue_threshold
+        self.selection_sample_size = selection_sample_size #rows of the stage-one subsample (None: single-stage selection)
+        self.selection_top_k = selection_top_k #candidates refitted on the full data in stage two
+        self.ppf_table_tol = ppf_table_tol #max. absolute error of the tabulated ppf (None: exact ppf)
+        self.sketch_k = sketch_k #accuracy parameter of the 'emp_sketch' QuantileSketch
+        self.discrete_max_unique = discrete_max_unique #max. number of distinct values fitted with the 'discrete' distribution (None: never)
+        self.candidate_timeout = candidate_timeout #wall-clock budget (s) of each candidate fit, enforced in a worker process (None: no budget)
+        self.selection_stats = None #per-candidate outcome of the last select_univariate() ('fitted', 'first', 'skipped' or 'cancelled', with KS statistics)
         self.marginal_dist = None
         self.fitted_marginal_dist = None
         self.sample_size = 1000
@@ -48,8 +276,12 @@ class MarginalDist:
             "b": 1,
             "c": 1,
             "ecdf": {},
+            "emp_sketch": {},
             "gaussian_kde": {},
-            "constant_value": None
+            "gaussian_kde_binned": {},
+            "discrete": {},
+            "constant_value": None,
+            "ppf_table": None
         }
 
         self.sample_cdf = None #cdf of samples used to fit the distribution
@@ -61,7 +293,7 @@ class MarginalDist:
         
 
         self.parametric = ["beta", "laplace", "loglaplace", "gamma", "gaussian", "student_t", "uniform"]
-        self.nonparametric = ["emp", "gaussian_kde"]
+        self.nonparametric = ["emp", "emp_sketch", "gaussian_kde", "gaussian_kde_binned", "discrete"]
 
     def load_params(self, new_params={"loc": 0, "scale": 1}):
 
@@ -82,13 +314,20 @@ class MarginalDist:
 
         Change Log: (MZ) 13-07-2023: Added degenerate distribution
         Change Log: (MZ) 07-11-2024: Added fix to remove null values before checking for degeneracy
+        Change Log: (MZ) 18-10-2026: data with few distinct values (discrete_max_unique) is fitted with the 'discrete' distribution
+        Change Log: (MZ) 18-10-2026: candidates=['discrete'] always gives the 'discrete' fit, whatever the number of distinct values (e.g. category codes)
         """
 
         no_null_data = data[~np.isnan(data)] #(MZ): 07-11-2024
         if (len(no_null_data)==0): #fully null
             no_null_data = data
+
+        n_unique = len(np.unique(no_null_data))
+        discrete = (self.discrete_max_unique is not None) and (n_unique <= self.discrete_max_unique) and (2 * n_unique <= len(no_null_data)) \
+            and ((candidates is None) or ("discrete" in candidates))
+        discrete = discrete or ((candidates is not None) and (list(candidates) == ["discrete"]))
             
-        if len(np.unique(no_null_data)) == 1: # Check if data contains only one type of value
+        if n_unique == 1: # Check if data contains only one type of value
             # self.params['constant_value'] = np.unique(data)[0]
             # self.marginal_dist = 'degenerate'
             # self.fitted_marginal_dist = 'degenerate'
@@ -99,6 +338,15 @@ class MarginalDist:
             uni = MarginalDist()
             uni.degenerate_dist(operation='fit', data=no_null_data)
             self.fitted = True
+        elif discrete:
+            if (self.debug):
+                print(f"Fitting data with {n_unique} distinct values with discrete distribution...")
+
+            uni = MarginalDist()
+            uni.discrete_dist(operation='fit', data=no_null_data)
+            self.fitted = True
+        elif (self.selection_sample_size is not None) and (len(data) > self.selection_sample_size):
+            opt_ks, opt_univariate, uni = self.select_univariate_two_stage(data=data, candidates=candidates)
         else:
             opt_ks, opt_univariate, uni = self.select_univariate(data=data, candidates=candidates)
 
@@ -108,35 +356,297 @@ class MarginalDist:
             self.params = uni.params
             self.gaussian_kde_model = uni.gaussian_kde_model
 
+            if (self.ppf_table_tol is not None) and (self.fitted_marginal_dist in PPF_TABLE_DISTS):
+                self.build_ppf_table(tol=self.ppf_table_tol)
+
             return True
         else: 
             return False
     
 
+    def build_ppf_table(self, tol=1e-6):
+        """
+        Tabulate the ppf of the fitted distribution, so that ppf queries (compute_ppf, ppf_wrapper) interpolate instead of root-finding.
+
+        The table holds x = ppf(ndtr(z)) on an evenly spaced grid of normal scores z in [-PPF_TABLE_Z, PPF_TABLE_Z] (dense in u near the tails), and queries 
+        interpolate linearly in z = ndtri(u). The spacing is halved (from PPF_TABLE_START_SIZE up to PPF_TABLE_MAX_SIZE points) until the error at every 
+        interval midpoint is at most tol. If tol is not reached in the tails (heavy-tailed t), the table is cut to the central range where it is, 
+        and probabilities outside the table use the exact ppf.
+
+        Inputs:
+            tol (float): maximum absolute error of the tabulated ppf
+        Returns:
+            max_error (float): largest measured absolute error (also stored in params['ppf_table']['max_error']), or None if no table could meet tol
+        """
+        if self.fitted_marginal_dist not in PPF_TABLE_DISTS:
+            raise Exception(f"PPF tables are supported for {PPF_TABLE_DISTS} only, not for {self.fitted_marginal_dist}")
+
+        self.params["ppf_table"] = None
+        handler = self._registry_handler()
+        exact_ppf = lambda u: handler["ppf"](self.params, u)
+
+        # Refine: the midpoints of one grid become nodes of the next, so every ppf value is computed once
+        z = np.linspace(-PPF_TABLE_Z, PPF_TABLE_Z, PPF_TABLE_START_SIZE)
+        x = exact_ppf(ndtr(z))
+        while True:
+            z_mid = (z[:-1] + z[1:]) / 2
+            x_mid = exact_ppf(ndtr(z_mid))
+            error = np.abs(x_mid - (x[:-1] + x[1:]) / 2)
+            if np.all(error <= tol) or (2 * len(z) - 1 > PPF_TABLE_MAX_SIZE):
+                break
+            z = np.insert(z, np.arange(1, len(z)), z_mid)
+            x = np.insert(x, np.arange(1, len(x)), x_mid)
+
+        # Keep the central run of intervals within tol (nan errors count as failures)
+        bad = np.flatnonzero(~(error <= tol))
+        center = (len(z) - 1) // 2
+        lo = bad[bad < center].max() + 1 if np.any(bad < center) else 0
+        hi = bad[bad >= center].min() if np.any(bad >= center) else len(z) - 1
+
+        if (hi <= lo):
+            if (self.debug):
+                print(f"PPF table: tolerance {tol} not reached, using the exact ppf")
+            return None
+
+        max_error = float(error[lo:hi].max())
+        self.params["ppf_table"] = {
+            "z": z[lo:hi + 1],
+            "x": np.maximum.accumulate(x[lo:hi + 1]), #ppf is non-decreasing, remove root-finding noise
+            "tol": tol,
+            "max_error": max_error
+        }
+
+        if (self.debug):
+            print(f"PPF table: {hi + 1 - lo} points, u in [{ndtr(z[lo])}, {ndtr(z[hi])}], max. absolute error {max_error}")
+
+        return max_error
+
+    def fit_from_sketch(self, sketch, dist="emp"):
+        """
+        Fit an empirical distribution from a QuantileSketch instead of the raw data (degenerate if the sketch holds a single value).
+        Inputs: 
+            sketch (QuantileSketch)
+            dist (str): 'emp' (default) keeps only the CDF step points of the sketch, 'emp_sketch' also keeps (a copy of) the sketch, so that the fit can be updated or merged later
+        """
+
+        if (sketch.n == 0):
+            self.fitted = False
+            return False
+
+        if (dist=="emp_sketch"):
+            self._set_sketch(deepcopy(sketch))
+        elif (sketch.min == sketch.max):
+            self.degenerate_dist(operation='fit', data=np.array([sketch.min]))
+        else:
+            x, u = sketch.cdf_points()
+
+            # Same padding as empirical_dist
+            self.marginal_dist = "emp"
+            self.fitted_marginal_dist = "emp"
+            self.params["ecdf"] = _sorted_grid(np.r_[-np.inf, x], np.r_[0, u])
+
+        self.fitted = True
+
+        return True
+
+    def _set_sketch(self, sketch):
+        """Make sketch the 'emp_sketch' distribution: params['emp_sketch'] holds the sketch and its padded CDF step points (as in empirical_dist)"""
+
+        x, u = sketch.cdf_points()
+
+        self.marginal_dist = "emp_sketch"
+        self.fitted_marginal_dist = "emp_sketch"
+        self.params["emp_sketch"] = {
+            "sketch": sketch,
+            **_sorted_grid(np.r_[-np.inf, x], np.r_[0, u])
+        }
+
+    def _get_sketch(self):
+        """QuantileSketch of a fitted 'emp_sketch' distribution"""
+
+        if (self.fitted_marginal_dist != "emp_sketch"):
+            raise Exception(f"Only 'emp_sketch' distributions can be updated or merged, not {self.fitted_marginal_dist}")
+        if (self.params["emp_sketch"].get("sketch") is None):
+            raise Exception("The 'emp_sketch' distribution was loaded without its sketch (export_model keeps only the CDF step points)")
+
+        return self.params["emp_sketch"]["sketch"]
+
+    def partial_fit(self, data):
+        """
+        Add a chunk of data to an 'emp_sketch' distribution (a new sketch with accuracy sketch_k is started if the distribution is not fitted yet).
+        Only the sketch is kept, so a column can be fitted chunk by chunk without holding it in memory.
+        Inputs: data (array-like): new observations (missing values are ignored)
+        Returns: fitted (bool)
+        """
+
+        if (self.fitted):
+            sketch = self._get_sketch()
+        else:
+            sketch = QuantileSketch(k=self.sketch_k)
+
+        sketch.update(data)
+        if (sketch.n == 0):
+            return False
+
+        self._set_sketch(sketch)
+        self.fitted = True
+
+        return True
+
+    def merge(self, other):
+        """
+        Merge another 'emp_sketch' distribution (e.g. fitted on a separate chunk of the column) into this one. The result describes the union of both data sets.
+        Inputs: other (MarginalDist): fitted 'emp_sketch' distribution (unchanged)
+        Returns: self
+        """
+
+        sketch = self._get_sketch()
+        sketch.merge(other._get_sketch())
+        self._set_sketch(sketch)
+
+        return self
+
     def select_univariate(self, data=None, candidates=None):
         """Select the best univariate class for data
         
         Change Log: (MZ) 13-07-2023 put evaluation of uni_dist in try/except block
+        Change Log: (MZ) 18-10-2026: candidates are pre-screened on moments, evaluated in a thread pool (n_jobs) and optionally stopped at the first acceptable fit (selection='first')
+        Change Log: (MZ) 18-10-2026: KS tests sort the data once and evaluate all candidates in one batch (ut_.ks_1samp_sorted) instead of one stats.kstest per candidate
+        Change Log: (MZ) 18-10-2026: optional per-candidate time budget (candidate_timeout), timed-out candidates are recorded as skipped
         """
 
         opt_ks = np.inf
         opt_univariate = None
         opt_uni = None
+        self.selection_stats = {}
+
+        # Large columns use the binned KDE, whose cost does not grow with the number of rows
+        n_rows = np.count_nonzero(~np.isnan(np.asarray(data, dtype=float)))
+        def kde_candidate(uni_dist):
+            if (uni_dist=="gaussian_kde") and (self.kde_binned_threshold is not None) and (n_rows > self.kde_binned_threshold):
+                if (self.debug):
+                    print(f"{n_rows} rows: using gaussian_kde_binned instead of gaussian_kde")
+                return "gaussian_kde_binned"
+            return uni_dist
+
+        # KS test inputs shared by every candidate: the column is sorted and its eCDF steps computed once
+        sorted_data = np.sort(np.asarray(data, dtype=float))
+        ecdf_steps = ut_.ecdf_steps(len(sorted_data))
 
         def eval_dist(uni_dist):
-            uni = MarginalDist()
+            """Fit uni_dist and evaluate its CDF on the sorted data (None if either fails)"""
+            return _fit_candidate(uni_dist, data, sorted_data, self.sketch_k)
+
+        def timed_eval_dist(uni_dist):
+            """eval_dist and its wall-clock time"""
+            start = time.perf_counter()
+            result = eval_dist(uni_dist)
+            return result, time.perf_counter() - start
+
+        def ks_test(cdf_rows):
+            """KS statistics and p-values of several candidates in one batch (inf, 0 for failed candidates)"""
+
+            ks_statistics = np.full(len(cdf_rows), np.inf)
+            ks_pvalues = np.zeros(len(cdf_rows))
+
+            valid = [i for i, cdf_sorted in enumerate(cdf_rows) if cdf_sorted is not None]
+            if valid:
+                ks_statistics[valid], ks_pvalues[valid] = ut_.ks_1samp_sorted(np.vstack([cdf_rows[i] for i in valid]), steps=ecdf_steps)
+
+            return ks_statistics, ks_pvalues
+
+        def eval_candidates(candidates):
+            """
+            Evaluate candidates (in a thread pool if n_jobs > 1), after pre-screening. 
+            With selection='first', evaluation stops at the first candidate whose p-value exceeds pvalue_threshold, which is returned as the winner (None otherwise).
+            Otherwise the KS statistics of all candidates are computed in one batch once every candidate is fitted.
+            """
+
+            candidates = self._prescreen_candidates(data, candidates)
+            first = (self.selection=='first')
+            fitted = {}
+            results = {}
+            timings = {} #wall-clock time of each finished fit
+            timed_out = {} #candidates stopped after candidate_timeout, with their elapsed time
+            winner = None
+
+            def accept(uni_dist):
+                """Test a single candidate (selection='first'), return True if it is acceptable"""
+                uni, cdf_sorted = fitted[uni_dist]
+                ks_statistics, ks_pvalues = ks_test([cdf_sorted])
+                results[uni_dist] = (ks_statistics[0], ks_pvalues[0], uni)
+                return ks_pvalues[0] > self.pvalue_threshold
+
+            n_jobs = os.cpu_count() if self.n_jobs == -1 else self.n_jobs
+            if (self.candidate_timeout is not None):
+                # Each fit runs in its own process, killed when it exceeds its budget
+                runner = self._run_candidates_timeout(candidates, data, sorted_data, n_jobs, timed_out)
+                untested = list(candidates)
+
+                def accept_in_order():
+                    """Test the finished candidates in candidate order, up to the first one still running; return the winner (None if none yet)"""
+                    while untested and ((untested[0] in fitted) or (untested[0] in timed_out)):
+                        uni_dist = untested.pop(0)
+                        if (uni_dist in fitted) and accept(uni_dist):
+                            return uni_dist
+                    return None
+
+                try:
+                    for uni_dist, result, elapsed in runner:
+                        fitted[uni_dist], timings[uni_dist] = result, elapsed
+                        if first:
+                            winner = accept_in_order()
+                            if winner is not None:
+                                break
+                    else:
+                        if first:
+                            winner = accept_in_order() #candidates after one that timed out last
+                finally:
+                    runner.close() #kills the fits still running
+            elif (n_jobs is None) or (n_jobs <= 1) or (len(candidates) <= 1):
+                for uni_dist in candidates:
+                    fitted[uni_dist], timings[uni_dist] = timed_eval_dist(uni_dist)
+                    if first and accept(uni_dist):
+                        winner = uni_dist
+                        break
+            else:
+                # Results are consumed in candidate order, so that with selection='first' the winner is the same as in a sequential run
+                executor = ThreadPoolExecutor(max_workers=min(n_jobs, len(candidates)))
+                try:
+                    futures = {uni_dist: executor.submit(timed_eval_dist, uni_dist) for uni_dist in candidates}
+                    for uni_dist in candidates:
+                        fitted[uni_dist], timings[uni_dist] = futures[uni_dist].result()
+                        if first and accept(uni_dist):
+                            winner = uni_dist
+                            break
+                finally:
+                    executor.shutdown(wait=False, cancel_futures=True) #pending fits are cancelled, running ones finish in the background
+
+            if not first:
+                names = list(fitted.keys())
+                ks_statistics, ks_pvalues = ks_test([fitted[uni_dist][1] for uni_dist in names])
+                for i, uni_dist in enumerate(names):
+                    results[uni_dist] = (ks_statistics[i], ks_pvalues[i], fitted[uni_dist][0])
 
-            def cdf_callable(data):
-                return uni.cdf_wrapper(data=data)
-            
-            try:
-                eval(f"uni.{DIST_MAP[uni_dist]}(operation='fit', data=data)")
-                ks_statistic, ks_pvalue = stats.kstest(data, cdf_callable)
-            except:
-                ks_statistic = np.inf
-                ks_pvalue = 0
+            for uni_dist in candidates:
+                if uni_dist in results:
+                    ks_statistic, ks_pvalue, uni = results[uni_dist]
+                    self.selection_stats[uni_dist] = {"status": "fitted", "ks_statistic": ks_statistic, "ks_pvalue": ks_pvalue}
+                    if (self.debug):
+                        print(f"Fitting data with {uni_dist}:: kstat: {ks_statistic}:: pvalue: {ks_pvalue}:: time: {timings[uni_dist]:.3f}s")
+                elif uni_dist in timed_out:
+                    self.selection_stats[uni_dist] = {"status": "skipped", "reason": f"timeout ({self.candidate_timeout}s)", "time": timed_out[uni_dist]}
+                    if (self.debug):
+                        print(f"Skipping {uni_dist}: fit stopped after {timed_out[uni_dist]:.3f}s (candidate_timeout={self.candidate_timeout}s)")
+                else:
+                    self.selection_stats[uni_dist] = {"status": "cancelled"}
+            if winner is not None:
+                self.selection_stats[winner]["status"] = "first"
 
-            return ks_statistic, ks_pvalue, uni
+            # results in candidate order, so that ties are resolved as in a sequential run
+            if winner is not None:
+                return [(winner, ) + results[winner]]
+            return [(uni_dist, ) + results[uni_dist] for uni_dist in candidates if uni_dist in results]
 
 
         if not candidates or candidates is None:
@@ -145,15 +655,10 @@ class MarginalDist:
             if (self.debug):
                 print(f"Fitting data with known parametric distributions...")
 
-            for uni_dist in candidates:
-
-                ks_statistic, ks_pvalue, uni = eval_dist(uni_dist)
-
-                if (self.debug):
-                    print(f"Fitting data with {uni_dist}:: kstat: {ks_statistic}:: pvalue: {ks_pvalue}")
+            for uni_dist, ks_statistic, ks_pvalue, uni in eval_candidates(candidates):
                 
                 if ks_statistic< opt_ks:
-                    if ks_pvalue > 0.05:
+                    if ks_pvalue > self.pvalue_threshold:
                         opt_ks = ks_statistic
                         opt_univariate = uni_dist
                         opt_uni = deepcopy(uni)
@@ -163,10 +668,12 @@ class MarginalDist:
                 if (self.debug):
                     print(f"No good distributions found, using non-parametric estimation...")
                 
-                uni_dist = "gaussian_kde"
-                ks_statistic, ks_pvalue, uni = eval_dist(uni_dist)
+                uni_dist = kde_candidate("gaussian_kde")
+                (uni, cdf_sorted), elapsed = timed_eval_dist(uni_dist)
+                ks_statistic, ks_pvalue = [value[0] for value in ks_test([cdf_sorted])]
+                self.selection_stats[uni_dist] = {"status": "fitted", "ks_statistic": ks_statistic, "ks_pvalue": ks_pvalue}
                 if (self.debug):
-                    print(f"Fitting data with {uni_dist}:: kstat: {ks_statistic}:: pvalue: {ks_pvalue}")
+                    print(f"Fitting data with {uni_dist}:: kstat: {ks_statistic}:: pvalue: {ks_pvalue}:: time: {elapsed:.3f}s")
 
                 if ks_statistic< opt_ks:
                     opt_ks = ks_statistic
@@ -174,21 +681,17 @@ class MarginalDist:
                     opt_uni = deepcopy(uni)
         
         else:
-            for uni_dist in candidates:
-
-                if (self.debug):
-                    print(f"Fitting data with known parametric distributions...")
+            if (self.debug):
+                print(f"Fitting data with known parametric distributions...")
 
-                if uni_dist in self.parametric or uni_dist in self.nonparametric:
-                    ks_statistic, ks_pvalue, uni = eval_dist(uni_dist)
+            candidates = [kde_candidate(uni_dist) for uni_dist in candidates if (uni_dist in self.parametric or uni_dist in self.nonparametric)]
 
-                    if (self.debug):
-                        print(f"Fitting data with {uni_dist}:: kstat: {ks_statistic}:: pvalue: {ks_pvalue}")
+            for uni_dist, ks_statistic, ks_pvalue, uni in eval_candidates(candidates):
                     
-                    if ks_statistic < opt_ks:
-                        opt_ks = ks_statistic
-                        opt_univariate = uni_dist
-                        opt_uni = deepcopy(uni)
+                if ks_statistic < opt_ks:
+                    opt_ks = ks_statistic
+                    opt_univariate = uni_dist
+                    opt_uni = deepcopy(uni)
 
 
         if opt_univariate is None:
@@ -198,6 +701,132 @@ class MarginalDist:
 
 
         return opt_ks, opt_univariate, opt_uni
+
+    def select_univariate_two_stage(self, data=None, candidates=None):
+        """Select the best univariate class for data in two stages, so that the cost on large data grows with selection_top_k rather than with the number of candidates.
+            (a) stage one: select_univariate on a random subsample of selection_sample_size rows (all candidates, same rules as a single-stage selection)
+            (b) stage two: the selection_top_k candidates with the smallest stage-one KS statistics are refitted on the full data, the smallest full-data KS statistic wins 
+                (full-data p-values are recorded but not used, as they reject almost any parametric fit on very large data)
+        Both stages are recorded in self.selection_stats: {"sample_size", "top_k", "stage1", "stage2"}.
+        """
+
+        values = np.asarray(data, dtype=float)
+        sample_index = np.random.choice(len(values), size=self.selection_sample_size, replace=False)
+
+        if (self.debug):
+            print(f"Two-stage selection: stage one on {self.selection_sample_size} of {len(values)} rows...")
+
+        # Stage one: every candidate on the subsample
+        self.select_univariate(data=values[sample_index], candidates=candidates)
+        stage1_stats = self.selection_stats
+
+        ranked = [uni_dist for uni_dist, stat in stage1_stats.items() if np.isfinite(stat.get("ks_statistic", np.inf))]
+        ranked = sorted(ranked, key=lambda uni_dist: stage1_stats[uni_dist]["ks_statistic"])[:self.selection_top_k]
+
+        if (self.debug):
+            print(f"Two-stage selection: stage two on {len(values)} rows with {ranked}...")
+
+        # Stage two: the top-k candidates on the full data
+        if ranked:
+            opt_ks, opt_univariate, opt_uni = self.select_univariate(data=data, candidates=ranked)
+            stage2_stats = self.selection_stats
+        else:
+            opt_ks, opt_univariate, opt_uni = np.inf, None, None
+            stage2_stats = {}
+            self.fitted = False
+
+        self.selection_stats = {
+            "sample_size": self.selection_sample_size,
+            "top_k": ranked,
+            "stage1": stage1_stats,
+            "stage2": stage2_stats
+        }
+
+        return opt_ks, opt_univariate, opt_uni
+
+    def _run_candidates_timeout(self, candidates, data, sorted_data, n_jobs, timed_out):
+        """
+        Generator of (uni_dist, (uni, cdf_sorted), elapsed) for the candidates, in order of completion. Each fit runs in its own process (at most n_jobs at once) 
+        and is killed once it has run for candidate_timeout seconds; killed candidates are recorded in timed_out (uni_dist: elapsed) and not yielded.
+        A worker that dies gives (None, None). Closing the generator kills the running fits.
+        """
+
+        context = multiprocessing.get_context()
+        max_workers = max(1, n_jobs or 1)
+        pending = list(candidates)
+        running = {} #connection -> (uni_dist, process, start time)
+
+        def stop(connection):
+            uni_dist, process, start = running.pop(connection)
+            if process.is_alive():
+                process.kill()
+            process.join()
+            connection.close()
+            return uni_dist, time.perf_counter() - start
+
+        try:
+            while pending or running:
+                while pending and (len(running) < max_workers):
+                    uni_dist = pending.pop(0)
+                    receiver, sender = context.Pipe(duplex=False)
+                    process = context.Process(target=_fit_candidate_worker, args=(sender, uni_dist, data, sorted_data, self.sketch_k))
+                    process.start()
+                    sender.close()
+                    running[receiver] = (uni_dist, process, time.perf_counter())
+
+                deadline = min(start for _, _, start in running.values()) + self.candidate_timeout
+                for connection in wait(list(running), timeout=max(0, deadline - time.perf_counter())):
+                    if (time.perf_counter() - running[connection][2] > self.candidate_timeout):
+                        continue #finished, but over budget: recorded as timed out below
+                    try:
+                        result = connection.recv()
+                    except (EOFError, OSError):
+                        result = (None, None)
+                    uni_dist, elapsed = stop(connection)
+                    yield uni_dist, result, elapsed
+
+                now = time.perf_counter()
+                for connection, (uni_dist, process, start) in list(running.items()):
+                    if (now - start > self.candidate_timeout):
+                        uni_dist, elapsed = stop(connection)
+                        timed_out[uni_dist] = elapsed
+        finally:
+            for connection in list(running):
+                stop(connection)
+
+    def _prescreen_candidates(self, data, candidates):
+        """
+        Skip candidates whose shape cannot match the data, from sample moments (before any MLE fit). Every candidate fits loc/scale, so only the shape is checked:
+            - gamma, loglaplace (support bounded below, right-skewed): skipped if the sample skewness is significantly negative
+            - beta (bounded support): skipped if the excess kurtosis is significantly above the gamma line 1.5*skew^2, i.e. tails heavier than any beta
+        "Significantly" means by more than 3 standard errors (about sqrt(6/n) for the skewness, sqrt(24/n) for the kurtosis). Skipped candidates are recorded in self.selection_stats.
+        """
+
+        values = np.asarray(data, dtype=float)
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if (n < 8) or (np.std(values) == 0):
+            return list(candidates)
+
+        skewness = stats.skew(values)
+        excess_kurtosis = stats.kurtosis(values)
+
+        reasons = {}
+        if (skewness < -PRESCREEN_N_SE * np.sqrt(6 / n)):
+            reasons["gamma"] = reasons["loglaplace"] = f"negative skewness ({skewness:.3g})"
+        if (excess_kurtosis - 1.5 * skewness ** 2 > PRESCREEN_N_SE * np.sqrt(24 / n)):
+            reasons["beta"] = f"tails heavier than any beta (excess kurtosis {excess_kurtosis:.3g}, skewness {skewness:.3g})"
+
+        kept = []
+        for uni_dist in candidates:
+            if uni_dist in reasons:
+                self.selection_stats[uni_dist] = {"status": "skipped", "reason": reasons[uni_dist]}
+                if (self.debug):
+                    print(f"Skipping {uni_dist}: {reasons[uni_dist]}")
+            else:
+                kept.append(uni_dist)
+
+        return kept
     
     def pdf_wrapper(self, data=None):
         """Wrapper function to compute PDF given data samples. Use only when class has already been fitted to a distribution"""
@@ -206,7 +835,7 @@ class MarginalDist:
         else:
             uni_dist = self.fitted_marginal_dist
 
-        eval(f"self.{DIST_MAP[uni_dist]}(data=data, operation='pdf')")
+        getattr(self, DIST_MAP[uni_dist])(data=data, operation='pdf')
 
         return self.pdf
 
@@ -217,7 +846,7 @@ class MarginalDist:
         else:
             uni_dist = self.fitted_marginal_dist
         
-        eval(f"self.{DIST_MAP[uni_dist]}(data=data, operation='cdf')")
+        getattr(self, DIST_MAP[uni_dist])(data=data, operation='cdf')
 
         return self.cdf
     
@@ -228,11 +857,110 @@ class MarginalDist:
         else:
             uni_dist = self.fitted_marginal_dist
 
-        eval(f"self.{DIST_MAP[uni_dist]}(data=data, operation='ppf')")
+        if self.params.get("ppf_table") is not None:
+            self.ppf = self.compute_ppf(data)
+        else:
+            getattr(self, DIST_MAP[uni_dist])(data=data, operation='ppf')
 
         return self.ppf
+
+    def _registry_handler(self):
+        """Stateless handler (DIST_REGISTRY) of the fitted distribution"""
+        if self.fitted_marginal_dist is None:
+            raise Exception("Class has not been fitted to a distribution yet")
+
+        return DIST_REGISTRY[self.fitted_marginal_dist]
+
+    def compute_cdf(self, data):
+        """CDF of the fitted distribution at data. Unlike cdf_wrapper, nothing is stored on the instance (safe to call from several threads)."""
+        return self._registry_handler()["cdf"](self.params, data)
+
+    def compute_cdf_step(self, data):
+        """
+        Probability step (F(data-), F(data)) of the fitted distribution: the range of cumulative probabilities that map to data. 
+        Only 'discrete' has steps of positive width; for the other distributions both ends are compute_cdf(data). Thread-safe like compute_cdf.
+        """
+        if (self.fitted_marginal_dist == "discrete"):
+            return _discrete_cdf_step(self.params["discrete"], data)
+        cdf = self.compute_cdf(data)
+        return cdf, cdf
+
+    def compute_ppf(self, data):
+        """PPF (inverse CDF) of the fitted distribution at probabilities data. Unlike ppf_wrapper, nothing is stored on the instance (safe to call from several threads)."""
+        return self._registry_handler()["ppf"](self.params, data)
+
+    def compute_samples(self, size, rng=None):
+        """
+        Draw size samples from the fitted distribution, without storing them on the instance.
+        rng: numpy.random.Generator (or RandomState). Default is None (a generator seeded from the global numpy random state).
+        """
+        if rng is None:
+            rng = np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
+
+        return self._registry_handler()["sample"](self.params, size, rng)
                 
 
+    def discrete_dist(self, data=None, operation="fit", new_params={"discrete": None}, sample_size=None):
+        """Compute Discrete Distribution related operations
+        
+        The fitted distribution is the table params['discrete'] = {"x": distinct values (sorted), "u": cumulative probabilities}, built with np.unique. 
+        cdf and ppf are looked up with np.searchsorted, so sampling reproduces the observed values and their frequencies exactly.
+        """
+
+        self.marginal_dist = "discrete"
+
+        if (operation=="fit"):
+            data = np.asarray(data, dtype=float)
+            values, counts = np.unique(data[~np.isnan(data)], return_counts=True)
+
+            self.params["discrete"] = {
+                "x": values,
+                "u": np.cumsum(counts) / counts.sum()
+            }
+            self.fitted_marginal_dist = "discrete"
+            self.sample_size = sample_size
+
+            self.sample_cdf = _discrete_cdf(self.params["discrete"], data)
+            self.sample_pdf = self.discrete_dist(data=data, operation="pdf")
+
+        elif (operation=='sample'):
+            params = self.load_params(new_params=new_params)
+            if (sample_size is not None):
+                self.sample_size = sample_size
+            size = self.sample_size
+
+            uni = MarginalDist()
+            uni.uni_dist(operation="sample", new_params={"loc":0, "scale":1}, sample_size=size)
+            self.samples = _discrete_ppf(params["discrete"], uni.samples)
+
+            return self.samples
+
+        elif (operation=='pdf'):
+            params = self.load_params(new_params=new_params)
+            table = params["discrete"]
+
+            # probability mass of each value (0 for values not in the table)
+            data = np.asarray(data, dtype=float)
+            probabilities = np.diff(np.r_[0, table["u"]])
+            pos = np.clip(np.searchsorted(table["x"], data, side='left'), 0, len(table["x"]) - 1)
+            self.pdf = np.where(table["x"][pos]==data, probabilities[pos], 0)
+
+            return self.pdf
+
+        elif (operation=='cdf'):
+            params = self.load_params(new_params=new_params)
+
+            self.cdf = _discrete_cdf(params["discrete"], data)
+
+            return self.cdf
+
+        elif (operation=='ppf'):
+            params = self.load_params(new_params=new_params)
+
+            self.ppf = _discrete_ppf(params["discrete"], data)
+
+            return self.ppf
+
     def degenerate_dist(self, data=None, operation="fit", new_params={"constant_value":None}, sample_size=None):
         """Compute Degenerate Distribution related operations"""
 
@@ -306,7 +1034,7 @@ class MarginalDist:
             self.sample_size = sample_size
 
             self.sample_pdf = stats.beta.pdf(data, a=self.params['a'], b=self.params['b'], loc=self.params['loc'], scale=self.params['scale'])
-            self.sample_cdf = stats.beta.cdf(data, a=self.params['a'], b=self.params['b'], loc=self.params['loc'], scale=self.params['scale'])
+            self.sample_cdf = kn_.cdf("beta", self.params, data)
 
         elif (operation=="sample"):
 
@@ -343,7 +1071,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating CDF:/n {params}")
 
-            self.cdf = stats.beta.cdf(data, a=params['a'], b=params['b'], loc=params['loc'], scale=params['scale'])
+            self.cdf = kn_.cdf("beta", params, data)
 
             return self.cdf
 
@@ -355,7 +1083,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating PPF:/n {params}")
 
-            self.ppf = stats.beta.ppf(data, a=params['a'], b=params['b'], loc=params['loc'], scale=params['scale'])
+            self.ppf = kn_.ppf("beta", params, data)
 
             return self.ppf
 
@@ -381,10 +1109,7 @@ class MarginalDist:
             u1 = np.r_[init_val, sorted_u]
 
             # Store sorted x, u as parameters to eCDF
-            self.params["ecdf"] = {
-                "x": x1,
-                "u": u1
-            }
+            self.params["ecdf"] = _sorted_grid(x1, u1)
             self.sample_size = sample_size
 
         elif (operation=="sample"):
@@ -392,14 +1117,10 @@ class MarginalDist:
             if (sample_size is not None):
                 self.sample_size = sample_size
             size = self.sample_size
-            x = params["ecdf"]["x"]
-            u = params["ecdf"]["u"]
-
-            interp_fn = self.inv_CDF_fn(x,u)
 
             uni = MarginalDist()
             uni.uni_dist(operation="sample", new_params={"loc":0, "scale":1}, sample_size=size)
-            self.samples = interp_fn(uni.samples)
+            self.samples = _grid_ppf(params["ecdf"], uni.samples)
 
             return self.samples
 
@@ -416,14 +1137,57 @@ class MarginalDist:
         elif (operation=="ppf"):
 
             params = self.load_params(new_params=new_params)
-            x = params["ecdf"]["x"]
-            u = params["ecdf"]["u"]
 
-            interp_fn = self.inv_CDF_fn(x,u)
-            self.ppf = interp_fn(data)
+            self.ppf = _grid_ppf(params["ecdf"], data)
             
             return self.ppf
             
+    def empirical_sketch_dist(self, data=None, operation="fit", new_params={"emp_sketch": None}, sample_size=None):
+        """Compute empirical distribution related operations from a QuantileSketch of the data
+        
+        Unlike empirical_dist, the sorted column is not stored: params['emp_sketch'] holds a QuantileSketch with accuracy sketch_k (O(sketch_k log(n/sketch_k)) items)
+        and the CDF step points derived from it, so memory and pickles do not grow with the number of rows. cdf, ppf and sample use the step points only.
+        Chunked columns can be fitted with partial_fit() or by merging distributions fitted on separate chunks (merge()).
+        """
+
+        self.marginal_dist = "emp_sketch"
+
+        if (operation=="fit"):
+            data = np.asarray(data, dtype=float)
+
+            self._set_sketch(QuantileSketch(k=self.sketch_k).update(data))
+            self.sample_size = sample_size
+
+            grid = self.params["emp_sketch"]
+            self.sample_cdf = _eCDF_fn(data, grid["x"], grid["u"])
+
+        elif (operation=="sample"):
+            params = self.load_params(new_params=new_params)
+            if (sample_size is not None):
+                self.sample_size = sample_size
+            size = self.sample_size
+
+            uni = MarginalDist()
+            uni.uni_dist(operation="sample", new_params={"loc":0, "scale":1}, sample_size=size)
+            self.samples = _grid_ppf(params["emp_sketch"], uni.samples)
+
+            return self.samples
+
+        elif (operation=="cdf"):
+            params = self.load_params(new_params=new_params)
+            grid = params["emp_sketch"]
+
+            self.cdf = _eCDF_fn(data, grid["x"], grid["u"])
+
+            return self.cdf
+
+        elif (operation=="ppf"):
+            params = self.load_params(new_params=new_params)
+
+            self.ppf = _grid_ppf(params["emp_sketch"], data)
+
+            return self.ppf
+
     def laplace_dist(self, data=None, operation="fit", new_params={"loc":None, "scale":None}, sample_size=None):
         """Compute Laplace Distribution related operations"""
 
@@ -436,7 +1200,7 @@ class MarginalDist:
             self.fitted_marginal_dist = "laplace"
             self.sample_size = sample_size
 
-            self.sample_cdf = stats.laplace.cdf(data, loc=self.params['loc'], scale=self.params['scale'])
+            self.sample_cdf = kn_.cdf("laplace", self.params, data)
             self.sample_pdf = stats.laplace.pdf(data, loc=self.params['loc'], scale=self.params['scale'])
 
         elif (operation=="sample"):
@@ -471,7 +1235,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating CDF:/n {params}")
 
-            self.cdf = stats.laplace.cdf(data, loc=params['loc'], scale=params['scale'])
+            self.cdf = kn_.cdf("laplace", params, data)
 
             return self.cdf
         
@@ -482,7 +1246,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating PPF:/n {params}")
 
-            self.ppf = stats.laplace.ppf(data, loc=params['loc'], scale=params['scale'])
+            self.ppf = kn_.ppf("laplace", params, data)
 
             return self.ppf
         
@@ -501,7 +1265,7 @@ class MarginalDist:
             self.sample_size = sample_size
 
             self.sample_pdf = stats.loglaplace.pdf(data, c=self.params['c'], loc=self.params['loc'], scale=self.params['scale'])
-            self.sample_cdf = stats.loglaplace.cdf(data, c=self.params['c'], loc=self.params['loc'], scale=self.params['scale'])
+            self.sample_cdf = kn_.cdf("loglaplace", self.params, data)
 
         elif (operation=="sample"):
 
@@ -537,7 +1301,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating CDF:/n {params}")
 
-            self.cdf = stats.loglaplace.cdf(data, c=params['c'], loc=params['loc'], scale=params['scale'])
+            self.cdf = kn_.cdf("loglaplace", params, data)
 
             return self.cdf
         
@@ -549,7 +1313,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating PPF:/n {params}")
 
-            self.ppf = stats.loglaplace.ppf(data, c=params['c'], loc=params['loc'], scale=params['scale'])
+            self.ppf = kn_.ppf("loglaplace", params, data)
 
             return self.ppf
 
@@ -569,7 +1333,7 @@ class MarginalDist:
             self.sample_size = sample_size
 
             self.sample_pdf = stats.gamma.pdf(data, a=self.params['a'], loc=self.params['loc'], scale=self.params['scale'])
-            self.sample_cdf = stats.gamma.cdf(data, a=self.params['a'], loc=self.params['loc'], scale=self.params['scale'])
+            self.sample_cdf = kn_.cdf("gamma", self.params, data)
 
         elif (operation=="sample"):
 
@@ -606,7 +1370,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating CDF:/n {params}")
 
-            self.cdf = stats.gamma.cdf(data, a=params['a'], loc=params['loc'], scale=params['scale'])
+            self.cdf = kn_.cdf("gamma", params, data)
 
             return self.cdf
 
@@ -618,7 +1382,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating PPF:/n {params}")
 
-            self.ppf = stats.gamma.ppf(data, a=params['a'], loc=params['loc'], scale=params['scale'])
+            self.ppf = kn_.ppf("gamma", params, data)
 
             return self.ppf
 
@@ -636,7 +1400,7 @@ class MarginalDist:
             self.fitted_marginal_dist = "gaussian"
             self.sample_size = sample_size
 
-            self.sample_cdf = stats.norm.cdf(data, loc=self.params['loc'], scale=self.params['scale'])
+            self.sample_cdf = kn_.cdf("gaussian", self.params, data)
             self.sample_pdf = stats.norm.pdf(data, loc=self.params['loc'], scale=self.params['scale'])
 
         elif (operation=="sample"):
@@ -674,7 +1438,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating CDF:/n {params}")
 
-            self.cdf = stats.norm.cdf(data, loc=params['loc'], scale=params['scale'])
+            self.cdf = kn_.cdf("gaussian", params, data)
 
             return self.cdf
 
@@ -686,7 +1450,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating PPF:/n {params}")
 
-            self.ppf = stats.norm.ppf(data, loc=params['loc'], scale=params['scale'])
+            self.ppf = kn_.ppf("gaussian", params, data)
 
             return self.ppf
         
@@ -695,6 +1459,7 @@ class MarginalDist:
         
         Change Log: (MZ) 27-07-2023 fix the number of steps to be below 10,000 (for CDF estimation)
         Change Log: (MZ) 28-07-2023 format data to remove all nan
+        Change Log: (MZ) 18-10-2026: CDF grid computed in closed form (gaussian_kde_cdf) instead of numerical integration of the pdf
         """
 
         self.marginal_dist = "gaussian_kde"
@@ -727,14 +1492,10 @@ class MarginalDist:
             if (self.debug):
                 print(f"Step-size: {step_size}; Number of samples for KDE-CDF estimation: {len(expanded_x)}")
                 
-            expanded_u = self.generic_cdf(expanded_x, self.gaussian_kde_model.evaluate)
-            self.params["gaussian_kde"] = {
-                "x": expanded_x,
-                "u": expanded_u
-            }
+            expanded_u = np.maximum.accumulate(self.gaussian_kde_cdf(expanded_x, self.gaussian_kde_model)) #remove rounding noise, so that the grid is sorted
+            self.params["gaussian_kde"] = _sorted_grid(expanded_x, expanded_u)
 
-            interp_fn = self.fwd_CDF_fn(expanded_x, expanded_u)
-            self.sample_cdf = interp_fn(data)
+            self.sample_cdf = _grid_cdf(self.params["gaussian_kde"], data)
 
 
         if (operation=="pdf"):
@@ -757,11 +1518,7 @@ class MarginalDist:
 
             # y_cdf = np.array([tup[0] for tup in [quad(norm.pdf, a, b) for a, b in [(a, b) for a, b in zip(x, x[1:len(x)])]]] + [0]).cumsum()
 
-            x = params["gaussian_kde"]["x"]
-            u = params["gaussian_kde"]["u"]
-
-            interp_fn = self.fwd_CDF_fn(x=x, u=u)
-            self.cdf = interp_fn(data)
+            self.cdf = _grid_cdf(params["gaussian_kde"], data)
 
             return self.cdf
         
@@ -784,12 +1541,110 @@ class MarginalDist:
             x = params["gaussian_kde"]["x"]
             u = params["gaussian_kde"]["u"]
 
-            interp_fn = self.inv_CDF_fn(x, u)
-            self.ppf = interp_fn(data)
+            self.ppf = _grid_ppf(params["gaussian_kde"], data)
 
             return self.ppf, u, x
 
 
+    def gaussian_kde_binned_dist(self, data=None, operation="fit", new_params={"scale": None}, sample_size=None, bw_method=None):
+        """Compute binned Gaussian Kernel Density Estimate related operations
+        
+        The data is linearly binned onto a fixed grid of KDE_BINNED_GRID_SIZE points and convolved (FFT) with the Gaussian kernel, giving the pdf and CDF on the grid.
+        Only the grid is kept, so after binning (O(n)) memory and time do not depend on the number of rows. pdf, cdf and ppf interpolate the grid.
+        bw_method: None or 'scott' (default), 'silverman', or a scalar factor (bandwidth = factor * standard deviation), as in stats.gaussian_kde
+        """
+
+        self.marginal_dist = "gaussian_kde_binned"
+
+        if (data is None) or isinstance(data, (int, float)):
+            pass
+        else:
+            data = np.asarray(data, dtype=float)
+            data = data[~np.isnan(data)] #format data to remove all nan
+
+        if (operation=="fit"):
+            self.fitted_marginal_dist = "gaussian_kde_binned"
+            self.sample_size = sample_size
+
+            n = len(data)
+            if (bw_method is None) or (bw_method=='scott'):
+                factor = n ** (-1/5)
+            elif (bw_method=='silverman'):
+                factor = (n * 3 / 4) ** (-1/5)
+            else:
+                factor = float(bw_method)
+            bandwidth = factor * np.std(data, ddof=1)
+            self.params['scale'] = factor
+
+            # Grid (same bounds as gaussian_kde_dist)
+            lower, upper = self._get_bounds(data)
+            (grid_x, step_size) = np.linspace(lower, upper, num=KDE_BINNED_GRID_SIZE, retstep=True)
+
+            # Linear binning: each point splits its weight between the two nearest grid points
+            pos = (data - lower) / step_size
+            idx = np.clip(np.floor(pos).astype(np.int64), 0, KDE_BINNED_GRID_SIZE - 2)
+            frac = pos - idx
+            counts = np.bincount(idx, weights=1 - frac, minlength=KDE_BINNED_GRID_SIZE) + np.bincount(idx + 1, weights=frac, minlength=KDE_BINNED_GRID_SIZE)
+            counts = counts / n
+
+            # Kernel on grid offsets, truncated where it no longer changes in double precision
+            n_offsets = int(min(KDE_BINNED_GRID_SIZE - 1, np.ceil(KDE_CDF_TAIL * bandwidth / step_size)))
+            offsets = np.arange(-n_offsets, n_offsets + 1) * step_size / bandwidth
+
+            grid_pdf = np.clip(fftconvolve(counts, stats.norm.pdf(offsets) / bandwidth, mode='same'), 0, None)
+
+            # CDF: bins further than n_offsets below a grid point contribute their full weight
+            counts_below = np.r_[np.zeros(n_offsets + 1), np.cumsum(counts)][:KDE_BINNED_GRID_SIZE]
+            grid_u = fftconvolve(counts, ndtr(offsets), mode='same') + counts_below
+            grid_u = np.maximum.accumulate(np.clip(grid_u, 0, 1))
+
+            if (self.debug):
+                print(f"Step-size: {step_size}; Bandwidth: {bandwidth}; Number of grid points for binned KDE: {KDE_BINNED_GRID_SIZE}")
+
+            self.params["gaussian_kde_binned"] = {
+                **_sorted_grid(grid_x, grid_u),
+                "pdf": grid_pdf,
+                "bandwidth": bandwidth
+            }
+
+            self.sample_pdf = np.interp(data, grid_x, grid_pdf)
+            self.sample_cdf = np.interp(data, grid_x, grid_u)
+
+        elif (operation=="sample"):
+            if (sample_size is not None):
+                self.sample_size = sample_size
+            size = self.sample_size
+
+            uni = MarginalDist()
+            uni.uni_dist(operation="sample", new_params={"loc":0, "scale":1}, sample_size=size)
+
+            self.samples = self.gaussian_kde_binned_dist(data=uni.samples, operation="ppf")
+
+            return self.samples
+
+        elif (operation=="pdf"):
+            params = self.params #does not accept new_params
+
+            x = params["gaussian_kde_binned"]["x"]
+            self.pdf = np.interp(data, x, params["gaussian_kde_binned"]["pdf"], left=0, right=0)
+
+            return self.pdf
+
+        elif (operation=="cdf"):
+            params = self.params #does not accept new_params
+
+            x = params["gaussian_kde_binned"]["x"]
+            self.cdf = np.interp(data, x, params["gaussian_kde_binned"]["u"], left=0, right=1)
+
+            return self.cdf
+
+        elif (operation=="ppf"):
+            params = self.params #does not accept new_params
+
+            self.ppf = _grid_ppf(params["gaussian_kde_binned"], data)
+
+            return self.ppf
+
     def t_dist(self, data=None, operation="fit", new_params={"loc":None, "scale":None}, sample_size=None):
         """Compute Student t Distribution related operations"""
 
@@ -803,7 +1658,7 @@ class MarginalDist:
             self.fitted_marginal_dist = "student_t"
             self.sample_size = sample_size
 
-            self.sample_cdf = stats.t.cdf(data, df=self.params['df'], loc=self.params['loc'], scale=self.params['scale'])
+            self.sample_cdf = kn_.cdf("student_t", self.params, data)
             self.sample_pdf = stats.t.pdf(data, df=self.params['df'], loc=self.params['loc'], scale=self.params['scale'])
 
         elif (operation=="sample"):
@@ -839,7 +1694,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating CDF:/n {params}")
 
-            self.cdf = stats.t.cdf(data, df=params['df'],  loc=params['loc'], scale=params['scale'])
+            self.cdf = kn_.cdf("student_t", params, data)
 
             return self.cdf
         
@@ -850,7 +1705,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating PPF:/n {params}")
 
-            self.ppf = stats.t.ppf(data, df=params['df'], loc=params['loc'], scale=params['scale'])
+            self.ppf = kn_.ppf("student_t", params, data)
 
             return self.ppf
         
@@ -867,7 +1722,7 @@ class MarginalDist:
             self.fitted_marginal_dist = "uniform"
             self.sample_size = sample_size
 
-            self.sample_cdf = stats.uniform.cdf(data, loc=self.params['loc'], scale=self.params['scale'])
+            self.sample_cdf = kn_.cdf("uniform", self.params, data)
             self.sample_pdf = stats.uniform.pdf(data, loc=self.params['loc'], scale=self.params['scale'])
 
         elif (operation=="sample"):
@@ -902,7 +1757,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating CDF:/n {params}")
 
-            self.cdf = stats.uniform.cdf(data, loc=params['loc'], scale=params['scale'])
+            self.cdf = kn_.cdf("uniform", params, data)
 
             return self.cdf
 
@@ -913,7 +1768,7 @@ class MarginalDist:
                 if (self.fitted_marginal_dist in self.parametric):
                     print(f"Parameters used for generating PPF:/n {params}")
 
-            self.ppf = stats.uniform.ppf(data, loc=params['loc'], scale=params['scale'])
+            self.ppf = kn_.ppf("uniform", params, data)
 
             return self.ppf
         
@@ -956,29 +1811,18 @@ class MarginalDist:
         
         # x1 = np.r_[-np.inf, x] #moved to "fit" operation in empirical dist
         # u1 = np.r_[init_val, u]
-        x1 = x
-        u1 = u
-
-        input_pos = np.searchsorted(x1, input, 'left') - 1
-        interp = u1[input_pos]
 
-        return interp
+        return _eCDF_fn(input, x, u)
     
     # Build CDF forward function
     def fwd_CDF_fn(self, x, u):
 
-        a = np.argsort(u)
-        fn = interp1d(x[a], u[a], kind='linear', fill_value='extrapolate')
-
-        return fn
+        return _fwd_CDF_fn(x, u)
     
     # Build CDF inverse function
     def inv_CDF_fn(self, x, u):
 
-        a = np.argsort(u)
-        fn = interp1d(u[a], x[a], kind='linear', fill_value='extrapolate')
-
-        return fn
+        return _inv_CDF_fn(x, u)
     
     # Generic CDF using integration
     def generic_cdf(self, x, fn_pdf):
@@ -995,6 +1839,53 @@ class MarginalDist:
 
         return np.cumsum(cdf_list)
     
+    # Closed-form CDF of a Gaussian KDE
+    def gaussian_kde_cdf(self, x, kde_model):
+        """
+        Exact CDF of a univariate scipy.stats.gaussian_kde: F(x) = sum_i w_i * Phi((x - x_i) / h), h being the kernel bandwidth.
+        Grid points are processed in sorted blocks. Kernels far below a block contribute their full weight (cumulative sum), kernels far above contribute 0, 
+        and the remaining ones are evaluated in chunks of at most KDE_CDF_MAX_ELEMENTS.
+        Inputs:
+            x: array of values
+            kde_model: fitted (1-d) scipy.stats.gaussian_kde
+        Output:
+            u: array of cumulative probabilities at x
+        """
+
+        x = np.asarray(x, dtype=float)
+        bandwidth = np.sqrt(kde_model.covariance[0, 0])
+
+        # Sort the kernel centres once, with cumulative weights for the kernels below each block
+        data = kde_model.dataset[0]
+        data_order = np.argsort(data)
+        data = data[data_order]
+        weights = kde_model.weights[data_order]
+        cum_weights = np.r_[0, np.cumsum(weights)]
+
+        x_order = np.argsort(x.ravel())
+        x_sorted = x.ravel()[x_order]
+        u_sorted = np.empty(x_sorted.size)
+
+        chunk_size = max(1, KDE_CDF_MAX_ELEMENTS // KDE_CDF_BLOCK_SIZE)
+        for start in range(0, x_sorted.size, KDE_CDF_BLOCK_SIZE):
+            x_block = x_sorted[start:start + KDE_CDF_BLOCK_SIZE]
+
+            lo = np.searchsorted(data, x_block[0] - KDE_CDF_TAIL * bandwidth, 'left')
+            hi = np.searchsorted(data, x_block[-1] + KDE_CDF_TAIL * bandwidth, 'right')
+
+            u_block = np.full(x_block.size, cum_weights[lo])
+            for chunk_start in range(lo, hi, chunk_size):
+                chunk_stop = min(hi, chunk_start + chunk_size)
+                z = (x_block[:, None] - data[None, chunk_start:chunk_stop]) / bandwidth
+                u_block += ndtr(z) @ weights[chunk_start:chunk_stop]
+
+            u_sorted[start:start + KDE_CDF_BLOCK_SIZE] = u_block
+
+        u = np.empty(x_sorted.size)
+        u[x_order] = np.clip(u_sorted, 0, 1)
+
+        return u.reshape(x.shape)
+
     # Generic PDF by differentiating CDF
     def generic_pdf(self, x, fn_cdf):
         from scipy.misc import derivative
@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from copy import deepcopy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+
+class MarginalFitCache:
+    """
+    Cache of fitted MarginalDist instances, keyed by a hash of the column values, the candidate list and the fitting options.
+
+    A hit returns a copy of the fitted distribution, so that refitting an identical column (e.g. in several conditional copulas, or when re-running a pipeline
+    where only some columns changed) skips all MLE and KS work. Entries are kept in an in-memory LRU layer and, optionally, as pickles in a directory
+    whose total size is bounded (least recently used files are removed first).
+
+    Inputs:
+        max_entries (int): number of fits kept in memory (least recently used are evicted). Default is 256.
+        path (str, optional): directory of the on-disk layer (created if needed). Default is None (memory only).
+        max_disk_bytes (int): largest total size of the pickles in path. Default is 512 MB.
+    """
+
+    def __init__(self,
+        max_entries=256,
+        path=None,
+        max_disk_bytes=512 * 1024 ** 2
+    ):
+
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict() #key -> MarginalDist, most recently used last
+        self._lock = threading.Lock()
+
+        if (self.path is not None):
+            os.makedirs(self.path, exist_ok=True)
+
+    def __getstate__(self):
+        # Pickling an object that holds the cache (e.g. a fitted TabulaCopula) keeps the settings, statistics and disk layer only
+        state = self.__dict__.copy()
+        state["_memory"] = OrderedDict()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data, candidates=None, options=None):
+        """
+        Cache key of a fit.
+        Inputs:
+            data (array-like): column values. They are compared sorted and as float64, because a marginal fit does not depend on the row order, 
+                column name or index (e.g. rows shuffled by TabulaCopula sampling give the same key)
+            candidates (list, optional): candidate distributions, in order
+            options (dict, optional): MarginalDist options that change the fit
+        Returns:
+            key (str): hex digest
+        """
+        values = np.sort(np.asarray(data, dtype=float).ravel())
+
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(str(values.shape).encode())
+        hasher.update(values.tobytes())
+        hasher.update(json.dumps([candidates, options], sort_keys=True, default=str).encode())
+
+        return hasher.hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Fitted MarginalDist stored under key (a copy), or None.
+        Inputs: key (str)
+        Returns: univariate (MarginalDist or None)
+        """
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return deepcopy(self._memory[key])
+
+        univariate = None
+        if (self.path is not None) and os.path.exists(self._filename(key)):
+            try:
+                with open(self._filename(key), 'rb') as fl:
+                    univariate = pickle.load(fl)
+                os.utime(self._filename(key)) #most recently used
+            except (OSError, EOFError, pickle.UnpicklingError):
+                univariate = None
+
+        with self._lock:
+            if (univariate is None):
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._put_memory(key, univariate)
+
+        return deepcopy(univariate)
+
+    def put(self, key, univariate):
+        """
+        Store a (copy of a) fitted MarginalDist under key.
+        Inputs:
+            key (str)
+            univariate (MarginalDist)
+        """
+
+        univariate = deepcopy(univariate)
+
+        with self._lock:
+            self._put_memory(key, univariate)
+
+        if (self.path is not None):
+            # write to a temporary file first, so that readers never see a partial pickle
+            fd, tmp_filename = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as fl:
+                pickle.dump(univariate, fl, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filename, self._filename(key))
+
+            self._evict_disk()
+
+    def _put_memory(self, key, univariate):
+        """Insert into the memory layer and evict the least recently used entries (call with the lock held)"""
+
+        self._memory[key] = univariate
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Remove the least recently used pickles until their total size is at most max_disk_bytes"""
+
+        entries = []
+        for filename in os.listdir(self.path):
+            if filename.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.path, filename))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, filename))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, filename in sorted(entries):
+            if (total <= self.max_disk_bytes):
+                break
+            try:
+                os.remove(os.path.join(self.path, filename))
+            except OSError:
+                pass
+            total -= size
+
+    def disk_bytes(self):
+        """Total size of the pickles in the on-disk layer"""
+
+        if (self.path is None):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.path, filename)) for filename in os.listdir(self.path) if filename.endswith(".pkl"))
+
+    def clear(self, disk=False):
+        """Empty the memory layer (and the on-disk layer if disk is True)"""
+
+        with self._lock:
+            self._memory.clear()
+
+        if disk and (self.path is not None):
+            for filename in os.listdir(self.path):
+                if filename.endswith(".pkl"):
+                    os.remove(os.path.join(self.path, filename))
+
+    def stats(self):
+        """
+        Hit-rate report.
+        Returns:
+            stats (dict): memory_hits, disk_hits, misses, hit_rate (hits / lookups, None before the first lookup), memory_entries and disk_bytes
+        """
+
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else None,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self.disk_bytes()
+        }
@@ -0,0 +1,177 @@
+import numpy as np
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch (KLL) for univariate data streams.
+
+    Items are kept in a hierarchy of compactors: an item at level h stands for 2**h observations. When a level exceeds its capacity,
+    it is sorted and every other item (random offset) is promoted to the next level. Memory is O(k log(n/k)) and the rank error is O(1/k).
+    Two sketches built on disjoint data can be merged into a sketch of the union.
+
+    Inputs:
+        k (int): accuracy parameter, the capacity of the top level. Larger k gives smaller rank errors (about 1.7% at k=200, 99% confidence). Default is 200.
+        seed (int, optional): seed of the random generator used for compaction. Default is None.
+    """
+
+    def __init__(self,
+        k=200,
+        seed=None
+    ):
+
+        self.k = k
+        self.n = 0 #number of observations summarised
+        self.min = np.inf #exact minimum
+        self.max = -np.inf #exact maximum
+        self.levels = [np.empty(0)] #compactors, items at level h have weight 2**h
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        """Capacity of a compactor level (geometrically smaller below the top level)"""
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2/3) ** depth)))
+
+    def _compress(self):
+        """Compact levels until every level is within its capacity"""
+
+        level = 0
+        while level < len(self.levels):
+            if (self.levels[level].size > self._capacity(level)):
+                if (level + 1 == len(self.levels)):
+                    self.levels.append(np.empty(0))
+
+                items = np.sort(self.levels[level])
+
+                # an odd item stays at this level, so that weights are preserved
+                if (items.size % 2 == 1):
+                    self.levels[level] = items[-1:]
+                    items = items[:-1]
+                else:
+                    self.levels[level] = np.empty(0)
+
+                offset = self.rng.integers(2)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset::2]])
+
+                # capacities depend on the number of levels, start again from the bottom
+                level = 0
+            else:
+                level += 1
+
+    def update(self, values):
+        """
+        Add values to the sketch (missing values are ignored).
+        Inputs:
+            values (array-like): new observations
+        Returns:
+            self
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if (values.size == 0):
+            return self
+
+        self.n += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+        return self
+
+    def merge(self, other):
+        """
+        Merge another sketch into this one. The result summarises the union of both streams.
+        Inputs:
+            other (QuantileSketch): sketch to merge (unchanged)
+        Returns:
+            self
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.k = max(self.k, other.k)
+
+        self._compress()
+
+        return self
+
+    def _weighted_items(self):
+        """Sorted retained items and their cumulative weights"""
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2 ** level, dtype=np.int64) for level, items in enumerate(self.levels)])
+
+        sorting_index = np.argsort(values, kind='stable')
+
+        return values[sorting_index], np.cumsum(weights[sorting_index])
+
+    def cdf(self, x, side='right'):
+        """
+        Estimated fraction of observations <= x (side='right') or < x (side='left').
+        Inputs:
+            x (array-like): values
+            side (str): 'right' or 'left'
+        Returns:
+            u (np.array): estimated cumulative probabilities
+        """
+        if (self.n == 0):
+            raise ValueError('QuantileSketch is empty.')
+
+        values, cum_weights = self._weighted_items()
+        pos = np.searchsorted(values, np.asarray(x, dtype=float), side=side)
+        cum_weights = np.r_[0, cum_weights]
+
+        return cum_weights[pos] / self.n
+
+    def quantile(self, q):
+        """
+        Estimated q-quantiles of the observations.
+        Inputs:
+            q (array-like): probabilities in [0, 1]
+        Returns:
+            x (np.array): estimated quantiles (exact for q=0 and q=1)
+        """
+        if (self.n == 0):
+            raise ValueError('QuantileSketch is empty.')
+
+        q = np.asarray(q, dtype=float)
+        values, cum_weights = self._weighted_items()
+        pos = np.clip(np.searchsorted(cum_weights, q * self.n, side='left'), 0, values.size - 1)
+
+        x = values[pos]
+        x = np.where(q <= 0, self.min, x)
+        x = np.where(q >= 1, self.max, x)
+
+        return x
+
+    def cdf_points(self):
+        """
+        Step points (x, u) of the estimated empirical CDF, u being the fraction of observations <= x. The exact minimum is included at u=0.
+        Returns:
+            x (np.array): sorted distinct values
+            u (np.array): estimated cumulative probabilities (last value is 1)
+        """
+        if (self.n == 0):
+            raise ValueError('QuantileSketch is empty.')
+
+        values, cum_weights = self._weighted_items()
+
+        # keep the last cumulative weight of each distinct value
+        last = np.r_[values[1:] != values[:-1], True]
+        x = values[last]
+        u = cum_weights[last] / self.n
+
+        if (x[0] > self.min):
+            x = np.r_[self.min, x]
+            u = np.r_[0, u]
+
+        return x, u
+
+    def size(self):
+        """Number of retained items"""
+        return int(sum(items.size for items in self.levels))
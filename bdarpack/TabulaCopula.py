@@ -1,10 +1,12 @@
 from bdarpack import utils_ as ut_
 import pandas as pd
-from copy import deepcopy
+from copy import copy, deepcopy
 import os, sys
 import pickle
 from bdarpack.Transformer import Transformer
-from bdarpack.GaussianCopula import GaussianCopula
+from bdarpack.GaussianCopula import GaussianCopula, load_model
+from bdarpack.MarginalDist import DISCRETE_MAX_UNIQUE
+from bdarpack.MarginalFitCache import MarginalFitCache
 from pprint import pprint
 
 try:
@@ -36,6 +38,22 @@ def load_TC(defi):
     
     return tc
 
+def load_TC_model(path):
+    """Function to load a model saved by TabulaCopula.export_model() (no training data, definitions or class instance needed).
+    Inputs:
+        path (str): directory of the exported model
+    Returns:
+        gaussian_copula (GaussianCopula): fitted copula, with memory-mapped arrays
+        transformer (Transformer): transformer holding only the metadata needed by transformer.reverse()
+    """
+
+    gaussian_copula = load_model(path)
+
+    with open(os.path.join(path, "transformer.pkl"), 'rb') as fl:
+        transformer = pickle.load(fl)
+
+    return gaussian_copula, transformer
+
 class TabulaCopula:
     """
     Wrapper for performing copula/conditional-copula (Gaussian) for Tabular-type data.
@@ -56,6 +74,12 @@ class TabulaCopula:
 
         debug (bool): Flag to print debugging lines. Default is `True`.
 
+        marginal_fit_cache (str): Cache fitted marginal distributions, so that identical columns (with the same candidates) are not refitted by the copula, 
+            the conditional copulas or later fits of this instance. 'memory' keeps them in memory, 'disk' also under the output directory (output_filenames['marginal_fit_cache']), 
+            so that other runs can reuse them. Default is None (no cache).
+
+        marginal_fit_cache_bytes (int): Largest total size of the on-disk cache ('disk'). Default is 512 MB.
+
     Example inputs:
         conditionalSettings_dict = {
             "set_1": {
@@ -89,6 +113,10 @@ class TabulaCopula:
         (MZ) 25-09-2023: update save_outputFilenames to save dataframe index columsn
         (MZ) 25-09-2023: fix bug which overwrites dictionary definition of output_general_prefix with ''
         (MZ) 29-09-2023: add privacy leakage functionalities
+        (MZ) 18-10-2026: add export_model() to save a compact, memory-mappable sampling model (load with load_TC_model())
+        (MZ) 18-10-2026: add marginal_fit_cache option (MarginalFitCache shared by the copula and conditional copulas)
+        (MZ) 18-10-2026: add group_one_hot option to fit_gaussian_copula()/fit_gaussian_copula_conditional() (one latent dimension per one-hot field)
+        (MZ) 18-10-2026: pass the transformer types to the copulas ('discrete' marginals per column type), add marginal_discrete_max_unique option to fit_gaussian_copula()/fit_gaussian_copula_conditional()
     """
 
     def __init__(self,
@@ -99,7 +127,9 @@ class TabulaCopula:
         var_list_filter=None,
         removeNull=False,
         sampling = None,
-        debug=True
+        debug=True,
+        marginal_fit_cache=None,
+        marginal_fit_cache_bytes=512 * 1024 ** 2
     ):
         
         self.debug = debug
@@ -157,6 +187,14 @@ class TabulaCopula:
         self.build_storage()
         self.build_conditional_storage()
 
+        # CACHE OF FITTED MARGINAL DISTRIBUTIONS
+        if (marginal_fit_cache=='disk'):
+            self.marginal_fit_cache = MarginalFitCache(path=self.output_filenames["marginal_fit_cache"], max_disk_bytes=marginal_fit_cache_bytes)
+        elif (marginal_fit_cache=='memory'):
+            self.marginal_fit_cache = MarginalFitCache()
+        else:
+            self.marginal_fit_cache = None
+
     def _update_defaults(self, var_to_update, new_value, definitions):
         if hasattr(definitions, new_value):
             attr = getattr(definitions, new_value)
@@ -541,20 +579,35 @@ class TabulaCopula:
         
         return 0
     
-    def fit_gaussian_copula(self, correlation_method='kendall', marginal_dist_dict=None):
+    def fit_gaussian_copula(self, correlation_method='kendall', marginal_dist_dict=None, n_jobs=None, correlation_sample_size=None, correlation_se_target=None, correlation_structure='dense', n_factors=10, group_one_hot=False, marginal_discrete_max_unique=DISCRETE_MAX_UNIQUE):
+        """
+        Fit a Gaussian Copula to the transformed data.
+        Inputs:
+            correlation_method (str): method used to compute the correlation matrix ('kendall', 'kendall_fast', 'spearman' or 'pearson'). Default is 'kendall'.
+            marginal_dist_dict (dict): dictionary of candidate marginal distributions per variable. Default is None.
+            n_jobs (int): number of worker processes used to fit the marginal distributions (-1 uses all cores). Default is None (sequential).
+            correlation_sample_size (int): estimate the correlation matrix on a stratified subsample of this many rows (approximate). Default is None (all rows).
+            correlation_se_target (float): largest acceptable standard error of a correlation entry, the subsample grows until it is met. Default is None.
+            correlation_structure (str): 'dense' (default) or 'factor' (low-rank-plus-diagonal correlation, for very wide one-hot data).
+            n_factors (int): number of factors when correlation_structure='factor'. Default is 10.
+            group_one_hot (bool): model the output columns of each 'One-Hot' field as one categorical latent dimension (see GaussianCopula.fit transformer_meta_dict), 
+                so that a K-level field adds one dimension to the copula instead of K. Default is False.
+            marginal_discrete_max_unique (int): 'Numerical-INT' and 'LabelEncoding' columns with at most this many distinct values get the exact 'discrete' marginal 
+                (binary 'Boolean'/'.is_null' columns always do, see GaussianCopula marginal_discrete_max_unique). None disables. Default is DISCRETE_MAX_UNIQUE (50).
+        """
 
         # Get transformed data
         transformed_df = self.transformed_df
 
         # Fit Gaussian Copula using given options
-        gaussian_copula = GaussianCopula(debug=self.debug, correlation_method=correlation_method)
-        gaussian_copula.fit(transformed_df, marginal_dist_dict=marginal_dist_dict)
+        gaussian_copula = GaussianCopula(debug=self.debug, correlation_method=correlation_method, correlation_sample_size=correlation_sample_size, correlation_se_target=correlation_se_target, correlation_structure=correlation_structure, n_factors=n_factors, marginal_discrete_max_unique=marginal_discrete_max_unique, fit_cache=getattr(self, "marginal_fit_cache", None))
+        gaussian_copula.fit(transformed_df, marginal_dist_dict=marginal_dist_dict, n_jobs=n_jobs, transformer_meta_dict=self.storage['transformer'].transformer_meta_dict, group_one_hot=group_one_hot)
 
         # Save learned Gaussian Copula
         self.storage['copula'] = gaussian_copula
 
-    def fit_gaussian_copula_conditional(self, correlation_method='kendall', marginal_dist_dict=None):
-        """Build Conditional Copula for given conditional_dict"""
+    def fit_gaussian_copula_conditional(self, correlation_method='kendall', marginal_dist_dict=None, n_jobs=None, correlation_structure='dense', n_factors=10, group_one_hot=False, marginal_discrete_max_unique=DISCRETE_MAX_UNIQUE):
+        """Build Conditional Copula for given conditional_dict (n_jobs: number of worker processes used to fit the marginal distributions; correlation_structure/n_factors/group_one_hot/marginal_discrete_max_unique: see fit_gaussian_copula)"""
 
         for set_no, conditionalBody in self.conditionalSettings_dict.items():
 
@@ -581,8 +634,9 @@ class TabulaCopula:
                         print(transformed_filtered_conditional)
 
                     # Fit Gaussian Copula using given options
-                    gaussian_copula_conditional = GaussianCopula(debug=self.debug, correlation_method=correlation_method)
-                    gaussian_copula_conditional.fit(transformed_filtered_conditional, marginal_dist_dict=marginal_dist_dict)
+                    gaussian_copula_conditional = GaussianCopula(debug=self.debug, correlation_method=correlation_method, correlation_structure=correlation_structure, n_factors=n_factors, marginal_discrete_max_unique=marginal_discrete_max_unique, fit_cache=getattr(self, "marginal_fit_cache", None))
+                    transformer_meta_dict = self.storage['cond_transformer'][set_no].transformer_meta_dict
+                    gaussian_copula_conditional.fit(transformed_filtered_conditional, marginal_dist_dict=marginal_dist_dict, n_jobs=n_jobs, transformer_meta_dict=transformer_meta_dict, group_one_hot=group_one_hot)
 
                     if ( not gaussian_copula_conditional.fitted):
                         print(f"Building conditional-copulae for {set_no}-{merged_set_index} Failed!")
@@ -607,6 +661,51 @@ class TabulaCopula:
         # Output to file
         self._save_data_to_file(self.syn_samples_df, self.output_filenames['synthetic_samples'])
 
+    def sample_gaussian_copula_iter(self, sample_size=1, chunk_size=100000, conditions=None):
+        """
+        Streams synthetic samples from the fitted copula to file, chunk by chunk, so that peak memory is bounded by chunk_size.
+        Each chunk is reverse-transformed and appended to the synthetic (SYN) and reversed (REV) output files. Only 'csv' outputs are supported.
+        Inputs:
+            sample_size (int): total number of synthetic samples to generate.
+            chunk_size (int): maximum number of samples held in memory at once. Default is 100000.
+            conditions (dict): conditions passed to GaussianCopula.sample(). Default is None.
+        Returns:
+            n_samples (int): number of samples written to file.
+        Raises:
+            ValueError: If an output file is not 'csv' (checked before any sample is drawn or written).
+        """
+
+        # Check output files up front, so that an unsupported extension does not leave a half-written file
+        for output in ['synthetic_samples', 'reversed_samples']:
+            file_ext = ut_.get_extension(self.output_filenames[output])
+            if (file_ext!='csv'):
+                raise ValueError(f"Not able to stream samples to file for extension type: {file_ext} ({output}), only csv is supported")
+
+        # Get Copula and Transformer
+        gaussian_copula = self.storage['copula']
+        transformer = self.storage['transformer']
+
+        n_samples = 0
+        for syn_samples_chunk_df in gaussian_copula.sample_iter(total_size=sample_size, chunk_size=chunk_size, conditions=conditions):
+
+            reversed_chunk_df = transformer.reverse(syn_samples_chunk_df)
+
+            # Output to file (first chunk overwrites, following chunks are appended)
+            append = n_samples > 0
+            self._save_data_to_file(syn_samples_chunk_df, self.output_filenames['synthetic_samples'], append=append)
+            self._save_data_to_file(reversed_chunk_df, self.output_filenames['reversed_samples'], append=append)
+
+            n_samples += len(syn_samples_chunk_df)
+
+            if (self.debug):
+                print(f"Streamed {n_samples}/{sample_size} synthetic samples to file.")
+
+        # Samples are not kept in memory
+        self.syn_samples_df = None
+        self.reversed_df = None
+
+        return n_samples
+
     def sample_gaussian_copula_conditional(self):
 
         samples = deepcopy(self.syn_samples_df) # Get generated set of synthetic samples
@@ -661,12 +760,13 @@ class TabulaCopula:
 
                             if parentVarTransform_meta['transformer_type']=='One-Hot':
                                 parentVarTransform_meta_params_dict = parentVarTransform_meta['params_dict']
+                                hotCols = samples[list(parentVarTransform_meta_outputfields)].idxmax(axis=1) # decoded as in Transformer.reverse() (a row without a hot column does not match every value)
                                 for set_value in set_values:
                                     hotCol = parentVarTransform_meta_params_dict[set_value]
                                     if sub_cond_array is None:
-                                        sub_cond_array = (samples[hotCol] == samples[parentVarTransform_meta_outputfields].max(axis=1))
+                                        sub_cond_array = (hotCols == hotCol)
                                     else:
-                                        sub_cond_array = sub_cond_array | (samples[hotCol] == samples[parentVarTransform_meta_outputfields].max(axis=1))
+                                        sub_cond_array = sub_cond_array | (hotCols == hotCol)
 
                             elif parentVarTransform_meta['transformer_type'] == 'LabelEncoding':
                                 parentVarTransform_meta_params_dict = parentVarTransform_meta['params_dict']
@@ -739,7 +839,7 @@ class TabulaCopula:
                                     print(f"Covariates Threshold = {conditions_var}")
 
                                 for c_var in childVarTransform_meta_outputfields: #add all non-parent variables that exceed threshold as covariates
-                                    cov_df = gaussian_copula_conditional.correlation[c_var].abs()
+                                    cov_df = gaussian_copula_conditional.correlation_column(c_var).abs()
                                     new_cov_df = cov_df[(cov_df>=conditions_var)]
                                     conditions_Array.extend(list(new_cov_df.index))
 
@@ -753,30 +853,18 @@ class TabulaCopula:
                             print(f"Covariates Used for Sampling: {conditions_Array}")
 
 
-                        # Resample Selected Rows
-                        ii = 1
-                        for s_index, s_row in sampling_condition_array.iterrows():
+                        # Resample Selected Rows (one conditional sample per row, drawn in a single batch)
+                        if (len(sampling_condition_array) > 0):
 
                             # build conditions from covariates
-                            if (len(conditions_Array) == 0):
-                                conditions = None
-                            else:
-                                s_row_e = s_row[conditions_Array]
-                                conditions = s_row_e.to_dict()
+                            conditions_df = sampling_condition_array[conditions_Array]
 
-                            if (self.debug):
-                                print(conditions)
-                            cond_samples = gaussian_copula_conditional.sample(size=1, conditions=conditions)
+                            cond_samples = gaussian_copula_conditional.sample_conditional_batch(conditions_df)
 
                             if (self.debug):
-                                print(ii)
-                                print(s_index)
-                                # print(cond_samples.iloc[0][conditions_Array])
-                                print(cond_samples.iloc[0][childVarTransform_meta_outputfields])
+                                print(cond_samples[childVarTransform_meta_outputfields])
 
-                            
-                            samples.loc[s_index,childVarTransform_meta_outputfields] = cond_samples.iloc[0][childVarTransform_meta_outputfields]
-                            ii += 1
+                            samples.loc[cond_samples.index, childVarTransform_meta_outputfields] = cond_samples[childVarTransform_meta_outputfields].to_numpy()
 
         # Save generated samples
         self.syn_samples_conditional_df = deepcopy(samples)
@@ -1083,6 +1171,18 @@ class TabulaCopula:
         training_filename = self.syn_data_path + training_filename
         self.output_filenames["training_samples"] = training_filename
 
+        # For exported sampling model (directory, see export_model)
+        model_filename_suffix = "MODEL"
+        model_filename = ut_.update_filename_with_suffix(self.output_filename_withprefix, model_filename_suffix)
+        model_filename = self.syn_data_path + os.path.splitext(model_filename)[0]
+        self.output_filenames["model"] = model_filename
+
+        # For cached marginal distribution fits (directory, see MarginalFitCache)
+        marginal_fit_cache_suffix = "MARGINALCACHE"
+        marginal_fit_cache_filename = ut_.update_filename_with_suffix(self.output_filename_withprefix, marginal_fit_cache_suffix)
+        marginal_fit_cache_filename = self.syn_data_path + os.path.splitext(marginal_fit_cache_filename)[0]
+        self.output_filenames["marginal_fit_cache"] = marginal_fit_cache_filename
+
         # For Singling Out Privacy Leakage Test (Univariate)
         singlingOut_suffix = "SINGLINGOUT_UNI"
         singlingOut_filename = ut_.update_filename_with_suffix(self.output_filename_withprefix, singlingOut_suffix)
@@ -1183,7 +1283,7 @@ class TabulaCopula:
             self.conditional_set_bool = True
 
 
-    def _save_data_to_file(self, df, filename, indexTrue=False, sheetname="Sheet1"):
+    def _save_data_to_file(self, df, filename, indexTrue=False, sheetname="Sheet1", append=False):
         """
         Saves a dataframe to file based on the file extension of the given filename.
         Inputs:
@@ -1191,6 +1291,7 @@ class TabulaCopula:
             filename (string): the name of the file to save the dataframe to.
             indexTrue (boolean): whether to save the index of the DF. Default is False
             sheetname (string, optional): The name of the sheet to save the dataframe on, only applicable for xlsx file extensions. Default is "Sheet1". 
+            append (boolean): whether to append the rows to an existing file (without header). Only applicable for csv file extensions. Default is False.
 
         Returns:
             None
@@ -1202,7 +1303,10 @@ class TabulaCopula:
         file_ext = ut_.get_extension(filename)
 
         if (file_ext=='csv'):
-            ut_.save_df_as_csv(df, filename, index=indexTrue)
+            ut_.save_df_as_csv(df, filename, index=indexTrue, append=append)
+
+        elif (file_ext=='xlsx') and append:
+            raise ValueError(f"Not able to append data to file for extension type: {file_ext}")
 
         elif (file_ext=='xlsx'):
             ut_.save_df_as_excel(df, 
@@ -1245,6 +1349,35 @@ class TabulaCopula:
 
         return b
     
+    def export_model(self, path=None):
+        """Exports only what is needed to sample and reverse-transform synthetic data: the fitted copula (see GaussianCopula.export_model) and the transformer metadata.
+        The training data is not stored. Load with load_TC_model(path).
+        Inputs:
+            path (str): output directory. Default is None (output_filenames['model'] in the synthetic data folder).
+        Returns:
+            path (str): the output directory
+        """
+
+        if path is None:
+            path = self.output_filenames['model']
+
+        print(f"Exporting sampling model to: {path}")
+
+        # Copula: correlation, marginal parameters and grids
+        gaussian_copula = self.storage['copula']
+        gaussian_copula.export_model(path)
+
+        # Transformer without the curated training data (reverse() only needs transformer_meta_dict)
+        transformer = copy(self.storage['transformer'])
+        transformer.data_curated_df = None
+        b = self._save_to_pickle(transformer, os.path.join(path, "transformer.pkl"))
+        if b:
+            print(f"Exporting sampling model complete.")
+        else:
+            print(f"Exporting sampling model failed.")
+
+        return path
+
     def save_outputFilenames(self):
         """Saves the output filenames dictionary to a csv file
         """
@@ -0,0 +1,178 @@
+import numpy as np
+from scipy import special
+
+# FAST DISTRIBUTION KERNELS
+# cdf/ppf of the standard normal and of the parametric marginal families, evaluated directly with scipy.special ufuncs instead of
+# scipy.stats distribution objects, which validate their arguments and broadcast shapes on every call (the overhead dominates small batches).
+# Parameters are not checked: they are assumed to come from a successful fit. Results match scipy.stats, with the same conventions at the
+# support bounds (cdf 0/1 outside the support, ppf(0)/ppf(1) the support bounds, nan for nan inputs and probabilities outside [0, 1]).
+#
+# Every function takes an optional preallocated output buffer out (float64, shape of the input; it may be the input itself) and computes
+# in place, so that repeated calls in sampling loops do not allocate temporaries.
+
+def _buffer(x, out):
+    """Input as a float array and the output buffer (allocated if out is None)"""
+    x = np.asarray(x, dtype=float)
+    if out is None:
+        out = np.empty(x.shape)
+    return x, out
+
+def _result(x, out):
+    """Scalar inputs give scalar results, as with scipy.stats"""
+    return out[()] if (x.ndim == 0) else out
+
+def _standardize(x, params, out):
+    """out = (x - loc) / scale"""
+    np.subtract(x, params['loc'], out=out)
+    np.divide(out, params['scale'], out=out)
+    return out
+
+def _rescale(params, out):
+    """out = loc + scale * out"""
+    np.multiply(out, params['scale'], out=out)
+    np.add(out, params['loc'], out=out)
+    return out
+
+# STANDARD NORMAL
+def norm_cdf(x, out=None):
+    """Standard normal CDF"""
+    x, out = _buffer(x, out)
+    special.ndtr(x, out=out)
+    return _result(x, out)
+
+def norm_ppf(u, out=None):
+    """Standard normal PPF (inverse CDF)"""
+    u, out = _buffer(u, out)
+    special.ndtri(u, out=out)
+    return _result(u, out)
+
+# PARAMETRIC FAMILIES (params as in MarginalDist.params)
+def _laplace_std_cdf(out):
+    """In-place standard Laplace CDF: 0.5 exp(-|z|), reflected for z >= 0"""
+    upper = (out >= 0)
+    np.abs(out, out=out)
+    np.negative(out, out=out)
+    np.exp(out, out=out)
+    np.multiply(out, 0.5, out=out)
+    np.subtract(1, out, out=out, where=upper)
+    return out
+
+def _laplace_std_ppf(u, out):
+    """Standard Laplace PPF: log(2u) below the median, -log(2 - 2u) above (accurate in both tails)"""
+    upper = (u >= 0.5)
+    np.multiply(u, 2, out=out)
+    np.subtract(2, out, out=out, where=upper)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.log(out, out=out)
+    np.negative(out, out=out, where=upper)
+    return out
+
+def _gaussian_cdf(params, x, out):
+    return special.ndtr(_standardize(x, params, out), out=out)
+
+def _gaussian_ppf(params, u, out):
+    return _rescale(params, special.ndtri(u, out=out))
+
+def _laplace_cdf(params, x, out):
+    return _laplace_std_cdf(_standardize(x, params, out))
+
+def _laplace_ppf(params, u, out):
+    return _rescale(params, _laplace_std_ppf(u, out))
+
+def _loglaplace_cdf(params, x, out):
+    # c log(y) is standard Laplace distributed
+    _standardize(x, params, out)
+    np.maximum(out, 0, out=out)
+    with np.errstate(divide='ignore'):
+        np.log(out, out=out)
+    np.multiply(out, params['c'], out=out)
+    return _laplace_std_cdf(out)
+
+def _loglaplace_ppf(params, u, out):
+    _laplace_std_ppf(u, out)
+    np.divide(out, params['c'], out=out)
+    np.exp(out, out=out)
+    return _rescale(params, out)
+
+def _gamma_cdf(params, x, out):
+    np.maximum(_standardize(x, params, out), 0, out=out)
+    return special.gammainc(params['a'], out, out=out)
+
+def _gamma_ppf(params, u, out):
+    return _rescale(params, special.gammaincinv(params['a'], u, out=out))
+
+def _beta_cdf(params, x, out):
+    np.clip(_standardize(x, params, out), 0, 1, out=out)
+    return special.betainc(params['a'], params['b'], out, out=out)
+
+def _beta_ppf(params, u, out):
+    return _rescale(params, special.betaincinv(params['a'], params['b'], u, out=out))
+
+def _t_cdf(params, x, out):
+    return special.stdtr(params['df'], _standardize(x, params, out), out=out)
+
+def _t_ppf(params, u, out):
+    lower = (u < 0.5)
+    special.stdtrit(params['df'], u, out=out)
+    out[lower & (out == np.inf)] = -np.inf #stdtrit overflows to +inf for u = 0 (and u < ~1e-300)
+    return _rescale(params, out)
+
+def _uniform_cdf(params, x, out):
+    return np.clip(_standardize(x, params, out), 0, 1, out=out)
+
+def _uniform_ppf(params, u, out):
+    outside = (u < 0) | (u > 1)
+    np.copyto(out, u)
+    out[outside] = np.nan
+    return _rescale(params, out)
+
+SHAPE_PARAMS = {
+    "gaussian": [],
+    "laplace": [],
+    "loglaplace": ["c"],
+    "gamma": ["a"],
+    "beta": ["a", "b"],
+    "student_t": ["df"],
+    "uniform": []
+} #params of each family besides loc and scale
+
+KERNELS = {
+    "gaussian": (_gaussian_cdf, _gaussian_ppf),
+    "laplace": (_laplace_cdf, _laplace_ppf),
+    "loglaplace": (_loglaplace_cdf, _loglaplace_ppf),
+    "gamma": (_gamma_cdf, _gamma_ppf),
+    "beta": (_beta_cdf, _beta_ppf),
+    "student_t": (_t_cdf, _t_ppf),
+    "uniform": (_uniform_cdf, _uniform_ppf)
+}
+
+def cdf(dist, params, x, out=None):
+    """
+    CDF of a parametric marginal family.
+    Inputs:
+        dist (str): family name, a key of KERNELS (MarginalDist names)
+        params (dict): fitted parameters (loc, scale and the shape parameters of the family)
+        x (array-like): values
+        out (ndarray, optional): float64 output buffer with the shape of x (may be x itself)
+    Returns:
+        cdf (ndarray or float)
+    """
+    x, out = _buffer(x, out)
+    KERNELS[dist][0](params, x, out)
+    return _result(x, out)
+
+def ppf(dist, params, u, out=None):
+    """
+    PPF (inverse CDF) of a parametric marginal family.
+    Inputs:
+        dist (str): family name, a key of KERNELS (MarginalDist names)
+        params (dict): fitted parameters (loc, scale and the shape parameters of the family). Arrays of parameters broadcast against u, 
+            e.g. one value per column of an n x g array u evaluates g fitted marginals of the family in one call
+        u (array-like): probabilities
+        out (ndarray, optional): float64 output buffer with the shape of u (may be u itself)
+    Returns:
+        ppf (ndarray or float)
+    """
+    u, out = _buffer(u, out)
+    KERNELS[dist][1](params, u, out)
+    return _result(u, out)
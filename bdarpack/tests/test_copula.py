@@ -0,0 +1,869 @@
+import unittest
+import sys, os
+import pickle
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+
+# run this in cmd: python -m bdarpack.tests.test_copula -v
+
+if __name__ == '__main__':
+    if __package__ is None:
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        par_dir = os.path.dirname(dir_path)
+        sys.path.insert(0, par_dir)
+        head, sep, tail = dir_path.partition('copula-tabular')
+        sys.path.insert(0, head+sep) # adding par_dir to system path
+
+
+from bdarpack.GaussianCopula import GaussianCopula, load_model
+from bdarpack.MarginalDist import MarginalDist
+from bdarpack.MarginalFitCache import MarginalFitCache
+from bdarpack import utils_ as ut_
+from bdarpack import kernels_ as kn_
+
+class TestMarginalDist(unittest.TestCase):
+
+    def test_gaussian_kde_cdf(self):
+
+        from scipy.stats import gaussian_kde, norm
+
+        rng = np.random.default_rng(2)
+        data = np.r_[rng.normal(size=150), rng.gamma(2, size=150) + 4]
+        kde_model = gaussian_kde(data)
+        bandwidth = np.sqrt(kde_model.covariance[0, 0])
+
+        uni = MarginalDist()
+        x = np.linspace(data.min() - 3, data.max() + 3, 400)
+        u = uni.gaussian_kde_cdf(x, kde_model)
+
+        np.testing.assert_allclose(u, norm.cdf((x[:, None] - data[None, :]) / bandwidth).mean(axis=1), rtol=0, atol=1e-12)
+
+        # same increments as integrating the pdf numerically
+        u_quad = uni.generic_cdf(x[:50], kde_model.evaluate)
+        np.testing.assert_allclose(u_quad[:-1], u[1:50] - u[0], rtol=0, atol=1e-8)
+
+    def test_gaussian_kde_binned(self):
+
+        from scipy.stats import gaussian_kde
+
+        rng = np.random.default_rng(3)
+        data = np.r_[rng.normal(size=2000), rng.gamma(2, size=2000) + 4]
+        kde_model = gaussian_kde(data)
+
+        # selected automatically above the row threshold
+        uni = MarginalDist(kde_binned_threshold=1000)
+        self.assertTrue(uni.fit(data, candidates=['gaussian_kde']))
+        self.assertEqual(uni.fitted_marginal_dist, 'gaussian_kde_binned')
+
+        x = np.linspace(-4, 14, 300)
+        np.testing.assert_allclose(uni.pdf_wrapper(data=x), kde_model.evaluate(x), rtol=0, atol=1e-5)
+        np.testing.assert_allclose(uni.cdf_wrapper(data=x), uni.gaussian_kde_cdf(x, kde_model), rtol=0, atol=1e-5)
+
+        q = np.linspace(0.01, 0.99, 25)
+        np.testing.assert_allclose(uni.cdf_wrapper(data=uni.ppf_wrapper(data=q)), q, rtol=0, atol=1e-9)
+
+        uni = MarginalDist(kde_binned_threshold=None)
+        uni.fit(data, candidates=['gaussian_kde'])
+        self.assertEqual(uni.fitted_marginal_dist, 'gaussian_kde')
+
+    def test_ks_1samp_sorted(self):
+
+        from scipy import stats
+
+        rng = np.random.default_rng(6)
+        cdfs = [lambda x: stats.gamma.cdf(x, 2), lambda x: stats.norm.cdf(x, loc=2, scale=1.4), stats.expon.cdf]
+        for n in [3, 200, 5000]:
+            data = rng.gamma(2, size=n)
+            sorted_data = np.sort(data)
+            ks_statistics, ks_pvalues = ut_.ks_1samp_sorted(np.vstack([cdf(sorted_data) for cdf in cdfs]))
+            for j, cdf in enumerate(cdfs):
+                result = stats.kstest(data, cdf)
+                self.assertEqual(ks_statistics[j], result.statistic)
+                self.assertAlmostEqual(ks_pvalues[j], result.pvalue, places=12)
+
+    def test_select_univariate_options(self):
+
+        rng = np.random.default_rng(4)
+        data = rng.laplace(loc=2, scale=1, size=3000)
+        candidates = ['beta', 'gaussian', 'laplace', 'student_t', 'uniform']
+
+        uni = MarginalDist()
+        uni.fit(data, candidates=candidates)
+        self.assertEqual(uni.selection_stats['beta']['status'], 'skipped') # heavy tails rule out beta
+        self.assertEqual(uni.fitted_marginal_dist, 'laplace')
+
+        # thread pool gives the same selection and statistics
+        uni_threads = MarginalDist(n_jobs=3)
+        uni_threads.fit(data, candidates=candidates)
+        self.assertEqual(uni_threads.fitted_marginal_dist, 'laplace')
+        self.assertDictEqual(uni_threads.selection_stats, uni.selection_stats)
+
+        # first acceptable candidate wins, the remaining fits are cancelled
+        uni_first = MarginalDist(selection='first')
+        uni_first.fit(data, candidates=['gaussian', 'laplace', 'student_t'])
+        self.assertEqual(uni_first.fitted_marginal_dist, 'laplace')
+        self.assertEqual(uni_first.selection_stats['gaussian']['status'], 'fitted')
+        self.assertEqual(uni_first.selection_stats['laplace']['status'], 'first')
+        self.assertEqual(uni_first.selection_stats['student_t']['status'], 'cancelled')
+
+        # in parallel, the winner is still the first acceptable candidate in candidate order (not the fastest fit)
+        candidates = ['student_t', 'gaussian_kde', 'laplace', 'uniform']
+        uni_first = MarginalDist(selection='first')
+        uni_first.fit(data, candidates=candidates)
+        for options in [{'n_jobs': 4}, {'n_jobs': 4, 'candidate_timeout': 30}]:
+            uni_parallel = MarginalDist(selection='first', **options)
+            uni_parallel.fit(data, candidates=candidates)
+            self.assertEqual(uni_parallel.fitted_marginal_dist, uni_first.fitted_marginal_dist)
+            self.assertDictEqual(uni_parallel.selection_stats, uni_first.selection_stats)
+
+    def test_stateless_evaluation(self):
+
+        rng = np.random.default_rng(7)
+        data = rng.gamma(2, size=800) + 1
+        x = np.linspace(0, 10, 50)
+        q = np.linspace(0.01, 0.99, 50)
+
+        for uni_dist in ['beta', 'laplace', 'loglaplace', 'gamma', 'gaussian', 'student_t', 'uniform', 'emp', 'emp_sketch', 'gaussian_kde', 'gaussian_kde_binned']:
+            uni = MarginalDist()
+            uni.fit(data, candidates=[uni_dist])
+            self.assertEqual(uni.fitted_marginal_dist, uni_dist)
+
+            np.testing.assert_allclose(uni.compute_cdf(x), uni.cdf_wrapper(data=x))
+            np.testing.assert_allclose(uni.compute_ppf(q), uni.ppf_wrapper(data=q))
+            samples = uni.compute_samples(100, rng=np.random.default_rng(0))
+            self.assertEqual(samples.shape, (100, ))
+            np.testing.assert_array_equal(samples, uni.compute_samples(100, rng=np.random.default_rng(0)))
+
+        uni = MarginalDist()
+        uni.fit(np.full(10, 2.5))
+        np.testing.assert_array_equal(uni.compute_ppf(q), 2.5)
+
+    def test_sorted_grid_interpolation(self):
+
+        rng = np.random.default_rng(3)
+        data = rng.normal(size=500)
+        q = np.linspace(0.01, 0.99, 99)
+        x = np.linspace(-3, 3, 61)
+
+        for uni_dist, grid_name in [('emp', 'ecdf'), ('gaussian_kde', 'gaussian_kde'), ('gaussian_kde_binned', 'gaussian_kde_binned')]:
+            uni = MarginalDist()
+            uni.fit(data, candidates=[uni_dist])
+            self.assertTrue(uni.params[grid_name]['sorted'])
+
+            # np.interp on the sorted grid gives the interp1d results
+            fallback = pickle.loads(pickle.dumps(uni))
+            fallback.params[grid_name]['sorted'] = False
+            np.testing.assert_allclose(uni.compute_ppf(q), fallback.compute_ppf(q))
+            if (uni_dist != 'emp'):
+                np.testing.assert_allclose(uni.compute_cdf(x), fallback.compute_cdf(x), atol=1e-12)
+
+        # probabilities below the first empirical step map to the minimum (not nan)
+        uni = MarginalDist()
+        uni.fit(data, candidates=['emp'])
+        np.testing.assert_array_equal(uni.compute_ppf(np.array([0, 1e-6])), data.min())
+
+    def test_emp_sketch(self):
+
+        rng = np.random.default_rng(6)
+        data = rng.lognormal(size=20000)
+        q = np.linspace(0.01, 0.99, 99)
+        rank_error = 0.02 # k=200
+
+        uni = MarginalDist(sketch_k=200)
+        uni.fit(data, candidates=['emp_sketch'])
+        self.assertEqual(uni.fitted_marginal_dist, 'emp_sketch')
+        self.assertLess(uni.params['emp_sketch']['sketch'].size(), len(data) / 10)
+        np.testing.assert_allclose(uni.compute_cdf(np.quantile(data, q)), q, atol=rank_error)
+        np.testing.assert_allclose(uni.cdf_wrapper(data=np.quantile(data, q)), q, atol=rank_error)
+        np.testing.assert_allclose(np.mean(data[:, None] <= uni.compute_ppf(q), axis=0), q, atol=rank_error)
+
+        # chunks fitted separately and merged describe the whole column
+        chunks = [MarginalDist() for _ in range(4)]
+        for chunk, chunk_data in zip(chunks, np.array_split(data, 4)):
+            self.assertTrue(chunk.partial_fit(chunk_data[:2500]))
+            chunk.partial_fit(chunk_data[2500:])
+        merged = chunks[0]
+        for chunk in chunks[1:]:
+            merged.merge(chunk)
+        self.assertEqual(merged.params['emp_sketch']['sketch'].n, len(data))
+        np.testing.assert_allclose(merged.compute_cdf(np.quantile(data, q)), q, atol=rank_error)
+
+        # only emp_sketch distributions can be merged
+        emp = MarginalDist()
+        emp.fit(data, candidates=['emp'])
+        with self.assertRaises(Exception):
+            merged.merge(emp)
+
+    def test_discrete(self):
+
+        rng = np.random.default_rng(8)
+        data = rng.choice([0.0, 1.0, 2.0, 5.0], p=[0.1, 0.2, 0.3, 0.4], size=4000)
+        data[:10] = np.nan
+
+        uni = MarginalDist()
+        self.assertTrue(uni.fit(data))
+        self.assertEqual(uni.fitted_marginal_dist, 'discrete')
+
+        table = uni.params['discrete']
+        np.testing.assert_array_equal(table['x'], [0, 1, 2, 5])
+        np.testing.assert_allclose(np.diff(np.r_[0, table['u']]), [np.mean(data[10:]==v) for v in [0, 1, 2, 5]])
+
+        # cdf/ppf are exact step functions
+        np.testing.assert_allclose(uni.compute_cdf(np.array([-1, 0, 1.5, 5, 6, np.nan])), np.r_[0, table['u'][0], table['u'][1], 1, 1, np.nan])
+        np.testing.assert_array_equal(uni.compute_ppf(np.r_[0, table['u'], 1e-9 + table['u'][:-1]]), [0, 0, 1, 2, 5, 1, 2, 5])
+        np.testing.assert_array_equal(uni.ppf_wrapper(np.array([0.05, 0.95])), [0, 5])
+        self.assertTrue(np.isin(uni.compute_samples(1000, rng=np.random.default_rng(0)), table['x']).all())
+
+        # explicit candidates without 'discrete' are respected
+        uni = MarginalDist()
+        uni.fit(data[10:], candidates=['gaussian'])
+        self.assertEqual(uni.fitted_marginal_dist, 'gaussian')
+
+    def test_candidate_timeout(self):
+
+        rng = np.random.default_rng(5)
+        data = rng.gamma(2, size=2000)
+
+        reference = MarginalDist()
+        reference.fit(data)
+
+        # a generous budget gives the same selection, fitted in worker processes
+        uni = MarginalDist(candidate_timeout=60)
+        self.assertTrue(uni.fit(data))
+        self.assertEqual(uni.fitted_marginal_dist, reference.fitted_marginal_dist)
+        np.testing.assert_allclose(uni.compute_cdf(data[:100]), reference.compute_cdf(data[:100]))
+
+        # no candidate fits within the budget: all are skipped and the non-parametric fallback is used
+        uni = MarginalDist(candidate_timeout=1e-4)
+        self.assertTrue(uni.fit(data))
+        self.assertEqual(uni.fitted_marginal_dist, 'gaussian_kde')
+        for uni_dist in uni.parametric:
+            self.assertEqual(uni.selection_stats[uni_dist]["status"], "skipped")
+            self.assertTrue(uni.selection_stats[uni_dist]["reason"].startswith("timeout"))
+            self.assertGreaterEqual(uni.selection_stats[uni_dist]["time"], 1e-4)
+
+    def test_ppf_table(self):
+
+        rng = np.random.default_rng(4)
+        q = np.r_[0, 1e-20, rng.uniform(size=2000), 1 - 1e-17, 1]
+
+        for uni_dist, data in [('gamma', rng.gamma(0.8, 2, size=1000)), ('beta', rng.beta(0.6, 3, size=1000)), ('student_t', rng.standard_t(2, size=1000))]:
+            for tol in [1e-4, 1e-7]:
+                uni = MarginalDist(ppf_table_tol=tol)
+                uni.fit(data, candidates=[uni_dist])
+                table = uni.params['ppf_table']
+                self.assertLessEqual(table['max_error'], tol)
+
+                exact = deepcopy(uni)
+                exact.params['ppf_table'] = None
+                np.testing.assert_allclose(uni.compute_ppf(q), exact.compute_ppf(q), rtol=0, atol=tol)
+                np.testing.assert_allclose(uni.ppf_wrapper(q), exact.compute_ppf(q), rtol=0, atol=tol)
+
+                # tables are plain arrays
+                np.testing.assert_array_equal(pickle.loads(pickle.dumps(uni)).compute_ppf(q), uni.compute_ppf(q))
+
+        # only root-finding ppfs are tabulated
+        uni = MarginalDist(ppf_table_tol=1e-6)
+        uni.fit(rng.normal(size=500), candidates=['gaussian'])
+        self.assertIsNone(uni.params['ppf_table'])
+
+    def test_select_univariate_two_stage(self):
+
+        rng = np.random.default_rng(5)
+        data = rng.gamma(3, size=6000)
+        candidates = ['gaussian', 'laplace', 'gamma', 'uniform']
+
+        uni = MarginalDist(selection_sample_size=1000, selection_top_k=2)
+        with ut_.random_seed(0):
+            self.assertTrue(uni.fit(data, candidates=candidates))
+
+        stats = uni.selection_stats
+        self.assertEqual(stats['sample_size'], 1000)
+        self.assertListEqual(sorted(stats['stage1'].keys()), sorted(candidates))
+        self.assertEqual(len(stats['top_k']), 2)
+        self.assertListEqual(list(stats['stage2'].keys()), stats['top_k'])
+        self.assertEqual(uni.fitted_marginal_dist, 'gamma')
+
+        # smaller data is fitted in a single stage
+        uni = MarginalDist(selection_sample_size=10000)
+        uni.fit(data, candidates=candidates)
+        self.assertNotIn('stage1', uni.selection_stats)
+
+
+class TestGaussianCopulaMethods(unittest.TestCase):
+
+    def setUp(self):
+
+        # correlated gaussian data: y = 0.9x + noise, w independent
+        with ut_.random_seed(7):
+            x = np.random.normal(loc=0, scale=1, size=500)
+            y = 0.9 * x + np.random.normal(loc=0, scale=0.2, size=500)
+            w = np.random.normal(loc=5, scale=2, size=500)
+        self.data_df = pd.DataFrame({'x': x, 'y': y, 'w': w})
+
+        self.copula = GaussianCopula(debug=False)
+        self.copula.fit(self.data_df, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian']})
+
+    def test_sample_conditional_batch(self):
+
+        conditions_df = pd.DataFrame({'x': [-1.5, 0.0, 1.5, 1.5]}, index=[10, 11, 12, 13])
+
+        with ut_.random_seed(1):
+            syn_df = self.copula.sample_conditional_batch(conditions_df)
+
+        self.assertListEqual(list(syn_df.index), [10, 11, 12, 13])
+        self.assertListEqual(list(syn_df.columns), ['x', 'y', 'w'])
+        np.testing.assert_array_equal(syn_df['x'].to_numpy(), conditions_df['x'].to_numpy())
+
+        # y is strongly correlated with x, so it should follow the conditioning value
+        self.assertTrue(syn_df.loc[10, 'y'] < syn_df.loc[11, 'y'] < syn_df.loc[12, 'y'])
+
+    def test_sample_conditional_batch_matches_conditional_Gaussian(self):
+
+        size = 4000
+        conditions_df = pd.DataFrame({'x': np.full(size, 1.0)})
+
+        with ut_.random_seed(3):
+            syn_df = self.copula.sample_conditional_batch(conditions_df)
+            syn_row_df = self.copula.sample(size=size, conditions={'x': 1.0})
+
+        self.assertAlmostEqual(syn_df['y'].mean(), syn_row_df['y'].mean(), delta=0.02)
+        self.assertAlmostEqual(syn_df['y'].std(), syn_row_df['y'].std(), delta=0.02)
+        self.assertAlmostEqual(syn_df['w'].mean(), syn_row_df['w'].mean(), delta=0.2)
+
+    def test_conditional_cache(self):
+
+        self.copula.sample(size=1, conditions={'x': 0.5})
+        self.copula.sample(size=1, conditions={'x': -0.5})
+        self.copula.sample(size=1, conditions={'x': 0.5, 'w': 5.0})
+        self.copula.sample(size=1, conditions={'w': 4.0, 'x': 0.1})
+
+        info = self.copula.conditional_cache_info()
+        self.assertEqual(info['misses'], 2)
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['size'], 2)
+
+        # cached factors agree with the direct Schur complement
+        mu_bar, sigma_bar, columns1 = self.copula.conditional_Gaussian(pd.Series({'x': 0.3}))
+        corr = self.copula.correlation
+        sigma12 = corr.loc[columns1, ['x']].to_numpy()
+        expected_sigma_bar = corr.loc[columns1, columns1].to_numpy() - sigma12 @ sigma12.T
+        np.testing.assert_allclose(sigma_bar, expected_sigma_bar, atol=1e-12)
+        np.testing.assert_allclose(mu_bar, sigma12[:, 0] * 0.3, atol=1e-12)
+
+        # refitting invalidates cached factorizations
+        self.copula.correlation = None
+        self.copula.fit(self.data_df[['x', 'y', 'w']] * 2, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian']})
+        self.assertEqual(self.copula.conditional_cache_info()['size'], 0)
+
+    def test_sample_cholesky(self):
+
+        copula = GaussianCopula(debug=False, random_state=11)
+        copula.fit(self.data_df, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian']})
+
+        L = copula.cholesky
+        np.testing.assert_allclose(L @ L.T, copula.correlation.to_numpy(), atol=1e-12)
+
+        syn_df = copula.sample(size=20000)
+        self.assertAlmostEqual(syn_df.corr().loc['x', 'y'], self.data_df.corr().loc['x', 'y'], delta=0.02)
+
+        # same seed, same samples
+        copula_2 = GaussianCopula(debug=False, random_state=11)
+        copula_2.fit(self.data_df, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian']})
+        pd.testing.assert_frame_equal(copula_2.sample(size=20000), syn_df)
+
+        copula_2.sample_float32 = True
+        syn_float32_df = copula_2.sample(size=20000)
+        self.assertAlmostEqual(syn_float32_df.corr().loc['x', 'y'], self.data_df.corr().loc['x', 'y'], delta=0.02)
+
+    def test_fit_n_jobs(self):
+
+        marginal_dist_dict = {'x': ['gaussian', 'student_t'], 'y': ['gaussian', 'laplace'], 'w': ['gaussian', 'uniform']}
+
+        copula = GaussianCopula(debug=False)
+        copula.fit(self.data_df, marginal_dist_dict=marginal_dist_dict, n_jobs=2)
+
+        copula_seq = GaussianCopula(debug=False)
+        copula_seq.fit(self.data_df, marginal_dist_dict=marginal_dist_dict)
+
+        self.assertListEqual(copula.var_names, ['x', 'y', 'w'])
+        for var_name in copula.var_names:
+            self.assertEqual(copula.univariates[var_name].fitted_marginal_dist, copula_seq.univariates[var_name].fitted_marginal_dist)
+            self.assertEqual(copula.univariates[var_name].params['loc'], copula_seq.univariates[var_name].params['loc'])
+        pd.testing.assert_frame_equal(copula.correlation, copula_seq.correlation)
+
+        # a failing worker is reported with its column name
+        bad_df = self.data_df.copy()
+        bad_df['bad'] = ['a'] * len(bad_df)
+        with self.assertRaisesRegex(Exception, 'bad'):
+            GaussianCopula(debug=False).fit(bad_df, marginal_dist_dict=marginal_dist_dict, n_jobs=2)
+
+    def test_sample_conditional_batch_without_covariates(self):
+
+        conditions_df = pd.DataFrame(index=[3, 4, 5])
+        syn_df = self.copula.sample_conditional_batch(conditions_df)
+
+        self.assertListEqual(list(syn_df.index), [3, 4, 5])
+        self.assertFalse(syn_df.isnull().any().any())
+
+    def test_sample_iter(self):
+
+        chunks = list(self.copula.sample_iter(total_size=2500, chunk_size=1000))
+
+        self.assertListEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        syn_df = pd.concat(chunks)
+        self.assertListEqual(list(syn_df.index), list(range(2500)))
+        self.assertListEqual(list(syn_df.columns), ['x', 'y', 'w'])
+        self.assertAlmostEqual(syn_df.corr().loc['x', 'y'], self.data_df.corr().loc['x', 'y'], delta=0.05)
+
+        # same seed, same stream
+        copula = GaussianCopula(debug=False, random_state=5)
+        copula.fit(self.data_df, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian']})
+        chunks_1 = pd.concat(copula.sample_iter(total_size=300, chunk_size=100))
+        copula.rng = np.random.default_rng(5)
+        chunks_2 = pd.concat(copula.sample_iter(total_size=300, chunk_size=100))
+        pd.testing.assert_frame_equal(chunks_1, chunks_2)
+
+    def test_fit_kendall_fast(self):
+
+        copula = GaussianCopula(debug=False, correlation_method='kendall_fast')
+        copula.fit(self.data_df, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian']})
+
+        pd.testing.assert_frame_equal(copula.correlation, self.copula.correlation, check_exact=False, rtol=0, atol=1e-12)
+
+    def test_correlation_sample_size(self):
+
+        marginal_dist_dict = {'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian']}
+
+        copula = GaussianCopula(debug=False, correlation_sample_size=200, random_state=0)
+        copula.fit(self.data_df, marginal_dist_dict=marginal_dist_dict)
+
+        self.assertEqual(copula.correlation_sample_info['sample_size'], 200)
+        self.assertListEqual(list(copula.correlation_se.columns), ['x', 'y', 'w'])
+        self.assertTrue((copula.correlation_se.loc['x', ['y', 'w']] > 0).all())
+        self.assertTrue(ut_.is_pos_def(copula.correlation.to_numpy()))
+
+        # the subsampled estimate is within a few standard errors of the full estimate
+        error = (copula.correlation - self.copula.correlation).abs()
+        self.assertTrue((error <= 4 * copula.correlation_se + 1e-12).all().all())
+
+        # an unreachable target grows the subsample to all rows
+        copula = GaussianCopula(debug=False, correlation_sample_size=100, correlation_se_target=1e-6, random_state=0)
+        copula.fit(self.data_df, marginal_dist_dict=marginal_dist_dict)
+
+        self.assertEqual(copula.correlation_sample_info['sample_size'], len(self.data_df))
+        self.assertFalse(copula.correlation_sample_info['target_met'])
+        pd.testing.assert_frame_equal(copula.correlation, self.copula.correlation)
+
+    def test_partial_fit_merge(self):
+
+        with ut_.random_seed(2):
+            x = np.random.normal(size=6000)
+            data_df = pd.DataFrame({'x': x, 'y': np.exp(0.8 * x + 0.6 * np.random.normal(size=6000)), 'w': np.random.gamma(2, size=6000)})
+        data_df.loc[::50, 'w'] = np.nan
+
+        copula = GaussianCopula(debug=False)
+        for batch_df in np.array_split(data_df, 6):
+            copula.partial_fit(batch_df)
+
+        self.assertTrue(copula.fitted)
+        self.assertEqual(copula.partial_fit_stats['n_rows'], 6000)
+        self.assertEqual(copula.partial_fit_stats['columns']['w']['count'], data_df['w'].count())
+        self.assertAlmostEqual(copula.partial_fit_stats['columns']['y']['sum'], data_df['y'].sum())
+        self.assertEqual(copula.univariates['y'].fitted_marginal_dist, 'emp')
+        self.assertAlmostEqual(copula.correlation.loc['x', 'y'], 0.8, delta=0.03)
+        self.assertAlmostEqual(copula.correlation.loc['x', 'w'], 0.0, delta=0.05)
+
+        # models fitted on disjoint shards merge into the same statistics
+        copula_a = GaussianCopula(debug=False).partial_fit(data_df.iloc[:2500])
+        copula_b = GaussianCopula(debug=False).partial_fit(data_df.iloc[2500:][['w', 'y', 'x']])
+        copula_a.merge(copula_b)
+
+        self.assertEqual(copula_a.partial_fit_stats['n_rows'], 6000)
+        self.assertEqual(copula_a.univariates['x'].params['ecdf']['x'][1], data_df['x'].min())
+        pd.testing.assert_frame_equal(copula_a.correlation, copula.correlation, check_exact=False, atol=0.03)
+
+        syn_df = copula_a.sample(size=2000)
+        self.assertFalse(syn_df.isnull().any().any())
+        self.assertAlmostEqual(syn_df['y'].median(), data_df['y'].median(), delta=0.1)
+
+        with self.assertRaises(Exception):
+            copula_a.partial_fit(data_df[['x', 'y']])
+
+    def test_factor_structure(self):
+
+        with ut_.random_seed(4):
+            n, d = 3000, 40
+            true_loadings = np.random.uniform(-0.7, 0.7, size=(d, 2))
+            latent = np.random.normal(size=(n, 2)) @ true_loadings.T
+            noise = np.random.normal(size=(n, d)) * np.sqrt(1 - (true_loadings ** 2).sum(axis=1))
+        data_df = pd.DataFrame(latent + noise, columns=[f'v{i}' for i in range(d)])
+        marginal_dist_dict = {var_name: ['gaussian'] for var_name in data_df.columns}
+
+        copula = GaussianCopula(debug=False, correlation_structure='factor', n_factors=2, random_state=0)
+        copula.fit(data_df, marginal_dist_dict=marginal_dist_dict)
+
+        self.assertIsNone(copula.correlation)
+        loadings = copula.correlation_factors['loadings'].to_numpy()
+        uniqueness = copula.correlation_factors['uniqueness'].to_numpy()
+        self.assertEqual(loadings.shape, (d, 2))
+        self.assertTrue((uniqueness > 0).all())
+
+        corr_np = loadings @ loadings.T + np.diag(uniqueness)
+        np.testing.assert_allclose(np.diag(corr_np), 1.0)
+        self.assertLess(np.abs(corr_np - data_df.corr().to_numpy()).max(), 0.1)
+        np.testing.assert_allclose(copula.correlation_column('v3').to_numpy(), corr_np[:, 3])
+
+        # conditioning in factor form (Woodbury) matches the Schur complement of the dense matrix
+        conditions = pd.Series({'v0': 1.0, 'v5': -0.5})
+        mu_bar, sigma_bar, columns1 = copula.conditional_Gaussian(conditions)
+
+        dense_copula = GaussianCopula(debug=False)
+        dense_copula.var_names = copula.var_names
+        dense_copula.correlation = pd.DataFrame(corr_np, index=copula.var_names, columns=copula.var_names)
+        dense_mu_bar, dense_sigma_bar, dense_columns1 = dense_copula.conditional_Gaussian(conditions)
+
+        self.assertListEqual(list(columns1), list(dense_columns1))
+        np.testing.assert_allclose(mu_bar, dense_mu_bar, atol=1e-10)
+        np.testing.assert_allclose(sigma_bar, dense_sigma_bar, atol=1e-10)
+
+        syn_df = copula.sample(size=20000)
+        self.assertLess(np.abs(syn_df.corr().to_numpy() - corr_np).max(), 0.05)
+
+        syn_df = copula.sample_conditional_batch(pd.DataFrame({'v0': [2.0, -2.0] * 50}))
+        self.assertFalse(syn_df.isnull().any().any())
+
+        # discrete columns are scored at the middle of their probability steps, close to the latent correlation
+        rng = np.random.default_rng(1)
+        true_corr = np.array([[1, 0.6, 0.5], [0.6, 1, 0.4], [0.5, 0.4, 1]])
+        latent = rng.multivariate_normal(np.zeros(3), true_corr, size=20000)
+        data_df = pd.DataFrame({'a': np.digitize(latent[:, 0], [-0.5, 0.3, 1.2]), 'b': np.digitize(latent[:, 1], [-1, 0, 0.8, 1.5]), 'c': latent[:, 2]}).astype(float)
+        copula = GaussianCopula(debug=False, correlation_structure='factor', n_factors=3, random_state=0, marginal_discrete_max_unique=50)
+        copula.fit(data_df, marginal_dist_dict={'c': ['gaussian']})
+        loadings = copula.correlation_factors['loadings'].to_numpy()
+        self.assertLess(np.abs(loadings @ loadings.T + np.diag(copula.correlation_factors['uniqueness']) - true_corr).max(), 0.08)
+
+    def test_inverse_transform(self):
+
+        rng = np.random.default_rng(9)
+        data_df = self.data_df.assign(g=rng.gamma(2, size=500), h=rng.gamma(3, size=500), k=rng.integers(0, 3, 500).astype(float), c=3)
+        copula = GaussianCopula(debug=False)
+        copula.fit(data_df, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gaussian_kde'], 'g': ['gamma'], 'h': ['gamma']})
+
+        # grouped by family in one call per family, the same values as column by column
+        norm_samples_np = rng.normal(size=(200, 7))
+        expected = {var_name: copula.univariates[var_name].compute_ppf(kn_.norm_cdf(norm_samples_np[:, j])) for j, var_name in enumerate(copula.var_names)}
+        syn_df = copula._inverse_transform(norm_samples_np.copy(), copula.var_names)
+        pd.testing.assert_frame_equal(syn_df, pd.DataFrame(expected), check_exact=True)
+
+        # float32 normals: equal up to float32 rounding
+        pd.testing.assert_frame_equal(copula._inverse_transform(norm_samples_np.astype(np.float32), copula.var_names), syn_df, rtol=1e-5)
+
+        # conditions keep their values and dtype, columns stay in the order of var_names
+        syn_df = copula.sample(size=50, conditions={'k': 1, 'g': 2.5})
+        self.assertListEqual(list(syn_df.columns), list(copula.var_names))
+        self.assertEqual(syn_df['k'].dtype, np.int64)
+        self.assertTrue((syn_df['k'] == 1).all() and (syn_df['g'] == 2.5).all())
+
+    def test_discrete_marginals(self):
+
+        rng = np.random.default_rng(11)
+
+        # by default, ungrouped one-hot columns keep continuous marginals and the decoded categories keep their frequencies
+        levels = rng.choice(4, size=2000, p=[0.1, 0.4, 0.2, 0.3])
+        one_hot_df = pd.DataFrame((levels[:, None] == np.arange(4)).astype(float), columns=[f'cat.{i}' for i in range(4)])
+        copula = GaussianCopula(debug=False, random_state=0)
+        copula.fit(one_hot_df)
+        self.assertTrue(all(univariate.fitted_marginal_dist != 'discrete' for univariate in copula.univariates.values()))
+        frequencies = copula.sample(size=5000).idxmax(axis=1).value_counts(normalize=True).sort_index()
+        np.testing.assert_allclose(frequencies.to_numpy(), [0.1, 0.4, 0.2, 0.3], atol=0.03)
+
+        # conditions on a discrete marginal cover the probability step of the value: conditional means follow the data
+        x = rng.integers(0, 2, size=2000).astype(float)
+        data_df = pd.DataFrame({'x': x, 'y': x + rng.normal(size=2000)})
+        copula = GaussianCopula(debug=False, random_state=0)
+        copula.fit(data_df, marginal_dist_dict={'y': ['gaussian']}, transformer_meta_dict={'x': {'transformer_type': 'Boolean', 'output_fields': {'x': {}}}})
+        self.assertEqual(copula.univariates['x'].fitted_marginal_dist, 'discrete')
+        for value in [0.0, 1.0]:
+            expected = data_df.loc[data_df['x'] == value, 'y'].mean()
+            self.assertAlmostEqual(copula.sample(size=20000, conditions={'x': value})['y'].mean(), expected, delta=0.08)
+            self.assertAlmostEqual(copula.sample_conditional_batch(pd.DataFrame({'x': np.full(20000, value)}))['y'].mean(), expected, delta=0.08)
+
+    def test_discrete_transformer_types(self):
+
+        from bdarpack.Transformer import Transformer
+
+        rng = np.random.default_rng(12)
+        n = 600
+        raw_df = pd.DataFrame({
+            'count': pd.Series(rng.poisson(3, n), dtype='Int64'),
+            'amount': pd.Series(rng.gamma(2, size=n), dtype='Float64').mask(rng.uniform(size=n) < 0.1),
+            'flag': pd.Series(rng.uniform(size=n) < 0.3, dtype='boolean'),
+            'cat': pd.Series(rng.choice(['a', 'b', 'c'], n), dtype='string'),
+        })
+        transformer = Transformer(debug=False)
+        transformed_df = transformer.transform(raw_df)
+
+        # integer columns are discrete, continuous and ungrouped one-hot columns are not
+        copula = GaussianCopula(debug=False, random_state=0)
+        copula.fit(transformed_df, transformer_meta_dict=transformer.transformer_meta_dict, group_one_hot=False)
+        fitted = {var_name: univariate.fitted_marginal_dist for var_name, univariate in copula.univariates.items()}
+        self.assertEqual(fitted['count.value'], 'discrete')
+        self.assertTrue(all(fitted[column] != 'discrete' for column in ['amount.value', 'cat.a', 'cat.b', 'cat.c']))
+
+        # disabled by marginal_discrete_max_unique=None
+        copula = GaussianCopula(debug=False, random_state=0, marginal_discrete_max_unique=None)
+        copula.fit(transformed_df, transformer_meta_dict=transformer.transformer_meta_dict, group_one_hot=False)
+        self.assertNotEqual(copula.univariates['count.value'].fitted_marginal_dist, 'discrete')
+
+    def test_binary_columns(self):
+
+        from bdarpack.Transformer import Transformer
+
+        rng = np.random.default_rng(13)
+        n = 600
+        x = rng.normal(size=n)
+        raw_df = pd.DataFrame({
+            'x': pd.Series(x, dtype='Float64').mask(rng.uniform(size=n) < 0.1),
+            'flag': pd.Series(x + rng.normal(size=n) > 0.5, dtype='boolean'),
+            'cat': pd.Series(rng.choice(['a', 'b', 'c'], n), dtype='string'),
+        })
+        transformer = Transformer(debug=False)
+        transformed_df = transformer.transform(raw_df)
+
+        # Boolean and .is_null columns get the 'discrete' marginal whatever marginal_discrete_max_unique, and sample exactly 0/1
+        for marginal_discrete_max_unique in [50, None]:
+            copula = GaussianCopula(debug=False, random_state=0, marginal_discrete_max_unique=marginal_discrete_max_unique)
+            copula.fit(transformed_df, transformer_meta_dict=transformer.transformer_meta_dict)
+            syn_df = copula.sample(size=2000)
+            for column in ['flag.value', 'x.is_null']:
+                self.assertEqual(copula.univariates[column].fitted_marginal_dist, 'discrete')
+                self.assertSetEqual(set(syn_df[column].unique()), {0.0, 1.0})
+            self.assertAlmostEqual(syn_df['flag.value'].mean(), transformed_df['flag.value'].mean(), delta=0.03)
+
+    def test_group_one_hot(self):
+
+        import tempfile
+
+        rng = np.random.default_rng(5)
+        levels = rng.choice(4, size=500, p=[0.1, 0.4, 0.2, 0.3])
+        one_hot_df = pd.DataFrame((levels[:, None] == np.arange(4)).astype(float), columns=[f'cat.{i}' for i in range(4)])
+        data_df = pd.concat([self.data_df.assign(x=self.data_df['x'] + levels), one_hot_df], axis=1)
+        transformer_meta_dict = {'cat': {'transformer_type': 'One-Hot', 'output_fields': {column: {} for column in one_hot_df.columns}}}
+
+        copula = GaussianCopula(debug=False, random_state=0)
+        copula.fit(data_df, marginal_dist_dict={'x': ['gaussian'], 'y': ['gaussian'], 'w': ['gamma']}, transformer_meta_dict=transformer_meta_dict)
+
+        # one latent dimension for the group, codes ordered by association with x (frequency order without other columns)
+        self.assertListEqual(list(copula.var_names), ['x', 'y', 'w', 'cat'])
+        self.assertIn(copula.column_groups['cat'], [list(one_hot_df.columns), list(one_hot_df.columns[::-1])])
+        frequency_copula = GaussianCopula(debug=False)
+        frequency_copula.fit(one_hot_df, transformer_meta_dict=transformer_meta_dict)
+        self.assertListEqual(frequency_copula.column_groups['cat'], ['cat.1', 'cat.3', 'cat.2', 'cat.0'])
+        self.assertEqual(copula.univariates['cat'].fitted_marginal_dist, 'discrete')
+
+        # samples have the columns of the data and are exactly one-hot, with the data frequencies
+        syn_df = copula.sample(size=4000)
+        self.assertListEqual(list(syn_df.columns), list(data_df.columns))
+        self.assertTrue((syn_df[one_hot_df.columns].sum(axis=1) == 1).all())
+        np.testing.assert_allclose(syn_df[one_hot_df.columns].mean(), one_hot_df.mean(), atol=0.03)
+
+        # conditions on the group (full or one column set to 1) and expanded correlations
+        syn_df = copula.sample(size=100, conditions={'cat.2': 1.0})
+        self.assertTrue((syn_df['cat.2'] == 1).all() and (syn_df[one_hot_df.columns].sum(axis=1) == 1).all())
+        syn_df = copula.sample_conditional_batch(data_df[one_hot_df.columns].iloc[:50])
+        np.testing.assert_array_equal(syn_df[one_hot_df.columns].to_numpy(), one_hot_df.iloc[:50].to_numpy())
+        self.assertListEqual(list(copula.correlation_column('cat.0').index), list(data_df.columns))
+
+        # conditioning on a category (including the first and last codes) reproduces the within-category statistics of x
+        for level, column in enumerate(one_hot_df.columns):
+            syn_df = copula.sample(size=20000, conditions={column: 1.0})
+            self.assertAlmostEqual(syn_df['x'].mean(), data_df.loc[levels == level, 'x'].mean(), delta=0.3)
+            self.assertAlmostEqual(syn_df['x'].std(), data_df.loc[levels == level, 'x'].std(), delta=0.15)
+
+        with tempfile.TemporaryDirectory() as path:
+            copula.export_model(path)
+            loaded = load_model(path)
+            self.assertDictEqual(loaded.column_groups, copula.column_groups)
+            self.assertListEqual(list(loaded.sample(size=10).columns), list(data_df.columns))
+            del loaded
+
+    def test_sample_threads(self):
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        copula = GaussianCopula(debug=False, conditional_cache_size=2)
+        copula.fit(self.data_df, marginal_dist_dict={'x': ['gaussian_kde'], 'y': ['gaussian'], 'w': ['gamma']})
+
+        def draw(i):
+            conditions = [None, {'x': 0.5}, {'w': 4.0}, {'x': -1.0, 'w': 6.0}][i % 4]
+            return conditions, copula.sample(size=300, conditions=conditions)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(draw, range(64)))
+
+        for conditions, syn_df in results:
+            self.assertEqual(syn_df.shape, (300, 3))
+            self.assertFalse(syn_df.isnull().any().any())
+            for var_name, value in (conditions or {}).items():
+                self.assertTrue((syn_df[var_name] == value).all())
+
+        # sampling writes nothing to the marginal distributions
+        for univariate in copula.univariates.values():
+            self.assertIsNone(univariate.ppf)
+            self.assertIsNone(univariate.cdf)
+
+        # the cache lock is not pickled
+        import pickle
+        copy = pickle.loads(pickle.dumps(copula))
+        self.assertEqual(copy.sample(size=5, conditions={'x': 0.5}).shape, (5, 3))
+
+    def test_fit_cache(self):
+
+        import tempfile
+
+        marginal_dist_dict = {'x': ['gaussian', 'laplace'], 'y': ['gaussian_kde'], 'w': ['gaussian']}
+
+        with tempfile.TemporaryDirectory() as path:
+            cache = MarginalFitCache(path=path)
+            copula = GaussianCopula(debug=False, fit_cache=cache)
+            copula.fit(self.data_df, marginal_dist_dict=marginal_dist_dict)
+            self.assertEqual(cache.stats()['misses'], 3)
+
+            # shuffled rows: same keys, no refit
+            shuffled_df = self.data_df.sample(frac=1, random_state=0)
+            cached_copula = GaussianCopula(debug=False, fit_cache=cache)
+            cached_copula.fit(shuffled_df, marginal_dist_dict=marginal_dist_dict)
+            self.assertEqual(cache.stats()['memory_hits'], 3)
+            for var_name in ['x', 'y', 'w']:
+                self.assertEqual(cached_copula.univariates[var_name].fitted_marginal_dist, copula.univariates[var_name].fitted_marginal_dist)
+                self.assertIsNot(cached_copula.univariates[var_name], copula.univariates[var_name])
+
+            # other candidates are a different key
+            GaussianCopula(debug=False, fit_cache=cache).fit(self.data_df[['x']], marginal_dist_dict={'x': ['gaussian']})
+            self.assertEqual(cache.stats()['misses'], 4)
+
+            # a new cache on the same directory reads the disk layer
+            disk_cache = MarginalFitCache(path=path)
+            GaussianCopula(debug=False, fit_cache=disk_cache).fit(self.data_df, marginal_dist_dict=marginal_dist_dict)
+            self.assertEqual(disk_cache.stats()['disk_hits'], 3)
+            self.assertAlmostEqual(disk_cache.stats()['hit_rate'], 1)
+
+            # size eviction keeps the most recently used entries
+            max_disk_bytes = disk_cache.disk_bytes() // 2
+            small_cache = MarginalFitCache(path=path, max_disk_bytes=max_disk_bytes)
+            small_cache.put(small_cache.key(self.data_df['w']), copula.univariates['w'])
+            self.assertLessEqual(small_cache.disk_bytes(), max_disk_bytes)
+            self.assertTrue(os.path.exists(os.path.join(path, f"{small_cache.key(self.data_df['w'])}.pkl")))
+
+    def test_export_load_model(self):
+
+        import tempfile
+
+        data_df = self.data_df.copy()
+        data_df['c'] = 3.0
+        marginal_dist_dict = {'x': ['emp'], 'y': ['gaussian_kde'], 'w': ['gamma']}
+
+        for correlation_structure in ['dense', 'factor']:
+            copula = GaussianCopula(debug=False, correlation_structure=correlation_structure, n_factors=2, marginal_ppf_table_tol=1e-6)
+            copula.fit(data_df, marginal_dist_dict=marginal_dist_dict)
+
+            with tempfile.TemporaryDirectory() as path:
+                copula.export_model(path)
+                loaded = load_model(path)
+
+                self.assertListEqual(list(loaded.var_names), list(copula.var_names))
+                self.assertIsNone(loaded.univariates['y'].gaussian_kde_model)
+                pd.testing.assert_frame_equal(loaded.ppf_table_report(), copula.ppf_table_report())
+
+                # same draws as the fitted model
+                for conditions in [None, {'x': 0.5}]:
+                    with ut_.random_seed(3):
+                        expected_df = copula.sample(size=200, conditions=conditions)
+                    with ut_.random_seed(3):
+                        syn_df = loaded.sample(size=200, conditions=conditions)
+                    pd.testing.assert_frame_equal(syn_df, expected_df)
+
+                del loaded # release the memory-mapped files
+
+
+class TestKendallCorr(unittest.TestCase):
+
+    def test_count_inversions(self):
+
+        rng = np.random.default_rng(0)
+        for n in [0, 1, 2, 3, 16, 17, 40, 131]:
+            y = rng.integers(0, max(2, n // 3), n)
+            expected = sum(1 for i in range(n) for j in range(i + 1, n) if y[i] > y[j])
+            self.assertEqual(ut_.count_inversions(y), expected)
+
+    def test_kendall_corr_matches_pandas(self):
+
+        rng = np.random.default_rng(1)
+        n = 2000
+        a = rng.normal(size=n)
+        df = pd.DataFrame({
+            'a': a,
+            'b': a + rng.normal(size=n), # continuous, correlated
+            'c': np.round(a, 1), # ties
+            'd': rng.integers(0, 4, n).astype(float), # heavy ties
+            'e': -a + rng.integers(0, 3, n), # ties, negatively correlated
+            'f': np.ones(n), # constant
+        })
+        df.loc[rng.choice(n, 200, replace=False), 'b'] = np.nan
+        df.loc[rng.choice(n, 50, replace=False), 'd'] = np.nan
+        df['g'] = np.nan # empty
+
+        expected = df.corr(method='kendall')
+        for n_jobs in [None, 3]:
+            result = ut_.kendall_corr(df, n_jobs=n_jobs)
+            pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=0, atol=1e-12)
+
+    def test_kendall_corr_small(self):
+
+        df = pd.DataFrame({'x': [1.0, 2.0, np.nan, 4.0], 'y': [np.nan, 1.0, 3.0, 2.0], 'z': [np.nan, np.nan, 1.0, np.nan]})
+        pd.testing.assert_frame_equal(ut_.kendall_corr(df), df.corr(method='kendall'), check_exact=False, rtol=0, atol=1e-12)
+
+
+class TestKernels(unittest.TestCase):
+
+    def test_kernels_match_scipy(self):
+
+        from scipy import stats
+
+        rng = np.random.default_rng(6)
+        x = np.r_[3 * rng.normal(size=500), -np.inf, np.inf, np.nan, 0.5, 1.5, 2.5]
+        u = np.r_[rng.uniform(size=500), 1, np.nan, -0.1, 1.1, 1e-20, 1 - 1e-16, 0.5]
+
+        families = {
+            "gaussian": (stats.norm, {}),
+            "laplace": (stats.laplace, {}),
+            "loglaplace": (stats.loglaplace, {"c": 1.7}),
+            "gamma": (stats.gamma, {"a": 0.8}),
+            "beta": (stats.beta, {"a": 0.6, "b": 3}),
+            "student_t": (stats.t, {"df": 2.5}),
+            "uniform": (stats.uniform, {})
+        }
+        for dist_name, (dist, shape) in families.items():
+            params = {**shape, "loc": 0.5, "scale": 2.0}
+            np.testing.assert_allclose(kn_.cdf(dist_name, params, x), dist.cdf(x, **params), rtol=1e-12, atol=1e-15, err_msg=dist_name)
+            np.testing.assert_allclose(kn_.ppf(dist_name, params, u), dist.ppf(u, **params), rtol=1e-12, err_msg=dist_name)
+            if (dist_name != "student_t"):
+                self.assertEqual(kn_.ppf(dist_name, params, 0.0), dist.ppf(0.0, **params))
+
+            # output buffer, including in place
+            buffer = u.copy()
+            self.assertIs(kn_.ppf(dist_name, params, buffer, out=buffer), buffer)
+            np.testing.assert_allclose(buffer, dist.ppf(u, **params), rtol=1e-12)
+
+        # ppf(0) is the lower support bound (scipy's t.ppf(0) overflows to +inf)
+        self.assertEqual(kn_.ppf("student_t", {"df": 3, "loc": 0, "scale": 1}, 0.0), -np.inf)
+
+        np.testing.assert_array_equal(kn_.norm_cdf(x), stats.norm.cdf(x))
+        np.testing.assert_array_equal(kn_.norm_ppf(np.r_[0, u]), stats.norm.ppf(np.r_[0, u]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import tempfile
+import types
+import sys, os
+import numpy as np
+import pandas as pd
+
+# run this in cmd: python -m bdarpack.tests.test_tabula -v
+
+if __name__ == '__main__':
+    if __package__ is None:
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        par_dir = os.path.dirname(dir_path)
+        sys.path.insert(0, par_dir)
+        head, sep, tail = dir_path.partition('copula-tabular')
+        sys.path.insert(0, head+sep) # adding par_dir to system path
+
+
+from bdarpack.TabulaCopula import TabulaCopula, load_TC_model
+from bdarpack import utils_ as ut_
+
+class TestTabulaCopulaMethods(unittest.TestCase):
+
+    def setUp(self):
+
+        # Small training set and data dictionary, written to a temporary root directory (trainData, synData and privacyMetrics folders)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = self.tmp_dir.name
+        os.makedirs(os.path.join(root, "trainData"))
+
+        rng = np.random.default_rng(0)
+        n = 400
+        grp = rng.choice([1, 2, 3], size=n)
+        x = rng.normal(size=n) + grp
+        y = 2 * x + rng.normal(size=n)
+        pd.DataFrame({"x": x, "y": y, "grp": grp}).to_csv(os.path.join(root, "trainData", "tabula.csv"), index=False)
+        pd.DataFrame({
+            "NAME": ["x", "y", "grp"],
+            "TYPE": ["numeric", "numeric", "string"],
+            "CATEGORY": ["independent variable", "dependent variable", "independent variable"]
+        }).to_excel(os.path.join(root, "trainData", "tabula_dict.xlsx"), index=False)
+
+        self.definitions = types.SimpleNamespace(
+            PREFIX_PATH = root + "/",
+            TRAIN_PATH = "trainData",
+            SYN_PATH = "synData",
+            PRIV_PATH = "privacyMetrics",
+            TRAINXLSX = "tabula.csv",
+            TRAINXLSX_SHEETNAME = None,
+            TRAINDICTXLSX = "tabula_dict.xlsx",
+            TRAINDICTXLSX_SHEETNAME = None,
+            OUTPUT_TYPE_DATA = 'csv'
+        )
+
+        # continuous marginals for x and y (an 'emp' marginal clips samples to the training range, so that a resampled value can repeat the original one)
+        self.marginal_dist_dict = {"x.value": ['gaussian'], "y.value": ['gaussian'], "grp.1": ['gaussian', 'emp'], "grp.2": ['gaussian', 'emp'], "grp.3": ['gaussian', 'emp']}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fitted_tc(self, conditionalSettings_dict=None):
+        """TabulaCopula fitted on the training set (and its conditional copulas if conditionalSettings_dict is given)"""
+
+        tc = TabulaCopula(definitions=self.definitions, output_general_prefix='TEST', conditionalSettings_dict=conditionalSettings_dict, debug=False)
+        tc.transform()
+        tc.fit_gaussian_copula(marginal_dist_dict=self.marginal_dist_dict)
+        if conditionalSettings_dict is not None:
+            tc.transform_conditional()
+            tc.fit_gaussian_copula_conditional(marginal_dist_dict=self.marginal_dist_dict)
+
+        return tc
+
+    def test_sample_gaussian_copula_iter(self):
+
+        tc = self.fitted_tc()
+        with ut_.random_seed(0):
+            n_samples = tc.sample_gaussian_copula_iter(sample_size=250, chunk_size=100)
+        self.assertEqual(n_samples, 250)
+        self.assertIsNone(tc.syn_samples_df)
+
+        # chunks are appended below a single header
+        for output, columns in [('synthetic_samples', list(self.marginal_dist_dict.keys())), ('reversed_samples', ["x", "y", "grp"])]:
+            with open(tc.output_filenames[output]) as fl:
+                lines = fl.read().splitlines()
+            self.assertEqual(len(lines), 251)
+            self.assertEqual(lines.count(lines[0]), 1)
+
+            samples_df = pd.read_csv(tc.output_filenames[output])
+            self.assertEqual(len(samples_df), 250)
+            self.assertCountEqual(list(samples_df.columns), columns)
+
+        # unsupported output: nothing is sampled or written
+        tc = self.fitted_tc()
+        tc.output_filenames['reversed_samples'] = ut_.change_extension(tc.output_filenames['reversed_samples'], 'xlsx')
+        os.remove(tc.output_filenames['synthetic_samples'])
+        with self.assertRaises(ValueError):
+            tc.sample_gaussian_copula_iter(sample_size=250, chunk_size=100)
+        self.assertFalse(os.path.exists(tc.output_filenames['synthetic_samples']))
+        self.assertFalse(os.path.exists(tc.output_filenames['reversed_samples']))
+
+    def test_export_model(self):
+
+        tc = self.fitted_tc()
+        path = tc.export_model(os.path.join(self.tmp_dir.name, "model"))
+        self.assertIsNotNone(tc.storage['transformer'].data_curated_df) # the instance keeps its training data
+
+        gaussian_copula, transformer = load_TC_model(path)
+        self.assertIsNone(transformer.data_curated_df)
+        np.testing.assert_allclose(gaussian_copula.correlation, tc.storage['copula'].correlation)
+
+        # the loaded model samples and reverse-transforms as the instance does
+        with ut_.random_seed(0):
+            syn_samples_df = gaussian_copula.sample(300)
+        with ut_.random_seed(0):
+            syn_samples_tc_df = tc.storage['copula'].sample(300)
+        pd.testing.assert_frame_equal(syn_samples_df, syn_samples_tc_df)
+
+        reversed_df = transformer.reverse(syn_samples_df)
+        pd.testing.assert_frame_equal(reversed_df, tc.storage['transformer'].reverse(syn_samples_tc_df))
+        self.assertEqual(len(reversed_df), 300)
+        self.assertCountEqual(list(reversed_df.columns), ["x", "y", "grp"])
+        self.assertTrue(set(reversed_df["grp"]) <= {"1", "2", "3"})
+
+    def test_sample_gaussian_copula_conditional(self):
+
+        conditionalSettings_dict = {
+            "set_1": {
+                "bool": True,
+                "parent_conditions": {"grp": {"condition": "set", "condition_value": {1: ["1"], 2: ["3"]}}},
+                "conditions_var": ["x"],
+                "children": ["y"]
+            }
+        }
+        tc = self.fitted_tc(conditionalSettings_dict=conditionalSettings_dict)
+        with ut_.random_seed(0):
+            tc.sample_gaussian_copula(sample_size=300)
+            syn_samples_df = tc.syn_samples_df.copy()
+            tc.sample_gaussian_copula_conditional()
+        cond_samples_df = tc.syn_samples_conditional_df
+
+        pd.testing.assert_index_equal(cond_samples_df.index, syn_samples_df.index)
+
+        # only the child of rows matching a parent condition (grp 1 or 3) is resampled
+        grp = syn_samples_df[["grp.1", "grp.2", "grp.3"]].idxmax(axis=1)
+        matched = grp.isin(["grp.1", "grp.3"])
+        self.assertTrue(matched.any() and not matched.all())
+        self.assertTrue((cond_samples_df.loc[matched, "y.value"] != syn_samples_df.loc[matched, "y.value"]).all())
+        pd.testing.assert_series_equal(cond_samples_df.loc[~matched, "y.value"], syn_samples_df.loc[~matched, "y.value"])
+
+        other_columns = [col for col in syn_samples_df.columns if col != "y.value"]
+        pd.testing.assert_frame_equal(cond_samples_df[other_columns], syn_samples_df[other_columns])
+
+if __name__ == '__main__':
+    unittest.main()
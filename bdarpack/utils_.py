@@ -443,8 +443,12 @@ def conversionFromTIMSTxtToCSV(filename, delimiter='|', output_filename=None, op
 
 
 # GENERAL FUNCTIONS FOR DATAFRAME
-def save_df_as_csv(df, filename, index=True):
-    df.to_csv(filename, index=index, header=True)
+def save_df_as_csv(df, filename, index=True, append=False):
+    """Save df to a csv file. If append is True, rows are appended to an existing file without writing the header."""
+    if append:
+        df.to_csv(filename, index=index, header=False, mode='a')
+    else:
+        df.to_csv(filename, index=index, header=True)
 
 def save_df_as_excel(df, excel_file_name, sheet_name='Sheet1', index=True):
     try:
@@ -517,6 +521,36 @@ def df_sampling(df, p=0.8):
     return df_sampled, df_control
 
 
+def stratified_order(df, n_strata=10, rng=None):
+    """Orders the rows of a dataframe so that every prefix of the order is a stratified random subsample.
+    Rows are stratified into `n_strata` quantile bins of their mean percentile rank across columns (missing values ignored), 
+    and the strata are interleaved in proportion to their sizes, so df.iloc[order[:m]] is a stratified subsample of size m for any m.
+
+    Parameters:
+        df (pandas.Dataframe): numerical dataframe to be subsampled.
+        n_strata (int): number of strata. Default is 10.
+        rng (numpy.random.Generator): random generator. Default is None (new unseeded generator).
+
+    Returns:
+        order (np.array): permutation of the row positions of df
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n = df.shape[0]
+
+    # strata: quantile bins of the mean percentile rank of each row
+    score = df.rank(pct=True).mean(axis=1, skipna=True).fillna(0.5)
+    score_pct = score.rank(method='first', pct=True).to_numpy()
+    strata = np.minimum((score_pct * n_strata).astype(int), n_strata - 1)
+
+    # random position of each row within its stratum
+    perm = rng.permutation(n)
+    pos = np.empty(n, dtype=float)
+    for stratum in np.unique(strata):
+        members = perm[strata[perm] == stratum]
+        pos[members] = (np.arange(members.size) + rng.random(members.size)) / members.size
+
+    return np.argsort(pos, kind='stable')
+
 def update_dataframe_rows(df, refCol, listRows, col, val):
     """This function is used to update rows of a dataframe based on certain conditions. 
 
@@ -1132,6 +1166,242 @@ def makePD(corr):
         new_corr = np.divide(new_corr,np.sqrt(Norm*Norm.transpose()))
 
         return new_corr
+
+def cholesky_factor(A):
+    """
+    Compute a lower-triangular factor L such that A = L @ L.T.
+    Falls back to a symmetric square root from the eigendecomposition (negative eigenvalues clipped to 0) when A is only positive semi-definite.
+
+    Parameters:
+        A (np.array): symmetric (covariance) matrix
+
+    Returns:
+        L (np.array): factor of A
+    """
+    try:
+        L = np.linalg.cholesky(A)
+    except np.linalg.LinAlgError:
+        eigValue, eigVector = np.linalg.eigh(A)
+        L = eigVector * np.sqrt(np.clip(eigValue, 0, None))
+
+    return L
+
+def randomized_svd(A, k, n_oversamples=10, n_iter=4, rng=None):
+    """
+    Truncated SVD of A (m x n) by randomized range finding with power iterations (Halko, Martinsson & Tropp, 2011), in O(m n k).
+
+    Parameters:
+        A (np.array): matrix
+        k (int): number of singular values/vectors
+        n_oversamples (int): additional random directions used to find the range. Default is 10.
+        n_iter (int): number of power iterations. Default is 4.
+        rng (np.random.Generator): random generator. Default is None (new unseeded generator).
+
+    Returns:
+        U (np.array): m x k left singular vectors
+        s (np.array): k largest singular values
+        Vt (np.array): k x n right singular vectors
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n_random = min(k + n_oversamples, min(A.shape))
+
+    Q = A @ rng.standard_normal((A.shape[1], n_random))
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(Q)
+        Q, _ = np.linalg.qr(A.T @ Q)
+        Q = A @ Q
+    Q, _ = np.linalg.qr(Q)
+
+    Ub, s, Vt = np.linalg.svd(Q.T @ A, full_matrices=False)
+
+    return (Q @ Ub)[:, :k], s[:k], Vt[:k]
+
+# RANK CORRELATION
+def count_inversions(y, block=16):
+    """
+    Count the number of pairs i < j with y[i] > y[j] (strictly), using a bottom-up merge sort.
+    Blocks of `block` elements are counted by direct comparison and sorted first. Each following level merges all adjacent sorted blocks at once: 
+    blocks are offset so that a single stable argsort of the whole array performs every merge, and a right-block element moved from index i to 
+    merged position p has (i - p) strictly greater left-block elements.
+
+    Parameters:
+        y (np.array): 1D integer array (e.g. ranks)
+        block (int): size (power of 2) of the initial blocks. Default is 16.
+
+    Returns:
+        n_inv (int): number of inversions
+    """
+    y = np.asarray(y, dtype=np.int64)
+    n = y.size
+    if (n < 2):
+        return 0
+
+    y = y - y.min()
+    span = int(y.max()) + 2
+
+    # pad to a multiple of block with values larger than any other (no extra inversions)
+    n_pad = -(-n // block) * block
+    blocks = np.concatenate([y, np.full(n_pad - n, span - 1, dtype=np.int64)]).reshape(-1, block)
+
+    n_inv = 0
+    for b in range(1, block):
+        n_inv += int(np.count_nonzero(blocks[:, :b] > blocks[:, b:b+1]))
+    y = np.sort(blocks, axis=1).ravel()
+
+    idx = np.arange(n_pad, dtype=np.int64)
+    width = block
+    while width < n_pad:
+        start = idx & ~(2 * width - 1)
+        right = (idx - start) >= width
+        order = np.argsort(start * span + y, kind='stable')
+        n_inv += int(idx[right].sum()) - int(np.dot(idx, right[order]))
+        y = y[order]
+        width *= 2
+
+    return n_inv
+
+def _count_tied_pairs(ranks):
+    """Number of tied pairs, sum of c*(c-1)/2 over groups of equal (non-negative integer) ranks"""
+    cnt = np.bincount(ranks).astype(np.int64)
+    return int((cnt * (cnt - 1) // 2).sum())
+
+def kendall_tau_b(x_rank, y_rank, perm=None):
+    """
+    Kendall's tau-b of two rank arrays (no missing values), in O(n log n) (Knight's algorithm).
+    Follows scipy.stats.kendalltau: returns nan for fewer than 2 observations or when either variable is constant.
+
+    Parameters:
+        x_rank (np.array): 1D non-negative integer ranks of x (ties share a rank)
+        y_rank (np.array): 1D non-negative integer ranks of y (ties share a rank)
+        perm (np.array): (optional) precomputed permutation sorting the pairs by x, then y. Any argsort of x_rank is valid when x has no ties.
+
+    Returns:
+        tau (float): tau-b
+    """
+    size = x_rank.size
+    if (size < 2):
+        return np.nan
+
+    xtie = _count_tied_pairs(x_rank)
+    ytie = _count_tied_pairs(y_rank)
+
+    tot = (size * (size - 1)) // 2
+    if (xtie == tot) or (ytie == tot):
+        return np.nan
+
+    # sort by x, then y
+    if perm is None:
+        perm = np.argsort(x_rank * (int(y_rank.max()) + 1) + y_rank)
+    x = x_rank[perm]
+    y = y_rank[perm]
+
+    # pairs tied in both x and y
+    obs = np.r_[True, (x[1:] != x[:-1]) | (y[1:] != y[:-1]), True]
+    cnt = np.diff(np.nonzero(obs)[0]).astype(np.int64)
+    ntie = int((cnt * (cnt - 1) // 2).sum())
+
+    dis = count_inversions(y)
+    con_minus_dis = tot - xtie - ytie + ntie - 2 * dis
+    tau = con_minus_dis / np.sqrt(tot - xtie) / np.sqrt(tot - ytie)
+
+    return min(1., max(-1., tau))
+
+def kendall_corr(df, n_jobs=None):
+    """
+    Pairwise Kendall tau-b correlation matrix of a dataframe, equivalent to df.corr(method='kendall').
+    Each column is ranked and sorted once; a pair is then sorted again only when both columns contain ties (or missing values).
+    Missing values are excluded pairwise (pairwise complete observations), as in pandas. Column pairs are computed in a thread pool.
+
+    Parameters:
+        df (pd.DataFrame): numerical data
+        n_jobs (int): number of threads used over column pairs. None or 1 computes sequentially, -1 uses all available cores.
+
+    Returns:
+        corr_df (pd.DataFrame): square dataframe of correlations, with the columns of df as index and columns
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    mat = df.to_numpy(dtype=float)
+    n_rows, n_cols = mat.shape
+    mask = ~np.isnan(mat)
+
+    # rank and sort each column once (ties share a rank, nan rows get a placeholder rank)
+    ranks = np.zeros(mat.shape, dtype=np.int64)
+    orders = [None] * n_cols
+    no_ties = np.zeros(n_cols, dtype=bool)
+    for i in range(n_cols):
+        ranks[mask[:, i], i] = np.unique(mat[mask[:, i], i], return_inverse=True)[1]
+        if mask[:, i].all():
+            orders[i] = np.argsort(ranks[:, i])
+            no_ties[i] = (ranks[:, i].max() == n_rows - 1)
+
+    def pair_corr(pair):
+        i, j = pair
+        valid = mask[:, i] & mask[:, j]
+        if not valid.any():
+            return np.nan
+        elif (i == j):
+            return 1.0
+        elif not valid.all():
+            return kendall_tau_b(ranks[valid, i], ranks[valid, j])
+        elif no_ties[i]:
+            return kendall_tau_b(ranks[:, i], ranks[:, j], perm=orders[i])
+        elif no_ties[j]:
+            return kendall_tau_b(ranks[:, j], ranks[:, i], perm=orders[j])
+        else:
+            return kendall_tau_b(ranks[:, i], ranks[:, j])
+
+    pairs = [(i, j) for i in range(n_cols) for j in range(i, n_cols)]
+
+    if (n_jobs == -1):
+        n_jobs = os.cpu_count()
+    if (n_jobs is not None) and (n_jobs > 1) and (len(pairs) > 1):
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(pair_corr, pairs))
+    else:
+        results = [pair_corr(pair) for pair in pairs]
+
+    corr = np.empty((n_cols, n_cols), dtype=float)
+    for (i, j), c in zip(pairs, results):
+        corr[i, j] = corr[j, i] = c
+
+    return pd.DataFrame(corr, index=df.columns, columns=df.columns)
+
+# GOODNESS OF FIT
+def ecdf_steps(n):
+    """
+    Upper and lower step values of the empirical CDF of n sorted observations: i/n and (i-1)/n for i = 1..n.
+    """
+    steps = np.arange(n + 1) / n if n > 0 else np.zeros(1)
+
+    return steps[1:], steps[:-1]
+
+def ks_1samp_sorted(cdf_values, steps=None):
+    """
+    Two-sided one-sample Kolmogorov-Smirnov tests of one sorted sample against several CDFs at once.
+    Gives the same statistics and p-values as stats.kstest(data, cdf) (exact distribution, nan propagated), without sorting the data again for every CDF.
+    Inputs:
+        cdf_values (np.array): (m, n) array, row j holding the j-th CDF evaluated at the sorted sample (a 1-d array is a single CDF)
+        steps (tuple, optional): output of ecdf_steps(n), to reuse across calls
+    Returns:
+        ks_statistics (np.array): m KS statistics
+        ks_pvalues (np.array): m p-values
+    """
+
+    cdf_values = np.atleast_2d(np.asarray(cdf_values, dtype=float))
+    n = cdf_values.shape[1]
+    if steps is None:
+        steps = ecdf_steps(n)
+    upper, lower = steps
+
+    d_plus = (upper - cdf_values).max(axis=1)
+    d_minus = (cdf_values - lower).max(axis=1)
+    ks_statistics = np.maximum(d_plus, d_minus)
+    ks_statistics[np.isnan(d_plus) | np.isnan(d_minus)] = np.nan
+
+    ks_pvalues = np.clip(stats.kstwo.sf(ks_statistics, n), 0, 1)
+
+    return ks_statistics, ks_pvalues
     
 def sort_subset(A, B):
     """